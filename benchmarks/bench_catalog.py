@@ -0,0 +1,82 @@
+# benchmarks/bench_catalog.py
+"""Load time and memory of the vehicle catalog: discord/common.py dicts vs mmap of vehicles.bin.
+
+Usage: python -m benchmarks.bench_catalog [--runs 10]
+
+Every run is a fresh interpreter, so imports are measured cold (bytecode cached).
+The time covers the import plus the first name lookup, with the stdlib modules
+the program has already loaded by then imported up front; memory is the RSS growth
+over a bare interpreter (Linux/macOS), or the Python heap peak elsewhere.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import json, sys, time, tracemalloc
+# Уже загружены программой к первому бою - не относятся к справочнику
+import argparse, dataclasses, json, logging, threading
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def rss_kib():
+    if resource is None:
+        return None
+    value = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS отдает байты, Linux - килобайты
+    return value // 1024 if sys.platform == "darwin" else value
+
+before = rss_kib()
+if resource is None:
+    tracemalloc.start()
+started = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - started
+heap = tracemalloc.get_traced_memory()[1] // 1024 if resource is None else None
+after = rss_kib()
+print(json.dumps({{"ms": elapsed * 1000, "kib": heap if heap is not None else after - before, "name": name}}))
+"""
+
+VARIANTS = {
+    "common.py dicts": (
+        "from discord.common import VEHICLE_AIR_DICT\n"
+        "name = VEHICLE_AIR_DICT['bf-109f-4']['en']"
+    ),
+    "vehicles.bin mmap": (
+        "from discord.catalog import get_catalog\n"
+        "name = get_catalog().name('air', 'bf-109f-4', 'en')"
+    ),
+    # Что на самом деле загружается к первому бою: резолвер, варианты и справочник
+    "resolver + catalog": (
+        "from discord.vehicles import AIR, resolve_vehicle\n"
+        "name = resolve_vehicle('bf-109f-4', AIR, 'en').name"
+    ),
+}
+
+def measure(code: str) -> dict:
+    output = subprocess.run([sys.executable, "-c", CHILD.format(code=code)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    
+    for code in VARIANTS.values():
+        # Прогрев: компилируем .pyc, чтобы не мерить его создание
+        measure(code)
+    
+    for variant, code in VARIANTS.items():
+        runs = [measure(code) for _ in range(args.runs)]
+        times = [run["ms"] for run in runs]
+        memory = [run["kib"] for run in runs]
+        print(f"{variant:>18}: load+lookup {statistics.median(times):7.2f} ms (min {min(times):.2f}), "
+              f"memory +{statistics.median(memory):7.0f} KiB, name {runs[0]['name']!r}")
+
+if __name__ == "__main__":
+    main()
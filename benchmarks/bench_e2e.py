@@ -0,0 +1,209 @@
+# benchmarks/bench_e2e.py
+"""End-to-end tick benchmark: run_update_presence_loop against the mock server with a fake Discord sink.
+
+Usage: python -m benchmarks.bench_e2e [--ticks 300] [--latency 0.002] [--client stdlib]
+                                      [--scenarios hangar,ground,air] [--output bench_e2e.json]
+                                      [--trace trace.json]
+
+The mock server runs in a separate process, so CPU time per tick only counts this process.
+Allocations are measured in a second pass under tracemalloc, which would distort latency.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import urllib.request
+
+from benchmarks.mock_server import STATS_PATH
+from configs import metrics
+from configs import tracing
+from configs.settings import get_default_settings, init_http_client
+from discord import handler
+from discord.rpc import set_rpc_client
+from game.replay import NullRPCClient
+import game.api as game_api
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ("hangar", "ground", "air")
+
+class TickProbe:
+    """Wraps update_presence_tick: measures every call and removes the pause between ticks"""
+    
+    def __init__(self, tick, warmup: int, trace_allocations: bool = False, on_warm=None):
+        self.tick = tick
+        self.warmup = warmup
+        self.trace_allocations = trace_allocations
+        self.on_warm = on_warm
+        self.calls = 0
+        self.wall = []
+        self.cpu = []
+        self.alloc_peak = []
+        self.alloc_retained = []
+    
+    def __call__(self, *args):
+        self.calls += 1
+        measured = self.calls > self.warmup
+        if self.calls == self.warmup + 1 and self.on_warm:
+            self.on_warm()
+        
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        
+        self.tick(*args)
+        
+        cpu = time.process_time() - cpu_started
+        wall = time.perf_counter() - wall_started
+        if measured:
+            self.wall.append(wall * 1000)
+            self.cpu.append(cpu * 1000)
+            if self.trace_allocations:
+                current, peak = tracemalloc.get_traced_memory()
+                self.alloc_peak.append(peak - memory_before)
+                self.alloc_retained.append(current - memory_before)
+        
+        # Следующий тик сразу, без ожидания интервала опроса
+        return 0.0
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    index = min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_mock(scenario: str, latency: float, *extra_args: str) -> (subprocess.Popen, str):
+    """Mock server process with request-driven scenario clock"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.mock_server", "--scenario", scenario, "--clock", "requests",
+         "--port", str(port), "--latency", str(latency), *extra_args],
+        cwd=ROOT, stdout=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline or process.poll() is not None:
+                process.kill()
+                raise RuntimeError(f"Mock server for {scenario} did not start")
+            time.sleep(0.05)
+    return process, f"http://127.0.0.1:{port}"
+
+def mock_requests(base_url: str) -> int:
+    with urllib.request.urlopen(base_url + STATS_PATH, timeout=5) as response:
+        return json.loads(response.read())["requests"]
+
+def run_pass(settings, base_url: str, ticks: int, warmup: int, trace_allocations: bool) -> (TickProbe, int):
+    """Run the real loop for warmup + ticks iterations; returns probe and requests made while measuring"""
+    game_api.set_api_url(base_url)
+    game_api.reset_breakers()
+    http_client = init_http_client(settings.http_client)
+    rpc_client = NullRPCClient()
+    set_rpc_client(rpc_client)
+    
+    counted = {}
+    probe = TickProbe(handler.update_presence_tick, warmup, trace_allocations,
+                      on_warm=lambda: counted.setdefault("start", mock_requests(base_url)))
+    original_tick = handler.update_presence_tick
+    handler.update_presence_tick = probe
+    try:
+        with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+            handler.run_update_presence_loop(settings, http_client, max_iterations=warmup + ticks)
+    finally:
+        handler.update_presence_tick = original_tick
+        set_rpc_client(None)
+        http_client.close()
+    
+    return probe, mock_requests(base_url) - counted.get("start", 0)
+
+def bench_scenario(scenario: str, settings, args) -> dict:
+    process, base_url = start_mock(scenario, args.latency)
+    try:
+        metrics.reset()
+        with tracing.span("scenario", scenario=scenario):
+            probe, requests_made = run_pass(settings, base_url, args.ticks, args.warmup, False)
+        stages = metrics.stage_summary()
+        # Под tracemalloc спаны были бы искажены - этот проход не трассируем
+        tracing.pause()
+        tracemalloc.start()
+        try:
+            alloc_probe, _ = run_pass(settings, base_url, args.alloc_ticks, args.warmup, True)
+        finally:
+            tracemalloc.stop()
+            tracing.resume()
+    finally:
+        process.terminate()
+        process.wait()
+    
+    return {
+        "ticks": len(probe.wall),
+        "tick_ms": {
+            "p50": round(percentile(probe.wall, 50), 3),
+            "p95": round(percentile(probe.wall, 95), 3),
+            "p99": round(percentile(probe.wall, 99), 3),
+            "mean": round(statistics.mean(probe.wall), 3),
+        },
+        "cpu_ms_per_tick": round(statistics.mean(probe.cpu), 3),
+        "requests_per_tick": round(requests_made / len(probe.wall), 3),
+        "alloc_peak_bytes_per_tick": int(statistics.median(alloc_probe.alloc_peak)),
+        "alloc_retained_bytes_per_tick": int(statistics.mean(alloc_probe.alloc_retained)),
+        "stages": stages,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--alloc-ticks", type=int, default=100, help="ticks of the tracemalloc pass")
+    parser.add_argument("--latency", type=float, default=0.002, help="server-side delay per request, seconds")
+    parser.add_argument("--client", choices=("requests", "stdlib"), default="stdlib")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--output", default="bench_e2e.json", help="JSON report path")
+    parser.add_argument("--trace", metavar="FILE", help="also write Chrome trace of the latency pass")
+    args = parser.parse_args()
+    if args.trace:
+        tracing.enable()
+    
+    settings = get_default_settings().replace(http_client=args.client)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "client": args.client,
+            "latency_s": args.latency,
+            "timestamp": int(time.time()),
+        },
+        "scenarios": {},
+    }
+    
+    for scenario in args.scenarios.split(","):
+        result = bench_scenario(scenario, settings, args)
+        report["scenarios"][scenario] = result
+        tick = result["tick_ms"]
+        print(f"{scenario:>7}: p50 {tick['p50']:7.3f} ms, p95 {tick['p95']:7.3f} ms, p99 {tick['p99']:7.3f} ms, "
+              f"cpu {result['cpu_ms_per_tick']:6.3f} ms, {result['requests_per_tick']:.2f} req/tick, "
+              f"peak alloc {result['alloc_peak_bytes_per_tick'] / 1024:.1f} KiB/tick")
+    
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"report: {args.output}")
+    if args.trace:
+        print(f"trace: {args.trace} ({tracing.export(args.trace)} spans)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/bench_http_client.py
+"""requests.Session vs stdlib keep-alive client (serial and pipelined) against the mock War Thunder server.
+
+Usage: python -m benchmarks.bench_http_client [--ticks 200] [--latency 0]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.mock_server import Faults, MockWarThunderServer, Scenario
+from configs.settings import init_http_client
+
+ENDPOINTS = ("/map_info.json", "/indicators", "/state")
+
+def import_cost(module: str, runs: int = 5) -> float:
+    """Median wall time of a fresh interpreter importing module, ms"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def measure(tick, ticks: int) -> list:
+    tick()  # прогрев соединения
+    samples = []
+    for _ in range(ticks):
+        started = time.perf_counter()
+        tick()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="server-side delay per request, seconds")
+    args = parser.parse_args()
+    
+    server = MockWarThunderServer(Scenario.load("air"), Faults(latency=args.latency)).start()
+    urls = [f"{server.url}{path}" for path in ENDPOINTS]
+    
+    session = init_http_client("requests")
+    local = init_http_client("stdlib")
+    
+    cases = (
+        ("requests serial", lambda: [session.get(url, timeout=5).json() for url in urls]),
+        ("stdlib serial", lambda: [local.get(url, timeout=5).json() for url in urls]),
+        ("stdlib pipelined", lambda: [response.json() for response in local.get_many(urls, timeout=5)]),
+    )
+    
+    print(f"3 endpoints per tick, latency per request: {args.latency * 1000:.1f} ms, ticks: {args.ticks}")
+    for name, tick in cases:
+        samples = measure(tick, args.ticks)
+        print(f"{name:>17}: mean {statistics.mean(samples):7.3f} ms, "
+              f"median {statistics.median(samples):7.3f} ms, max {max(samples):7.3f} ms")
+    
+    print(f"{'empty interpreter':>17}: {import_cost('sys'):7.1f} ms")
+    print(f"{'import requests':>17}: {import_cost('requests'):7.1f} ms (fresh interpreter)")
+    print(f"{'import client':>17}: {import_cost('game.http_client'):7.1f} ms (fresh interpreter)")
+    
+    server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/bench_json.py
+"""Per-tick JSON parse cost of every installed backend on /map_info.json, /indicators and /state.
+
+Usage: python -m benchmarks.bench_json [--recording battle.jsonl.gz] [--runs 20000]
+
+Payloads are taken from a recording made with main.py --record when given,
+otherwise from the mock server's air battle.
+"""
+import argparse
+import json
+import timeit
+
+from benchmarks.mock_server import MockWarThunderServer, Scenario
+from game.json_backend import available_backends
+from game.recorder import read_recording
+from game.state_decoder import decode_state
+
+ENDPOINTS = ("/map_info.json", "/indicators", "/state")
+
+def recorded_payloads(path: str) -> dict:
+    """Last successful body of every endpoint in the recording"""
+    payloads = {}
+    for entry in read_recording(path):
+        if entry["path"] in ENDPOINTS and entry.get("status") == 200 and entry.get("body"):
+            payloads[entry["path"]] = entry["body"].encode("utf-8")
+    return payloads
+
+def mock_payloads() -> dict:
+    mock = MockWarThunderServer(Scenario.load("air")).start()
+    try:
+        return {path: json.dumps(mock.payload(path)).encode("utf-8") for path in ENDPOINTS}
+    finally:
+        mock.stop()
+
+def best_of(function, payload: bytes, runs: int) -> float:
+    """Best of 5 repeats, microseconds per call"""
+    return min(timeit.repeat(lambda: function(payload), number=runs, repeat=5)) / runs * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recording", help="file written with main.py --record")
+    parser.add_argument("--runs", type=int, default=20000)
+    args = parser.parse_args()
+    
+    payloads = recorded_payloads(args.recording) if args.recording else mock_payloads()
+    print("payloads: " + ", ".join(f"{path} {len(body)} bytes" for path, body in payloads.items()))
+    
+    header = "".join(f"{path:>16}" for path in payloads)
+    print(f"{'backend':>16}{header}{'per tick':>12}")
+    for name, loads in available_backends().items():
+        timings = [best_of(loads, body, args.runs) for body in payloads.values()]
+        print(f"{name:>16}" + "".join(f"{value:13.2f} us" for value in timings) + f"{sum(timings):9.2f} us")
+    
+    if "/state" in payloads:
+        # /state в цикле разбирает game.state_decoder: через orjson/msgspec, если они выбраны, иначе поиском по байтам
+        print(f"{'state_decoder':>16} /state: {best_of(decode_state, payloads['/state'], args.runs):.2f} us")
+
+if __name__ == "__main__":
+    main()
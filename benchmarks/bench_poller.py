@@ -0,0 +1,53 @@
+# benchmarks/bench_poller.py
+"""Serial vs concurrent polling of the 8111 endpoints against the mock War Thunder server.
+
+Usage: python -m benchmarks.bench_poller [--ticks 50] [--latency 0.02]
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.mock_server import Faults, MockWarThunderServer, Scenario
+from configs.settings import init_http_client
+import game.api as game_api
+
+def serial_tick(http_client):
+    """Old behaviour: map, indicators and state one after another"""
+    map_data = game_api.map_request(http_client)
+    if map_data.valid:
+        game_api.main_info_request(http_client)
+        game_api.air_state_request(http_client)
+
+def concurrent_tick(http_client):
+    """New behaviour: one combined snapshot"""
+    game_api.poll_telemetry(http_client)
+
+def measure(tick, http_client, ticks: int) -> list:
+    tick(http_client)  # прогрев соединений
+    samples = []
+    for _ in range(ticks):
+        started = time.perf_counter()
+        tick(http_client)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02, help="server-side delay per request, seconds")
+    args = parser.parse_args()
+    
+    server = MockWarThunderServer(Scenario.load("air"), Faults(latency=args.latency)).start()
+    game_api.set_api_url(server.url)
+    
+    http_client = init_http_client()
+    print(f"latency per request: {args.latency * 1000:.1f} ms, ticks: {args.ticks}")
+    for name, tick in (("serial", serial_tick), ("concurrent", concurrent_tick)):
+        samples = measure(tick, http_client, args.ticks)
+        print(f"{name:>10}: mean {statistics.mean(samples):7.2f} ms, "
+              f"median {statistics.median(samples):7.2f} ms, max {max(samples):7.2f} ms")
+    
+    server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# benchmarks/bench_startup.py
+"""Cold start budget: fresh interpreter running main.py -> first presence sent, against the mock server.
+
+Usage: python -m benchmarks.bench_startup [--runs 10] [--client stdlib] [--budget-ms 600] [--warm]
+
+Every run is a new interpreter (bytecode cached) that runs the real main.py from
+a scratch folder with its own settings.json: settings load, update check thread
+(update_url is empty, so it does not go to the network), warm start, Discord
+connection and the update loop. pypresence is imported as usual, only its
+Client is replaced by a stub that accepts activities. The time is counted from
+the interpreter start of main.py to the first presence written to the stub.
+With --warm, presence_state.json of the previous run is kept, so the launch
+publishes the saved presence. Exits with code 1 if the median is over the
+budget or if a heavy dependency was imported that this client does not need.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.bench_e2e import ROOT, start_mock
+
+CHILD = """
+import time
+started = time.perf_counter()
+import importlib.util, json, os, sys
+sys.path.insert(0, {root!r})
+
+class StubClient:
+    def __init__(self, client_id, **kwargs):
+        pass
+    def start(self):
+        pass
+    def set_activity(self, **kwargs):
+        pass
+    def clear_activity(self):
+        pass
+    def close(self):
+        pass
+
+class StubDiscord:
+    # Настоящий pypresence загружается (его импорт входит в замер), подменяется только Client
+    def find_spec(self, name, path, target=None):
+        if name != "pypresence":
+            return None
+        sys.meta_path.remove(self)
+        spec = importlib.util.find_spec(name)
+        exec_module = spec.loader.exec_module
+        def exec_and_stub(module):
+            exec_module(module)
+            module.Client = StubClient
+        spec.loader.exec_module = exec_and_stub
+        return spec
+
+sys.meta_path.insert(0, StubDiscord())
+
+from configs import startup
+import game.api as game_api
+game_api.set_api_url({url!r})
+
+def report():
+    first = startup.elapsed(startup.FIRST_PRESENCE)
+    sys.__stdout__.write(json.dumps({{
+        "first_presence_ms": first * 1000 + (startup.STARTED - started) * 1000,
+        "imports_ms": startup.elapsed("modules_imported") * 1000 + (startup.STARTED - started) * 1000,
+        "warm": startup.elapsed("warm_start") is not None,
+        "modules": [name for name in {heavy!r} if name in sys.modules],
+    }}) + "\\n")
+    sys.__stdout__.flush()
+    os._exit(0)
+
+startup.on_mark(startup.FIRST_PRESENCE, report)
+sys.argv = [{main!r}]
+sys.stdout = open(os.devnull, "w")
+import runpy
+runpy.run_path({main!r}, run_name="__main__")
+"""
+
+# Зависимости, которые не должны загружаться до первого статуса
+# (pypresence нужен для самого статуса, а asyncio - для pypresence)
+HEAVY_MODULES = ("requests", "http.server", "urllib.request", "discord.common")
+# requests нужен только своему клиенту (и сам загружает urllib.request)
+ALLOWED = {"requests": ("requests", "urllib.request"), "stdlib": ()}
+# Бюджет по умолчанию: большую часть времени занимает импорт pypresence (asyncio, ssl) в потоке
+# подключения, а клиент requests добавляет свой импорт
+DEFAULT_BUDGET_MS = {"stdlib": 600.0, "requests": 1200.0}
+
+def prepare_folder(folder: str, client: str):
+    """Scratch program folder: a copy of main.py and settings.json without network access"""
+    shutil.copy(os.path.join(ROOT, "main.py"), os.path.join(folder, "main.py"))
+    with open(os.path.join(ROOT, "settings.json"), "r", encoding="utf-8") as f:
+        settings = json.load(f)
+    settings.update(http_client=client, update_url="", metrics_port=0)
+    with open(os.path.join(folder, "settings.json"), "w", encoding="utf-8") as f:
+        json.dump(settings, f)
+
+def measure(url: str, folder: str, warm: bool) -> dict:
+    from discord.warm_start import STATE_FILE
+    if not warm:
+        try:
+            os.remove(os.path.join(folder, STATE_FILE))
+        except FileNotFoundError:
+            pass
+    code = CHILD.format(root=ROOT, url=url, heavy=HEAVY_MODULES, main=os.path.join(folder, "main.py"))
+    output = subprocess.run([sys.executable, "-c", code], cwd=folder, capture_output=True, text=True,
+                            stdin=subprocess.DEVNULL, timeout=60, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--client", choices=("requests", "stdlib"), default="stdlib")
+    parser.add_argument("--budget-ms", type=float, help="allowed median time to first presence (600 for stdlib, 1200 for requests)")
+    parser.add_argument("--warm", action="store_true", help="keep presence_state.json between runs")
+    args = parser.parse_args()
+    budget = args.budget_ms if args.budget_ms is not None else DEFAULT_BUDGET_MS[args.client]
+    
+    folder = tempfile.mkdtemp(prefix="wt-startup-")
+    process, url = start_mock("air", 0.0)
+    try:
+        prepare_folder(folder, args.client)
+        # Прогрев: компилируем .pyc, чтобы не мерить его создание (и сохраняем статус для --warm)
+        measure(url, folder, warm=False)
+        runs = [measure(url, folder, args.warm) for _ in range(args.runs)]
+    finally:
+        process.terminate()
+        process.wait()
+        shutil.rmtree(folder, ignore_errors=True)
+    
+    imports = [run["imports_ms"] for run in runs]
+    first = [run["first_presence_ms"] for run in runs]
+    warm_runs = sum(run["warm"] for run in runs)
+    print(f"imports:        median {statistics.median(imports):7.2f} ms (min {min(imports):.2f})")
+    print(f"first presence: median {statistics.median(first):7.2f} ms (min {min(first):.2f}), budget {budget:.0f} ms")
+    print(f"warm starts:    {warm_runs} of {len(runs)}")
+    
+    failed = False
+    unexpected = sorted(set(runs[0]["modules"]) - set(ALLOWED[args.client]))
+    if unexpected:
+        print(f"imported before first presence: {', '.join(unexpected)}")
+        failed = True
+    if statistics.median(first) > budget:
+        print("over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
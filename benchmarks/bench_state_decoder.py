@@ -0,0 +1,69 @@
+# benchmarks/bench_state_decoder.py
+"""Bytes decoder of game.state_decoder vs the old json.loads/regex path for the /state response.
+
+Usage: python -m benchmarks.bench_state_decoder [--runs 20000]
+"""
+import argparse
+import json
+import re
+import timeit
+
+from benchmarks.mock_server import _air_state
+from game.state_decoder import decode_state
+
+KEYS = (("H, m", "altitude"), ("TAS, km/h", "tas_speed"), ("IAS, km/h", "ias_speed"),
+        ("Mfuel, kg", "current_fuel"), ("Mfuel0, kg", "max_fuel"))
+
+TEXT_PATTERNS = [
+    (r'"H,\s*m"\s*:\s*([0-9]+\.?[0-9]*)', 'altitude'),
+    (r'H,\s*m:\s*([0-9]+\.?[0-9]*)', 'altitude'),
+    (r'"TAS,\s*km/h"\s*:\s*([0-9]+\.?[0-9]*)', 'tas_speed'),
+    (r'TAS,\s*km/h:\s*([0-9]+\.?[0-9]*)', 'tas_speed'),
+    (r'"IAS,\s*km/h"\s*:\s*([0-9]+\.?[0-9]*)', 'ias_speed'),
+    (r'IAS,\s*km/h:\s*([0-9]+\.?[0-9]*)', 'ias_speed'),
+    (r'"Mfuel,\s*kg"\s*:\s*([0-9]+\.?[0-9]*)', 'current_fuel'),
+    (r'Mfuel,\s*kg:\s*([0-9]+\.?[0-9]*)', 'current_fuel'),
+    (r'"Mfuel0,\s*kg"\s*:\s*([0-9]+\.?[0-9]*)', 'max_fuel'),
+    (r'Mfuel0,\s*kg:\s*([0-9]+\.?[0-9]*)', 'max_fuel'),
+]
+
+def legacy_decode(content: bytes) -> dict:
+    """Previous build_air_info: decode text, json.loads, regex fallback"""
+    text = content.decode("utf-8", errors="replace")
+    values = {}
+    try:
+        data = json.loads(text)
+        for key, field in KEYS:
+            if data.get(key) is not None:
+                values[field] = str(int(data[key]))
+    except json.JSONDecodeError:
+        for pattern, field in TEXT_PATTERNS:
+            matches = re.findall(pattern, text)
+            if matches and field not in values:
+                value = matches[0]
+                values[field] = str(int(float(value))) if "." in value else value
+    return values
+
+def best_of(decode, body: bytes, runs: int) -> float:
+    """Best of 5 repeats, microseconds per call"""
+    return min(timeit.repeat(lambda: decode(body), number=runs, repeat=5)) / runs * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20000)
+    args = parser.parse_args()
+    
+    state = _air_state(12.5)
+    bodies = {
+        "json": json.dumps(state).encode("utf-8"),
+        "text": "\n".join(f"{key}: {value}" for key, value in state.items()).encode("utf-8"),
+    }
+    
+    for name, body in bodies.items():
+        assert legacy_decode(body) == decode_state(body), name
+        legacy = best_of(legacy_decode, body, args.runs)
+        new = best_of(decode_state, body, args.runs)
+        print(f"{name:>4} ({len(body)} bytes): legacy {legacy:7.2f} us, bytes decoder {new:7.2f} us, x{legacy / new:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/bench_streaming.py
+"""Full read + json.loads vs streaming JSON array parsing of /map_obj.json.
+
+Usage: python -m benchmarks.bench_streaming [--sizes 1000,10000,50000] [--take 20] [--client stdlib]
+
+The mock server runs in a separate process, so tracemalloc only sees the client side.
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.bench_e2e import start_mock
+from configs.settings import init_http_client
+import game.api as game_api
+
+def measure(read) -> (float, int, int):
+    """Wall time in ms, peak traced memory in KiB, items"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    items = read()
+    elapsed = (time.perf_counter() - started) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak // 1024, items
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,50000", help="objects in /map_obj.json")
+    parser.add_argument("--take", type=int, default=20, help="items needed by the caller")
+    parser.add_argument("--client", choices=("requests", "stdlib"), default="stdlib")
+    args = parser.parse_args()
+    
+    unlimited = 1 << 40
+    for size in (int(value) for value in args.sizes.split(",")):
+        process, base_url = start_mock("air", 0.0, "--map-objects", str(size))
+        try:
+            game_api.set_api_url(base_url)
+            game_api.reset_breakers()
+            http_client = init_http_client(args.client)
+            
+            cases = (
+                ("full read + json.loads", lambda: len(http_client.get(game_api.MAP_OBJ_URL, timeout=5).json()[:args.take])),
+                (f"stream, first {args.take}", lambda: len(list(game_api.iter_json_array(
+                    game_api.MAP_OBJ_URL, http_client, limit=args.take, max_bytes=unlimited)))),
+                ("stream, count all", lambda: sum(1 for _ in game_api.iter_json_array(
+                    game_api.MAP_OBJ_URL, http_client, max_bytes=unlimited))),
+                ("stream, default cap", lambda: sum(1 for _ in game_api.iter_json_array(
+                    game_api.MAP_OBJ_URL, http_client))),
+            )
+            
+            print(f"/map_obj.json with {size} objects:")
+            for name, read in cases:
+                read()  # прогрев соединения
+                elapsed, peak, items = measure(read)
+                print(f"  {name:>24}: {elapsed:8.2f} ms, peak {peak:7d} KiB, {items} items")
+            http_client.close()
+        finally:
+            process.terminate()
+            process.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+# benchmarks/mock_server.py
+"""Scriptable mock of the War Thunder 8111 API with fault injection.
+
+Usage: python -m benchmarks.mock_server [--scenario full|hangar|air|ground|FILE.json]
+                                        [--port 8111] [--latency 0.005] [--jitter 0.0]
+                                        [--drop 0.0] [--malformed 0.0] [--errors 0.0] [--seed N]
+                                        [--map-objects 40] [--hud-messages 1]
+
+A scenario is a list of phases: hangar -> loading (dummy_plane) -> air/ground battle -> hangar.
+Scenario file format:
+    {"clock": "time" | "requests", "loop": true,
+     "phases": [{"phase": "hangar", "duration": 5},
+                {"phase": "air", "duration": 30, "vehicle": "bf-109f-4"}]}
+With "clock": "requests" a phase lasts `duration` requests of /map_info.json instead of seconds,
+which makes benchmark runs deterministic.
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+HANGAR = "hangar"
+LOADING = "loading"
+AIR = "air"
+GROUND = "ground"
+
+# Служебный endpoint со счетчиками запросов, сам в счетчики не попадает
+STATS_PATH = "/mock/stats"
+
+BUILTIN_SCENARIOS = {
+    "hangar": {"loop": True, "phases": [{"phase": HANGAR, "duration": 60}]},
+    "air": {"loop": True, "phases": [{"phase": AIR, "duration": 60, "vehicle": "bf-109f-4"}]},
+    "ground": {"loop": True, "phases": [{"phase": GROUND, "duration": 60, "vehicle": "tankModels/germ_pzkpfw_iv_ausf_h"}]},
+    "full": {"loop": True, "phases": [
+        {"phase": HANGAR, "duration": 5},
+        {"phase": LOADING, "duration": 3},
+        {"phase": AIR, "duration": 30, "vehicle": "bf-109f-4"},
+        {"phase": HANGAR, "duration": 5},
+        {"phase": LOADING, "duration": 3},
+        {"phase": GROUND, "duration": 30, "vehicle": "tankModels/ussr_t_34_1942"},
+    ]},
+}
+
+class Faults:
+    """Probabilities and delays injected into responses"""
+    
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, drop: float = 0.0,
+                 malformed: float = 0.0, errors: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.drop = drop
+        self.malformed = malformed
+        self.errors = errors
+        self.random = random.Random(seed)
+    
+    def delay(self) -> float:
+        if not self.jitter:
+            return self.latency
+        return max(self.latency + self.random.uniform(-self.jitter, self.jitter), 0.0)
+    
+    def roll(self, probability: float) -> bool:
+        return probability > 0 and self.random.random() < probability
+
+class Scenario:
+    """Sequence of game phases driven by wall time or by /map_info.json requests"""
+    
+    def __init__(self, phases: List[dict], loop: bool = True, clock: str = "time"):
+        if not phases:
+            raise ValueError("Scenario needs at least one phase")
+        self.phases = phases
+        self.loop = loop
+        self.clock = clock
+        self._started = time.monotonic()
+        self._map_requests = 0
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def load(cls, name_or_path: str, clock: Optional[str] = None) -> "Scenario":
+        """Built-in scenario by name or JSON file"""
+        if name_or_path in BUILTIN_SCENARIOS:
+            data = BUILTIN_SCENARIOS[name_or_path]
+        else:
+            with open(name_or_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        return cls(data["phases"], data.get("loop", True), clock or data.get("clock", "time"))
+    
+    def on_map_request(self):
+        with self._lock:
+            self._map_requests += 1
+    
+    def position(self) -> float:
+        if self.clock == "requests":
+            return float(self._map_requests)
+        return time.monotonic() - self._started
+    
+    def current(self) -> (dict, float):
+        """Current phase and time spent in it"""
+        position = self.position()
+        total = sum(phase["duration"] for phase in self.phases)
+        if self.loop and total > 0:
+            position %= total
+        for phase in self.phases:
+            if position < phase["duration"]:
+                return phase, position
+            position -= phase["duration"]
+        last = self.phases[-1]
+        return last, last["duration"]
+
+def _air_state(elapsed: float) -> dict:
+    altitude = 1500 + 800 * math.sin(elapsed / 7)
+    tas = 480 + 40 * math.sin(elapsed / 3)
+    return {
+        "valid": True, "aileron, %": 0, "elevator, %": -2, "rudder, %": 0, "flaps, %": 0, "gear, %": 0,
+        "H, m": int(altitude), "TAS, km/h": int(tas), "IAS, km/h": int(tas * 0.9), "M": round(tas / 1225, 2),
+        "AoA, deg": 2.1, "AoS, deg": 0.0, "Ny": 1.02, "Vy, m/s": round(4 * math.cos(elapsed / 7), 1),
+        "Wx, deg/s": 0, "Mfuel, kg": max(300 - int(elapsed), 0), "Mfuel0, kg": 300,
+        "throttle 1, %": 100, "RPM throttle 1, %": 100, "mixture 1, %": 100, "radiator 1, %": 40,
+        "magneto 1": 3, "power 1, hp": 1320.4, "RPM 1": 2600, "manifold pressure 1, atm": 1.42,
+        "oil temp 1, C": 82, "water temp 1, C": 96, "thrust 1, kgs": 980, "efficiency 1, %": 78,
+    }
+
+def _air_indicators(vehicle: str, elapsed: float) -> dict:
+    return {
+        "valid": True, "army": "air", "type": vehicle, "speed": 0.13, "pedals": 0.0, "stick_elevator": -0.02,
+        "stick_ailerons": 0.0, "altitude_hour": 1500.0, "altitude_min": 1500.0, "altitude_10k": 1500.0,
+        "aviahorizon_roll": -0.4, "aviahorizon_pitch": 2.2, "compass": 121.3, "clock_hour": 10.5,
+        "clock_min": 31.0, "clock_sec": 12.0, "rpm": 2600.0, "oil_temperature": 82.0, "water_temperature": 96.0,
+        "mixture": 1.0, "fuel": max(300 - elapsed, 0), "fuel_pressure": 1.0, "throttle": 1.0,
+        "crew_total": 1.0, "crew_current": 1.0,
+    }
+
+def _ground_indicators(vehicle: str, elapsed: float) -> dict:
+    return {
+        "valid": True, "army": "tank", "type": vehicle, "speed": round(28 + 10 * math.sin(elapsed / 4), 1),
+        "gear": 3.0, "gear_neutral": 1.0, "rpm": round(1900 + 300 * math.sin(elapsed / 4)), "rpm_min": 800.0,
+        "rpm_max": 2600.0, "driving_direction_mode": 0.0, "cruise_control": 0.0, "lws": 0.0, "ircm": 0.0,
+        "roll_indicators_is_available": 1.0, "first_stage_ammo": 0.0, "crew_total": 5.0,
+        "crew_current": 5.0 if elapsed < 20 else 4.0, "crew_distance": 0.0, "gunner_state": 0.0,
+        "driver_state": 0.0, "stabilizer": 1.0, "gear_lamp_down": 0.0, "gear_lamp_up": 0.0,
+    }
+
+def _hud_damage(count: int, elapsed: float) -> list:
+    return [{"id": index + 1, "msg": f"Player (Bf 109 F-4) shot down Enemy {index} (Spitfire Mk Ia)",
+             "sender": "", "enemy": False, "mode": "", "time": int(elapsed)} for index in range(count)]
+
+def _map_objects(count: int = 40) -> list:
+    objects = []
+    for index in range(count):
+        objects.append({
+            "type": "ground_model" if index % 3 else "aircraft",
+            "color": "#fa0C00" if index % 2 else "#174DFF", "color[]": [250, 12, 0],
+            "blink": 0, "icon": "MediumTank" if index % 3 else "Fighter", "icon_bg": "none",
+            "x": round((index * 37 % 100) / 100, 4), "y": round((index * 53 % 100) / 100, 4),
+            "dx": 0.7, "dy": -0.7,
+        })
+    return objects
+
+class MockWarThunderServer:
+    """Threaded HTTP server imitating the War Thunder API on localhost"""
+    
+    def __init__(self, scenario: Optional[Scenario] = None, faults: Optional[Faults] = None,
+                 host: str = "127.0.0.1", port: int = 0, map_objects: int = 40, hud_messages: int = 1):
+        self.scenario = scenario or Scenario.load("full")
+        self.faults = faults or Faults()
+        # Размер тяжелых ответов: /map_obj.json и damage в /hudmsg
+        self.map_objects = map_objects
+        self.hud_messages = hud_messages
+        self.request_count = 0
+        self.path_counts = {}
+        self._counts_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _MockHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread = None
+    
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> "MockWarThunderServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+    
+    def reset_counters(self):
+        with self._counts_lock:
+            self.request_count = 0
+            self.path_counts = {}
+    
+    def count(self, path: str):
+        with self._counts_lock:
+            self.request_count += 1
+            self.path_counts[path] = self.path_counts.get(path, 0) + 1
+    
+    def stats(self) -> dict:
+        phase, _ = self.scenario.current()
+        with self._counts_lock:
+            return {"requests": self.request_count, "paths": dict(self.path_counts), "phase": phase["phase"]}
+    
+    def payload(self, path: str):
+        """Body for endpoint in current phase; None for unknown endpoints"""
+        if path == "/map_info.json":
+            self.scenario.on_map_request()
+        phase, elapsed = self.scenario.current()
+        kind = phase["phase"]
+        in_battle = kind in (LOADING, AIR, GROUND)
+        
+        if path == "/map_info.json":
+            if not in_battle:
+                return {"valid": False}
+            return {"grid_steps": [2400.0, 2400.0], "grid_zero": [-12000.0, 12000.0], "map_generation": 3,
+                    "map_max": [12000.0, 12000.0], "map_min": [-12000.0, -12000.0], "hud_type": 0, "valid": True}
+        if path == "/indicators":
+            if kind == LOADING:
+                return {"valid": True, "army": "dummy_plane", "type": "dummy_plane"}
+            if kind == AIR:
+                return _air_indicators(phase.get("vehicle", "bf-109f-4"), elapsed)
+            if kind == GROUND:
+                return _ground_indicators(phase.get("vehicle", "tankModels/ussr_t_34_1942"), elapsed)
+            return {"valid": False}
+        if path == "/state":
+            return _air_state(elapsed) if kind == AIR else {"valid": False}
+        if path == "/map_obj.json":
+            return _map_objects(self.map_objects) if in_battle else []
+        if path == "/mission.json":
+            return {"objectives": [{"primary": True, "status": "in_progress", "text": "Capture the point"}] if in_battle else [],
+                    "status": "running" if in_battle else "not_running"}
+        if path == "/hudmsg":
+            return {"events": [], "damage": _hud_damage(self.hud_messages, elapsed) if in_battle else []}
+        if path == "/gamechat":
+            return []
+        if path == "/map.img":
+            # Заголовок PNG и нули вместо карты - клиенту важен только размер
+            return b"\x89PNG\r\n\x1a\n" + bytes(64 * 1024) if in_battle else b""
+        return None
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Заголовки и тело уходят одним пакетом, иначе Nagle + delayed ACK добавляют ~40 мс
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+    
+    def do_GET(self):
+        mock = self.server.mock
+        faults = mock.faults
+        path = urlsplit(self.path).path
+        if path == STATS_PATH:
+            self._send(200, json.dumps(mock.stats()).encode("utf-8"), "application/json")
+            return
+        mock.count(path)
+        
+        delay = faults.delay()
+        if delay:
+            time.sleep(delay)
+        
+        if faults.roll(faults.drop):
+            # Обрыв соединения без ответа
+            self.close_connection = True
+            self.connection.close()
+            return
+        
+        if faults.roll(faults.errors):
+            self._send(500, b'{"error": "internal"}', "application/json")
+            return
+        
+        payload = mock.payload(path)
+        if payload is None:
+            self._send(404, b"Not found", "text/plain")
+            return
+        
+        if isinstance(payload, bytes):
+            self._send(200, payload, "image/png")
+            return
+        
+        body = json.dumps(payload).encode("utf-8")
+        if faults.roll(faults.malformed):
+            body = body[:max(len(body) // 2, 1)]
+        self._send(200, body, "application/json")
+    
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # Клиент прочитал сколько нужно и закрыл соединение
+            self.close_connection = True
+    
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", default="full", help="built-in scenario name or JSON file")
+    parser.add_argument("--clock", choices=("time", "requests"), help="override scenario clock")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8111)
+    parser.add_argument("--latency", type=float, default=0.0, help="delay per request, seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random +- delay, seconds")
+    parser.add_argument("--drop", type=float, default=0.0, help="probability to drop connection")
+    parser.add_argument("--malformed", type=float, default=0.0, help="probability of truncated JSON")
+    parser.add_argument("--errors", type=float, default=0.0, help="probability of HTTP 500")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--map-objects", type=int, default=40, help="objects in /map_obj.json")
+    parser.add_argument("--hud-messages", type=int, default=1, help="damage messages in /hudmsg")
+    args = parser.parse_args()
+    
+    faults = Faults(args.latency, args.jitter, args.drop, args.malformed, args.errors, args.seed)
+    server = MockWarThunderServer(Scenario.load(args.scenario, args.clock), faults, args.host, args.port,
+                                  args.map_objects, args.hud_messages).start()
+    print(f"Mock War Thunder API on {server.url} (scenario: {args.scenario}), Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(5)
+            phase, _ = server.scenario.current()
+            print(f"phase: {phase['phase']}, requests: {server.request_count}")
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# configs/i18n.py
+"""Per-language message catalogs compiled from configs/translations.py.
+
+Every language is compiled into configs/locales/<lang>.cat with the English
+fallback already merged in, so loading one language reads one small file and
+never imports the source with all languages. get_translator() returns a bound
+Translator, cached per language: t("key") is a single dict lookup.
+
+A catalog records a checksum of translations.py; when the source changes (or
+the file is missing) it is recompiled on first use. Rebuild all: py -m configs.i18n
+"""
+import logging
+import marshal
+import os
+import struct
+import threading
+import zlib
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CONFIGS_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_PATH = os.path.join(CONFIGS_DIR, "translations.py")
+LOCALES_DIR = os.path.join(CONFIGS_DIR, "locales")
+
+FALLBACK_LANG = "en"
+MAGIC = b"WTMC"
+VERSION = 1
+# magic, version, crc32 исходника translations.py
+_HEADER = struct.Struct("<4sHI")
+
+class Translator:
+    """Messages of one language; missing keys are returned as is"""
+    
+    __slots__ = ("lang", "messages")
+    
+    def __init__(self, lang: str, messages: Dict[str, str]):
+        self.lang = lang
+        self.messages = messages
+    
+    def __call__(self, key: str) -> str:
+        return self.messages.get(key, key)
+    
+    def format(self, key: str, **values) -> str:
+        """Message with {placeholders} filled in"""
+        return self.messages.get(key, key).format(**values)
+
+def _source_checksum() -> Optional[int]:
+    """crc32 of translations.py, None if it is not shipped (e.g. in the exe)"""
+    try:
+        with open(SOURCE_PATH, "rb") as f:
+            return zlib.crc32(f.read())
+    except OSError:
+        return None
+
+def catalog_path(lang: str) -> str:
+    return os.path.join(LOCALES_DIR, f"{lang}.cat")
+
+def compile_messages(translations: Dict[str, Dict[str, str]], lang: str) -> Dict[str, str]:
+    """Messages of lang with fallback language keys merged in"""
+    return {**translations.get(FALLBACK_LANG, {}), **translations.get(lang, {})}
+
+def write_catalog(lang: str, messages: Dict[str, str], checksum: int):
+    os.makedirs(LOCALES_DIR, exist_ok=True)
+    path = catalog_path(lang)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, checksum))
+        f.write(marshal.dumps(messages))
+    os.replace(temp_path, path)
+
+def read_catalog(lang: str, checksum: Optional[int]) -> Optional[Dict[str, str]]:
+    """Messages from the compiled file; None if it is missing, broken or stale"""
+    try:
+        with open(catalog_path(lang), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    
+    try:
+        magic, version, stored = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            return None
+        # Без исходника (exe) доверяем собранному файлу
+        if checksum is not None and stored != checksum:
+            return None
+        messages = marshal.loads(data[_HEADER.size:])
+    except (struct.error, ValueError, EOFError, TypeError):
+        return None
+    return messages if isinstance(messages, dict) else None
+
+def compile_catalogs() -> Dict[str, int]:
+    """Compile every language of translations.py; returns number of messages per language"""
+    from configs.translations import TRANSLATIONS
+    checksum = _source_checksum() or 0
+    counts = {}
+    for lang in TRANSLATIONS:
+        messages = compile_messages(TRANSLATIONS, lang)
+        write_catalog(lang, messages, checksum)
+        counts[lang] = len(messages)
+    return counts
+
+def _load(lang: str) -> Translator:
+    checksum = _source_checksum()
+    messages = read_catalog(lang, checksum)
+    if messages is not None:
+        return Translator(lang, messages)
+    
+    # Каталога нет или он устарел - собираем из исходника
+    from configs.translations import TRANSLATIONS
+    if lang not in TRANSLATIONS:
+        lang_messages = read_catalog(FALLBACK_LANG, checksum)
+        if lang_messages is None:
+            lang_messages = compile_messages(TRANSLATIONS, FALLBACK_LANG)
+        return Translator(lang, lang_messages)
+    
+    messages = compile_messages(TRANSLATIONS, lang)
+    if checksum is not None:
+        try:
+            write_catalog(lang, messages, checksum)
+        except OSError as e:
+            logger.debug(f"Cannot write message catalog for {lang}: {e}")
+    return Translator(lang, messages)
+
+_translators: Dict[str, Translator] = {}
+_lock = threading.Lock()
+
+def get_translator(lang: str) -> Translator:
+    """Bound translator of language, loaded on first use"""
+    translator = _translators.get(lang)
+    if translator is None:
+        with _lock:
+            translator = _translators.get(lang)
+            if translator is None:
+                translator = _translators[lang] = _load(lang)
+    return translator
+
+def loaded_languages() -> tuple:
+    return tuple(_translators)
+
+def main():
+    for lang, count in compile_catalogs().items():
+        print(f"{catalog_path(lang)}: {count} messages")
+
+if __name__ == "__main__":
+    main()
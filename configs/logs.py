@@ -2,7 +2,6 @@
 import logging
 import sys
 import os
-import json
 
 class ColoredFormatter(logging.Formatter):
     """Colored formatter for logs"""
@@ -49,8 +48,11 @@ class ColoredFormatter(logging.Formatter):
         
         return log_message
 
-def init_logger():
-    """Logger initialization with console output only"""
+def init_logger(lang: str = None):
+    """Logger initialization with console output only
+    
+    lang comes from already loaded settings; without it settings.json is read here.
+    """
     log_level = os.environ.get('LOG_LEVEL', 'INFO').upper()
     level = getattr(logging, log_level, logging.INFO)
     
@@ -71,28 +73,15 @@ def init_logger():
     # Выводим сообщение о инициализации логгера с переводом
     try:
         from configs.colors import colored_text
-        from configs.translations import get_translation
+        from configs.i18n import get_translator
         
-        # Получаем язык из настроек
-        lang = "en"  # значение по умолчанию
-        try:
-            # Определяем правильный путь к settings.json
-            if getattr(sys, 'frozen', False):
-                base_path = os.path.dirname(sys.executable)
-            else:
-                base_path = os.path.dirname(os.path.abspath(__file__))
-                base_path = os.path.dirname(base_path)  # Поднимаемся на уровень выше
-            
-            settings_path = os.path.join(base_path, "settings.json")
-            if os.path.exists(settings_path):
-                with open(settings_path, "r", encoding="utf-8") as f:
-                    settings_data = json.load(f)
-                    lang = settings_data.get("lang", "en")
-        except:
-            pass
+        # Получаем язык из настроек, если его не передали
+        if lang is None:
+            from configs.settings import init_presence_settings
+            lang = init_presence_settings().lang
         
         # Получаем перевод
-        message = get_translation(lang, "logger_initialized")
+        message = get_translator(lang)("logger_initialized")
         info_text = colored_text("INFO", "INFO")
         
         # Выводим напрямую в консоль, а не через logger
@@ -0,0 +1,238 @@
+# configs/metrics.py
+"""Per-stage timers and counters with bounded memory.
+
+Every stage keeps a fixed-bucket histogram, so memory does not grow with uptime.
+Values can be served in Prometheus text format (metrics_port in settings.json)
+and are printed as a summary on shutdown.
+"""
+import bisect
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+
+from configs import tracing
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "wtrp"
+
+# Границы корзин в секундах: от 50 мкс до 5 с
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+           0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class Histogram:
+    """Streaming histogram with fixed buckets"""
+    
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+    
+    def quantile(self, q: float) -> float:
+        """Estimate quantile by linear interpolation inside the bucket"""
+        with self._lock:
+            counts = list(self.counts)
+            total = self.count
+            maximum = self.max
+        if not total:
+            return 0.0
+        
+        rank = q * total
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else maximum
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, maximum)
+            seen += bucket_count
+        return maximum
+
+class _Timer:
+    """Context manager observing elapsed time into a histogram, and into a trace span if tracing is on"""
+    
+    __slots__ = ("histogram", "stage", "endpoint", "started")
+    
+    def __init__(self, histogram: Histogram, stage: str, endpoint: str):
+        self.histogram = histogram
+        self.stage = stage
+        self.endpoint = endpoint
+        self.started = 0.0
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.started
+        self.histogram.observe(duration)
+        if tracing.is_enabled():
+            tracing.add_span(self.stage, self.started, duration, {"endpoint": self.endpoint} if self.endpoint else None)
+        return False
+
+# Ключ - (stage, endpoint); набор стадий фиксирован, поэтому число гистограмм ограничено
+_stages: Dict[Tuple[str, str], Histogram] = {}
+_counters: Dict[Tuple[str, str], int] = {}
+_collectors = []
+_registry_lock = threading.Lock()
+_server = None
+
+def stage_histogram(stage: str, endpoint: str = "") -> Histogram:
+    """Histogram of a stage, created on first use"""
+    key = (stage, endpoint)
+    histogram = _stages.get(key)
+    if histogram is None:
+        with _registry_lock:
+            histogram = _stages.setdefault(key, Histogram())
+    return histogram
+
+def timer(stage: str, endpoint: str = "") -> _Timer:
+    """Time a stage: with metrics.timer("parse", "/indicators"): ..."""
+    return _Timer(stage_histogram(stage, endpoint), stage, endpoint)
+
+def observe(stage: str, seconds: float, endpoint: str = ""):
+    """Record an already measured duration"""
+    stage_histogram(stage, endpoint).observe(seconds)
+
+def inc(name: str, label: str = "", value: int = 1):
+    """Increase counter"""
+    key = (name, label)
+    with _registry_lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def register_collector(name: str, help_text: str, label: str, collect: Callable[[], Dict[str, int]]):
+    """Expose counters owned by another object, e.g. presence publisher stats"""
+    _collectors.append((name, help_text, label, collect))
+
+def reset():
+    """Forget all observations"""
+    with _registry_lock:
+        _stages.clear()
+        _counters.clear()
+
+def _label_text(labels: Dict[str, str]) -> str:
+    parts = [f'{key}="{value}"' for key, value in labels.items() if value]
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def render_prometheus() -> str:
+    """All metrics in Prometheus text exposition format"""
+    lines = [
+        f"# HELP {PREFIX}_stage_seconds Duration of update loop stages",
+        f"# TYPE {PREFIX}_stage_seconds histogram",
+    ]
+    for (stage, endpoint), histogram in sorted(_stages.items()):
+        with histogram._lock:
+            counts = list(histogram.counts)
+            count, total = histogram.count, histogram.sum
+        
+        labels = {"stage": stage, "endpoint": endpoint}
+        cumulative = 0
+        for bound, bucket_count in zip(histogram.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{PREFIX}_stage_seconds_bucket{_label_text({**labels, 'le': le})} {cumulative}")
+        lines.append(f"{PREFIX}_stage_seconds_sum{_label_text(labels)} {total}")
+        lines.append(f"{PREFIX}_stage_seconds_count{_label_text(labels)} {count}")
+    
+    with _registry_lock:
+        counters = dict(_counters)
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+        for (counter_name, label), value in sorted(counters.items()):
+            if counter_name == name:
+                lines.append(f"{PREFIX}_{name}_total{_label_text({'kind': label})} {value}")
+    
+    for name, help_text, label, collect in _collectors:
+        try:
+            values = collect()
+        except Exception as e:
+            logger.debug(f"Metrics collector {name} failed: {e}")
+            continue
+        lines.append(f"# HELP {PREFIX}_{name}_total {help_text}")
+        lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+        for key, value in values.items():
+            lines.append(f"{PREFIX}_{name}_total{_label_text({label: key})} {value}")
+    
+    return "\n".join(lines) + "\n"
+
+def stage_summary() -> Dict[str, dict]:
+    """Count, p50, p95 and max in milliseconds per stage"""
+    summary = {}
+    for (stage, endpoint), histogram in sorted(_stages.items()):
+        if not histogram.count:
+            continue
+        summary[f"{stage} {endpoint}".strip()] = {
+            "count": histogram.count,
+            "p50_ms": round(histogram.quantile(0.5) * 1000, 3),
+            "p95_ms": round(histogram.quantile(0.95) * 1000, 3),
+            "max_ms": round(histogram.max * 1000, 3),
+        }
+    return summary
+
+def summary_lines() -> list:
+    """One line per stage for the shutdown summary"""
+    return [
+        f"{name:<24} n={values['count']:<6} p50={values['p50_ms']:8.3f} ms  "
+        f"p95={values['p95_ms']:8.3f} ms  max={values['max_ms']:8.3f} ms"
+        for name, values in stage_summary().items()
+    ]
+
+def _create_server(port: int):
+    """HTTP server for /metrics; http.server is imported only when the endpoint is on"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+
+def start_metrics_server(port: int) -> Optional["ThreadingHTTPServer"]:
+    """Serve /metrics on 127.0.0.1:port in a daemon thread; port 0 disables the endpoint"""
+    global _server
+    if not port or _server is not None:
+        return _server
+    
+    try:
+        _server = _create_server(port)
+    except (OSError, OverflowError) as e:
+        # OverflowError - порт вне 0..65535
+        logger.error(f"Cannot start metrics endpoint on port {port}: {e}")
+        return None
+    
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+def stop_metrics_server():
+    global _server
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
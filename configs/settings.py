@@ -3,69 +3,151 @@ import json
 import logging
 import sys
 import os
-from dataclasses import dataclass
-import requests
+import time
+from typing import Callable, Optional
+
+from discord.states import BASIC_STATE_DICT
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Поле, тип и значение по умолчанию; порядок совпадает с settings.json
+SETTINGS_FIELDS = (
+    ("refresh_time", int, 7),
+    ("large_img", str, "main_logo"),
+    ("alt_presence", bool, False),
+    ("lang", str, "en"),
+    ("vehicle_details", bool, True),
+    ("left_tank_state", str, "speed"),
+    ("right_tank_state", str, "crew"),
+    ("left_air_state", str, "spd"),
+    ("right_air_state", str, "alt"),
+    ("refresh_launching", int, 15),
+    ("refresh_hangar", int, 10),
+    ("refresh_loading", int, 3),
+    ("refresh_battle", int, 5),
+    ("http_client", str, "requests"),
+    ("standby_min_interval", int, 5),
+    ("standby_max_interval", int, 60),
+    ("metrics_port", int, 0),
+    ("update_url", str, "https://api.github.com/repos/MoTyaZ1/WarTunder-DiscordRichPresence/releases/latest"),
+)
+
+# Интервалы опроса (секунды): ноль или отрицательное значение превратило бы цикл в непрерывный опрос
+INTERVAL_FIELDS = frozenset((
+    "refresh_time", "refresh_launching", "refresh_hangar", "refresh_loading", "refresh_battle",
+    "standby_min_interval", "standby_max_interval",
+))
+MIN_INTERVAL = 0.5
+
+# Допустимые номера TCP-порта; 0 выключает /metrics
+PORT_RANGE = range(0, 65536)
+
+# Языки, для которых есть подписи статусов
+LANGUAGES = tuple(BASIC_STATE_DICT["launching"])
+
 class PresenceSettings:
-    """Settings for Discord presence"""
-    refresh_time: int
-    large_img: str
-    alt_presence: bool
-    lang: str
-    vehicle_details: bool
-    left_tank_state: str
-    right_tank_state: str
-    left_air_state: str
-    right_air_state: str
+    """Settings for Discord presence
+    
+    Immutable: a changed settings.json produces a new object (see SettingsWatcher),
+    so code holding a reference never sees half-applied values. Use replace()
+    to derive a modified copy.
+    """
+    
+    __slots__ = tuple(name for name, _, _ in SETTINGS_FIELDS)
+    
+    def __init__(self, **values):
+        for name, _, default in SETTINGS_FIELDS:
+            object.__setattr__(self, name, values.pop(name, default))
+        if values:
+            raise TypeError(f"Unknown settings: {', '.join(sorted(values))}")
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("PresenceSettings is immutable, use replace()")
+    
+    def __delattr__(self, name):
+        raise AttributeError("PresenceSettings is immutable")
+    
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    def replace(self, **changes) -> "PresenceSettings":
+        """Copy with some fields changed"""
+        return PresenceSettings(**{**self.as_dict(), **changes})
+    
+    def changed_fields(self, other: "PresenceSettings") -> frozenset:
+        """Names of fields that differ from other"""
+        return frozenset(name for name in self.__slots__ if getattr(self, name) != getattr(other, name))
+    
+    def __eq__(self, other):
+        if not isinstance(other, PresenceSettings):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+    
+    def __hash__(self):
+        return hash(tuple(getattr(self, name) for name in self.__slots__))
+    
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"PresenceSettings({values})"
 
 def get_default_settings() -> PresenceSettings:
     """Get default settings"""
-    return PresenceSettings(
-        refresh_time=7,
-        large_img="main_logo",
-        alt_presence=False,
-        lang="en",
-        vehicle_details=True,
-        left_tank_state="speed",
-        right_tank_state="crew",
-        left_air_state="spd",
-        right_air_state="alt"
-    )
+    return PresenceSettings()
 
-def init_presence_settings(base_path: str = None) -> PresenceSettings:
-    """Initialize presence settings"""
+def settings_from_dict(data: dict, fallback: Optional[PresenceSettings] = None) -> PresenceSettings:
+    """Build settings from parsed settings.json
+    
+    Wrong types, too short intervals, ports out of range and unknown languages fall back to the value
+    of fallback (the settings in use, on hot reload) or to the default.
+    """
+    values = {}
+    for name, kind, default in SETTINGS_FIELDS:
+        value = data.get(name, default)
+        # Неверное значение заменяется текущим, отсутствующее - значением по умолчанию
+        if fallback is not None:
+            default = getattr(fallback, name)
+        # bool - подкласс int, поэтому true в числовом поле тоже считается ошибкой; дробные интервалы допустимы
+        if kind is int and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            logger.warning(f"settings.json: {name} must be a number, using {default}")
+            value = default
+        elif name in INTERVAL_FIELDS and not value >= MIN_INTERVAL:
+            logger.warning(f"settings.json: {name} must be at least {MIN_INTERVAL} s, using {default}")
+            value = default
+        elif name == "metrics_port" and value not in PORT_RANGE:
+            logger.warning(f"settings.json: metrics_port must be from 0 to 65535, using {default}")
+            value = default
+        elif name == "lang" and value not in LANGUAGES:
+            logger.warning(f"settings.json: lang must be one of {', '.join(LANGUAGES)}, using {default}")
+            value = default
+        elif kind is bool and not isinstance(value, bool):
+            logger.warning(f"settings.json: {name} must be true or false, using {default}")
+            value = default
+        elif kind is str and not isinstance(value, str):
+            # В README "false" записан строкой, но false без кавычек тоже встречается
+            value = str(value).lower() if isinstance(value, bool) else default
+        values[name] = value
+    return PresenceSettings(**values)
+
+def get_settings_path(base_path: str = None) -> str:
+    """Path of settings.json next to the exe or in the project root"""
+    if base_path is None:
+        if getattr(sys, 'frozen', False):
+            base_path = os.path.dirname(sys.executable)
+        else:
+            base_path = os.path.dirname(os.path.abspath(__file__))
+            # Поднимаемся на уровень выше (из configs в корень)
+            base_path = os.path.dirname(base_path)
+    return os.path.join(base_path, "settings.json")
+
+def load_settings(settings_path: str) -> PresenceSettings:
+    """Read settings.json once; defaults if it is missing or broken"""
     try:
-        if base_path is None:
-            # Определяем базовый путь
-            if getattr(sys, 'frozen', False):
-                base_path = os.path.dirname(sys.executable)
-            else:
-                base_path = os.path.dirname(os.path.abspath(__file__))
-                # Поднимаемся на уровень выше (из configs в корень)
-                base_path = os.path.dirname(base_path)
-        
-        settings_path = os.path.join(base_path, "settings.json")
-        
         if not os.path.exists(settings_path):
             logger.warning("settings.json not found, using default settings")
             return get_default_settings()
         
         with open(settings_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return PresenceSettings(
-                refresh_time=data.get("refresh_time", 7),
-                large_img=data.get("large_img", "main_logo"),
-                alt_presence=data.get("alt_presence", False),
-                lang=data.get("lang", "en"),
-                vehicle_details=data.get("vehicle_details", True),
-                left_tank_state=data.get("left_tank_state", "speed"),
-                right_tank_state=data.get("right_tank_state", "crew"),
-                left_air_state=data.get("left_air_state", "spd"),
-                right_air_state=data.get("right_air_state", "alt")
-            )
+            return settings_from_dict(json.load(f))
     except json.JSONDecodeError as e:
         logger.error(f"Error parsing settings.json: {e}")
         return get_default_settings()
@@ -73,8 +155,84 @@ def init_presence_settings(base_path: str = None) -> PresenceSettings:
         logger.error(f"Error loading settings: {e}")
         return get_default_settings()
 
-def init_http_client() -> requests.Session:
-    """Initialize HTTP client"""
+def init_presence_settings(base_path: str = None) -> PresenceSettings:
+    """Initialize presence settings"""
+    return load_settings(get_settings_path(base_path))
+
+class SettingsWatcher:
+    """Detects edits of settings.json by mtime and size, without reading the file
+    
+    poll() costs one os.stat() at most every interval seconds. When the file
+    changed and parses, it returns the new settings object; the caller swaps
+    its reference, which is atomic for other threads reading it, and calls
+    accept() once the settings are applied. Until then the same edit is
+    returned again by the next poll().
+    """
+    
+    def __init__(self, settings_path: str, current: PresenceSettings, interval: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.path = settings_path
+        self.current = current
+        self.interval = interval
+        self._clock = clock
+        self._stamp = self._stat()
+        self._pending_stamp = None
+        self._checked = self._clock()
+    
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def poll(self) -> Optional[PresenceSettings]:
+        """New settings if the file changed since the last call, else None"""
+        now = self._clock()
+        if now - self._checked < self.interval:
+            return None
+        self._checked = now
+        
+        stamp = self._stat()
+        if stamp == self._stamp or stamp is None:
+            return None
+        
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            # Файл могут сохранять прямо сейчас - попробуем при следующем изменении
+            logger.error(f"Error reading settings.json: {e}")
+            self._stamp = stamp
+            return None
+        
+        settings = settings_from_dict(data, self.current)
+        if settings == self.current:
+            self._stamp = stamp
+            return None
+        # Изменение считается принятым только после accept()
+        self._pending_stamp = stamp
+        return settings
+    
+    def accept(self, settings: PresenceSettings):
+        """Mark settings returned by poll() as applied"""
+        self.current = settings
+        if self._pending_stamp is not None:
+            self._stamp = self._pending_stamp
+            self._pending_stamp = None
+
+def init_http_client(kind: str = "requests"):
+    """Initialize HTTP client
+    
+    kind: "requests" - requests.Session, "stdlib" - lightweight keep-alive client
+    with request pipelining (game.http_client.LocalHTTPClient).
+    """
+    if kind == "stdlib":
+        from game.http_client import LocalHTTPClient
+        return LocalHTTPClient()
+    
+    # requests загружается, только если выбран этот клиент
+    import requests
     session = requests.Session()
     session.headers.update({
         "User-Agent": "WarThunder-Rich-Presence/1.0",
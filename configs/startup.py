@@ -0,0 +1,120 @@
+# configs/startup.py
+"""Startup timeline for py main.py --startup-report.
+
+ImportProfiler sits first in sys.meta_path and times the execution of every
+module imported after install(): cumulative time and self time without
+nested imports, like python -X importtime. mark() stores named moments
+counted from STARTED; the first presence sent to Discord is one of them.
+"""
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+# Начало отсчета: модуль импортируется первым в main.py
+STARTED = time.perf_counter()
+
+FIRST_PRESENCE = "first_presence"
+
+_marks: Dict[str, float] = {}
+_callbacks: Dict[str, List[Callable[[], None]]] = {}
+_lock = threading.Lock()
+
+def mark(name: str) -> bool:
+    """Remember the first time name happened; returns False if it was already marked"""
+    with _lock:
+        if name in _marks:
+            return False
+        _marks[name] = time.perf_counter() - STARTED
+        callbacks = _callbacks.pop(name, ())
+    for callback in callbacks:
+        callback()
+    return True
+
+def on_mark(name: str, callback: Callable[[], None]):
+    """Call callback once name is marked (at once if it already is)"""
+    with _lock:
+        if name not in _marks:
+            _callbacks.setdefault(name, []).append(callback)
+            return
+    callback()
+
+def elapsed(name: str) -> Optional[float]:
+    """Seconds from start to the mark, None if it has not happened"""
+    return _marks.get(name)
+
+def marks() -> Dict[str, float]:
+    return dict(_marks)
+
+class ImportRecord:
+    __slots__ = ("name", "depth", "cumulative", "self_time")
+    
+    def __init__(self, name: str, depth: int, cumulative: float, self_time: float):
+        self.name = name
+        self.depth = depth
+        self.cumulative = cumulative
+        self.self_time = self_time
+
+class ImportProfiler:
+    """Meta path finder that times module execution of the specs other finders return"""
+    
+    def __init__(self):
+        self.records: List[ImportRecord] = []
+        # Время вложенных импортов для каждого уровня стека, у каждого потока свой стек
+        self._local = threading.local()
+    
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+    
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+    
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, "find_spec", None)
+            spec = find_spec(name, path, target) if find_spec is not None else None
+            if spec is not None:
+                break
+        else:
+            return None
+        
+        loader = spec.loader
+        # Встроенные модули грузятся общим классом-загрузчиком - его не трогаем
+        if loader is not None and not isinstance(loader, type) and hasattr(loader, "exec_module"):
+            loader.exec_module = self._timed(name, loader.exec_module)
+        return spec
+    
+    def _timed(self, name: str, exec_module):
+        def timed_exec_module(module):
+            stack = self._local.__dict__.setdefault("children", [])
+            depth = len(stack)
+            stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                cumulative = time.perf_counter() - started
+                nested = stack.pop()
+                if stack:
+                    stack[-1] += cumulative
+                self.records.append(ImportRecord(name, depth, cumulative, cumulative - nested))
+        return timed_exec_module
+    
+    def report_lines(self, limit: int = 25) -> List[str]:
+        """Slowest modules by self time, with the total of top-level imports"""
+        total = sum(record.cumulative for record in self.records if record.depth == 0)
+        lines = [f"imports: {len(self.records)} modules, {total * 1000:.1f} ms"]
+        for record in sorted(self.records, key=lambda record: record.self_time, reverse=True)[:limit]:
+            lines.append(f"  {record.self_time * 1000:8.2f} ms self {record.cumulative * 1000:8.2f} ms total  {record.name}")
+        return lines
+
+def report_lines(profiler: Optional[ImportProfiler] = None) -> List[str]:
+    """Import table (if profiled) and the marks in the order they happened"""
+    lines = profiler.report_lines() if profiler is not None else []
+    for name, seconds in sorted(_marks.items(), key=lambda item: item[1]):
+        lines.append(f"{name:<24} {seconds * 1000:9.1f} ms")
+    return lines
@@ -0,0 +1,129 @@
+# configs/tracing.py
+"""Spans of the update loop in Chrome trace-event format.
+
+Usage: py main.py --trace trace.json, then open the file in chrome://tracing or ui.perfetto.dev.
+Spans go into a ring buffer, so a long session keeps only the latest ones.
+While tracing is off span() returns a shared no-op object and nothing is recorded.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+DEFAULT_CAPACITY = 200_000
+
+_buffer: Optional[deque] = None
+_paused: Optional[deque] = None
+_origin = time.perf_counter()
+_thread_names = {}
+
+def enable(capacity: int = DEFAULT_CAPACITY):
+    """Start recording spans, keeping at most capacity latest ones"""
+    global _buffer
+    _buffer = deque(maxlen=capacity)
+
+def disable():
+    global _buffer, _paused
+    _buffer = None
+    _paused = None
+
+def pause():
+    """Stop recording but keep recorded spans for export"""
+    global _buffer, _paused
+    if _buffer is not None:
+        _paused, _buffer = _buffer, None
+
+def resume():
+    global _buffer, _paused
+    if _paused is not None:
+        _buffer, _paused = _paused, None
+
+def is_enabled() -> bool:
+    return _buffer is not None
+
+def add_span(name: str, started: float, duration: float, args: Optional[dict] = None):
+    """Record finished span; started and duration come from time.perf_counter()"""
+    buffer = _buffer
+    if buffer is None:
+        return
+    thread = threading.current_thread()
+    if thread.ident not in _thread_names:
+        _thread_names[thread.ident] = thread.name
+    buffer.append((name, started, duration, thread.ident, args))
+
+class _Span:
+    """Context manager recording one span"""
+    
+    __slots__ = ("name", "args", "started")
+    
+    def __init__(self, name: str, args: Optional[dict]):
+        self.name = name
+        self.args = args
+        self.started = 0.0
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        add_span(self.name, self.started, time.perf_counter() - self.started, self.args)
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def span(name: str, **args):
+    """with tracing.span("poll"): ... - no-op while tracing is disabled"""
+    if _buffer is None:
+        return _NULL_SPAN
+    return _Span(name, args or None)
+
+def sleep(seconds: float, reason: str):
+    """time.sleep() that shows up in the trace as a span"""
+    if _buffer is None:
+        time.sleep(seconds)
+        return
+    with _Span("sleep", {"reason": reason, "seconds": round(seconds, 3)}):
+        time.sleep(seconds)
+
+def wait(event, seconds: float, reason: str) -> bool:
+    """event.wait() that shows up in the trace as a span; returns True if the event was set"""
+    if _buffer is None:
+        return event.wait(seconds)
+    with _Span("sleep", {"reason": reason, "seconds": round(seconds, 3)}):
+        return event.wait(seconds)
+
+def export(path: str) -> int:
+    """Write buffered spans as Chrome trace JSON; returns number of spans"""
+    spans = list(_buffer if _buffer is not None else _paused or ())
+    pid = os.getpid()
+    events = [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+        for tid, name in _thread_names.items()
+    ]
+    for name, started, duration, tid, args in spans:
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": round((started - _origin) * 1_000_000, 3),
+            "dur": round(duration * 1_000_000, 3),
+            "pid": pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        events.append(event)
+    
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return len(spans)
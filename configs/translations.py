@@ -1,4 +1,5 @@
 # configs/translations.py
+# Исходник переводов: после правок каталоги configs/locales/*.cat пересобираются сами (или py -m configs.i18n)
 TRANSLATIONS = {
     "ru": {
         # Main messages
@@ -8,7 +9,7 @@ TRANSLATIONS = {
         "file_not_found": "Файл settings.json не найден, используются настройки по умолчанию",
         "press_enter": "Нажмите Enter для выхода...",
         "program_started": "программа запущена",
-        "program_will_try": "Программа будет пытаться подключиться к War Thunder 16 раз с задержкой 10 секунд между попытками. Если игра не запущена - программа завершится.",
+        "program_will_try": "Если War Thunder не запущен, программа перейдет в режим ожидания и продолжит работу, как только игра запустится.",
         
         # Discord messages
         "discord_connecting": "Подключение попытка #",
@@ -25,6 +26,7 @@ TRANSLATIONS = {
         "discord_attempts": "попыток",
         "discord_status_updated": "Статус обновлен",
         "app_id": "ID приложения",
+        "presence_stats": "Обновлений статуса отправлено: {sent}, пропущено без изменений: {skipped}, объединено: {coalesced}, отложено лимитом Discord: {deferred}",
         
         # API messages
         "api_unavailable": "War Thunder API недоступен",
@@ -33,9 +35,16 @@ TRANSLATIONS = {
         "max_attempts": "Максимальное количество попыток подключения к War Thunder достигнуто",
         "wt_not_running": "War Thunder не запущен или нет подключения к War Thunder API",
         "connection_error": "Ошибка подключения",
-        "starting_update_loop": "Начало цикла обновления статуса (интервал: {interval}s)",
-        "attempt_waiting": "Попытка #{attempt}: ожидание {seconds} секунд...",
+        "starting_update_loop": "Начало цикла обновления статуса (интервалы: запуск {launching}s, ангар {hangar}s, загрузка {loading}s, бой {battle}s)",
+        "circuit_open": "{endpoint} не отвечает, следующая попытка через {seconds} с",
         "max_attempts_reached": "Достигнуто максимальное количество попыток подключения к War Thunder",
+        "wt_standby": "War Thunder не запущен, ожидание запуска игры...",
+        "wt_detected": "War Thunder обнаружен, обновление статуса возобновлено",
+        "metrics_summary": "Время этапов цикла обновления:",
+        "metrics_started": "Метрики доступны по адресу",
+        "first_presence_time": "Первый статус отправлен через {ms} мс после запуска",
+        "settings_reloaded": "settings.json изменен, применены настройки: {fields}",
+        "settings_restart_required": "Изменение {fields} применится после перезапуска",
         
         # Handler debug messages\
         "error_api_data": "Не удалось получить данных от API WT",
@@ -60,7 +69,7 @@ TRANSLATIONS = {
         "file_not_found": "settings.json file not found, using default settings",
         "press_enter": "Press Enter to exit...",
         "program_started": "program started",
-        "program_will_try": "The program will try to connect to War Thunder 16 times with 10 seconds delay between attempts. If the game is not running - the program will exit.",
+        "program_will_try": "If War Thunder is not running, the program switches to standby and resumes as soon as the game starts.",
         
         # Discord messages
         "discord_connecting": "Connecting attempt #",
@@ -77,6 +86,7 @@ TRANSLATIONS = {
         "discord_attempts": "attempts",
         "discord_status_updated": "Status updated",
         "app_id": "Application ID",
+        "presence_stats": "Status updates sent: {sent}, skipped as unchanged: {skipped}, coalesced: {coalesced}, deferred by Discord rate limit: {deferred}",
         
         # API messages
         "api_unavailable": "War Thunder API unavailable",
@@ -85,9 +95,16 @@ TRANSLATIONS = {
         "max_attempts": "Max connection attempts to War Thunder reached",
         "wt_not_running": "War Thunder not running or no connection to War Thunder API",
         "connection_error": "Connection error",
-        "starting_update_loop": "Starting status update loop (interval: {interval}s)",
-        "attempt_waiting": "Attempt #{attempt}: waiting {seconds} seconds...",
+        "starting_update_loop": "Starting status update loop (intervals: launching {launching}s, hangar {hangar}s, loading {loading}s, battle {battle}s)",
+        "circuit_open": "{endpoint} is not responding, next attempt in {seconds} s",
         "max_attempts_reached": "Max connection attempts to War Thunder reached",
+        "wt_standby": "War Thunder is not running, waiting for the game to start...",
+        "wt_detected": "War Thunder detected, status updates resumed",
+        "metrics_summary": "Update loop stage timings:",
+        "metrics_started": "Metrics are available at",
+        "first_presence_time": "First presence sent {ms} ms after launch",
+        "settings_reloaded": "settings.json changed, applied: {fields}",
+        "settings_restart_required": "Changing {fields} takes effect after a restart",
         
         # Logger messages
         "logger_initialized": "Logger initialized",
@@ -103,8 +120,9 @@ TRANSLATIONS = {
 }
 
 def get_translation(lang: str, key: str) -> str:
-    """Get translation for specific language"""
-    if lang in TRANSLATIONS and key in TRANSLATIONS[lang]:
-        return TRANSLATIONS[lang][key]
-    # Fallback to English
-    return TRANSLATIONS["en"].get(key, key)
\ No newline at end of file
+    """Get translation for specific language
+    
+    Kept for compatibility; new code uses configs.i18n.get_translator(lang).
+    """
+    from configs.i18n import get_translator
+    return get_translator(lang)(key)
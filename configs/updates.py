@@ -0,0 +1,167 @@
+# configs/updates.py
+"""Update check against the latest GitHub release, off the startup path.
+
+The result is kept in update_cache.json next to settings.json. Within
+CACHE_TTL a launch uses it without touching the network; after that the
+release is requested with the stored ETag, and an unchanged release costs a
+304 response without a body (it does not count against the GitHub rate limit).
+
+The endpoint is the update_url setting, so it can point at a local server;
+an empty update_url turns the check off.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+CURRENT_VERSION = "v1.3.1"
+CACHE_FILE = "update_cache.json"
+# Как долго доверять сохраненному ответу (секунды)
+CACHE_TTL = 6 * 60 * 60
+REQUEST_TIMEOUT = 10
+
+# Итог проверки
+UP_TO_DATE = "up_to_date"
+AVAILABLE = "available"
+NO_INTERNET = "no_internet"
+FAILED = "failed"
+
+class UpdateInfo:
+    """Outcome of one check"""
+    
+    __slots__ = ("status", "current_version", "latest_version", "html_url", "cached")
+    
+    def __init__(self, status: str, current_version: str, latest_version: str = "",
+                 html_url: str = "", cached: bool = False):
+        self.status = status
+        self.current_version = current_version
+        self.latest_version = latest_version
+        self.html_url = html_url
+        # True, если ответ взят из update_cache.json без запроса
+        self.cached = cached
+
+def read_current_version(base_path: str) -> str:
+    """Version from version.txt, CURRENT_VERSION if it is missing"""
+    try:
+        with open(os.path.join(base_path, "version.txt"), "r", encoding="utf-8") as f:
+            return f.read().strip() or CURRENT_VERSION
+    except OSError:
+        return CURRENT_VERSION
+
+def _read_cache(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def _write_cache(path: str, data: dict):
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.debug(f"Cannot write {path}: {e}")
+
+def _info(cache: dict, current_version: str, cached: bool) -> UpdateInfo:
+    latest = cache.get("tag_name", "")
+    status = AVAILABLE if latest and latest != current_version else UP_TO_DATE
+    return UpdateInfo(status, current_version, latest, cache.get("html_url", ""), cached)
+
+def check_for_updates(url: str, cache_path: str, current_version: str,
+                      ttl: float = CACHE_TTL, timeout: float = REQUEST_TIMEOUT) -> UpdateInfo:
+    """Latest release from cache while it is fresh, otherwise from url"""
+    cache = _read_cache(cache_path)
+    # Кэш от другого адреса не подходит (например, после смены update_url)
+    if cache.get("url") != url:
+        cache = {}
+    
+    now = time.time()
+    if cache and 0 <= now - cache.get("checked", 0) < ttl:
+        return _info(cache, current_version, cached=True)
+    
+    # urllib тянет http.client и ssl - загружаем в фоновом потоке, только когда нужен запрос
+    import urllib.error
+    import urllib.request
+    request = urllib.request.Request(url, headers={"Accept": "application/vnd.github+json"})
+    if cache.get("etag"):
+        request.add_header("If-None-Match", cache["etag"])
+    
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            release = json.loads(response.read())
+            etag = response.headers.get("ETag", "")
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cache:
+            # Релиз не изменился - продлеваем кэш
+            cache["checked"] = now
+            _write_cache(cache_path, cache)
+            return _info(cache, current_version, cached=True)
+        logger.debug(f"Update check failed: HTTP {e.code}")
+        return UpdateInfo(FAILED, current_version)
+    except urllib.error.URLError as e:
+        logger.debug(f"Update check failed: {e.reason}")
+        return UpdateInfo(NO_INTERNET, current_version)
+    except (OSError, ValueError) as e:
+        logger.debug(f"Update check failed: {e}")
+        return UpdateInfo(FAILED, current_version)
+    
+    if not isinstance(release, dict):
+        return UpdateInfo(FAILED, current_version)
+    cache = {
+        "url": url,
+        "checked": now,
+        "etag": etag,
+        "tag_name": release.get("tag_name", ""),
+        "html_url": release.get("html_url", ""),
+    }
+    _write_cache(cache_path, cache)
+    return _info(cache, current_version, cached=False)
+
+def print_update_info(info: UpdateInfo, lang: str):
+    """Console lines for the result, as printed before the check moved to the background"""
+    from configs.colors import colored_text
+    from configs.i18n import get_translator
+    t = get_translator(lang)
+    update_text = colored_text("UPDATE", "UPDATE")
+    
+    if info.status == AVAILABLE:
+        print(f"{update_text} - {t('update_current_version')}: {info.current_version}")
+        print(f"{update_text} - {t('update_latest_version')}: {info.latest_version}")
+        print(f"{update_text} - {t('update_download')}: {info.html_url}")
+    elif info.status == UP_TO_DATE:
+        print(f"{colored_text('SUCCESS', 'SUCCESS')} - {t('update_current_version')}: {info.current_version}")
+    elif info.status == NO_INTERNET:
+        print(f"{update_text} - {t('update_no_internet')}")
+    else:
+        print(f"{update_text} - {t('update_check_failed')}")
+
+def start_update_check(url: str, base_path: str, lang: str,
+                       on_result: Optional[Callable[[UpdateInfo], None]] = None) -> Optional[threading.Thread]:
+    """Run the check in a daemon thread; the result is printed (or passed to on_result)
+    
+    Returns None when update_url is empty.
+    """
+    if not url:
+        return None
+    
+    def worker():
+        try:
+            info = check_for_updates(url, os.path.join(base_path, CACHE_FILE), read_current_version(base_path))
+        except Exception as e:
+            logger.debug(f"Update check failed: {e}")
+            info = UpdateInfo(FAILED, read_current_version(base_path))
+        if on_result is not None:
+            on_result(info)
+        else:
+            print_update_info(info, lang)
+    
+    thread = threading.Thread(target=worker, name="update-check", daemon=True)
+    thread.start()
+    return thread
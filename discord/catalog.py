@@ -0,0 +1,270 @@
+# discord/catalog.py
+"""Vehicle name catalog as a prebuilt binary index read through mmap.
+
+discord/common.py holds every vehicle as a nested dict, and importing it
+builds all of them before the first presence. The catalog packs the same
+data into discord/vehicles.bin: a sorted table of "army/code" keys with
+offsets into one UTF-8 string blob. Only the pages touched by lookups are
+ever read, and the file is opened on the first lookup, i.e. in the first battle.
+
+Rebuild after a game patch: py -m discord.catalog
+The new file replaces vehicles.bin at once; if the running program holds it
+open (Windows), it is left as vehicles.bin.new and swapped in on the next lookup.
+Without the file, lookups fall back to the dicts of discord/common.py.
+"""
+import argparse
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vehicles.bin")
+PENDING_SUFFIX = ".new"
+
+MAGIC = b"WTVC"
+VERSION = 1
+# magic, version, число языков, число записей
+_HEADER = struct.Struct("<4sHHI")
+_LANG = struct.Struct("<4s")
+# Смещение и длина строки в блоке строк
+_STRING = struct.Struct("<IH")
+
+# Как часто проверять, не появился ли новый файл (секунды)
+REFRESH_INTERVAL = 5.0
+
+def _entries(air: Dict[str, dict], ground: Dict[str, dict]) -> Iterable[Tuple[bytes, dict]]:
+    for army, vehicles in (("air", air), ("ground", ground)):
+        for code, names in vehicles.items():
+            yield f"{army}/{code}".encode("utf-8"), names
+
+def pack_catalog(air: Dict[str, dict], ground: Dict[str, dict], langs: Tuple[str, ...] = ("ru", "en")) -> bytes:
+    """Serialize {code: {lang: name}} dicts of both armies into catalog bytes"""
+    entries = sorted(_entries(air, ground), key=lambda entry: entry[0])
+    blob = bytearray()
+    strings = {}
+    
+    def add(value: bytes) -> Tuple[int, int]:
+        # Одинаковые строки (часто ru == en) хранятся один раз
+        if value not in strings:
+            strings[value] = len(blob)
+            blob.extend(value)
+        return strings[value], len(value)
+    
+    index = bytearray()
+    for key, names in entries:
+        index += _STRING.pack(*add(key))
+        for lang in langs:
+            index += _STRING.pack(*add(names.get(lang, "").encode("utf-8")))
+    
+    header = _HEADER.pack(MAGIC, VERSION, len(langs), len(entries))
+    header += b"".join(_LANG.pack(lang.encode("ascii")) for lang in langs)
+    return header + bytes(index) + bytes(blob)
+
+def build_catalog(path: str = CATALOG_PATH) -> str:
+    """Write catalog from discord/common.py; returns the path actually written"""
+    from discord.common import VEHICLE_AIR_DICT, VEHICLE_GROUND_DICT
+    data = pack_catalog(VEHICLE_AIR_DICT, VEHICLE_GROUND_DICT)
+    
+    pending = path + PENDING_SUFFIX
+    with open(pending, "wb") as f:
+        f.write(data)
+    try:
+        os.replace(pending, path)
+    except PermissionError:
+        # Файл открыт запущенной программой - она подхватит .new сама
+        return pending
+    return path
+
+class VehicleCatalog:
+    """Lookups of vehicle names in the memory-mapped catalog file"""
+    
+    def __init__(self, path: str = CATALOG_PATH):
+        self.path = path
+        # Увеличивается при каждой замене файла, чтобы кэши знали о ней
+        self.generation = 0
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._stamp = None
+        self._langs: Dict[str, int] = {}
+        self._count = 0
+        self._index_start = 0
+        self._entry_size = 0
+        self._blob_start = 0
+        self._checked = 0.0
+        self._lock = threading.Lock()
+    
+    def _open(self):
+        f = open(self.path, "rb")
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            f.close()
+            raise ValueError(f"Vehicle catalog {self.path} is empty")
+        
+        try:
+            magic, version, lang_count, count = _HEADER.unpack_from(mapped, 0)
+        except struct.error:
+            magic = version = None
+        if magic != MAGIC or version != VERSION:
+            mapped.close()
+            f.close()
+            raise ValueError(f"Vehicle catalog {self.path} has unknown format")
+        
+        offset = _HEADER.size
+        langs = {}
+        for position in range(lang_count):
+            code, = _LANG.unpack_from(mapped, offset)
+            langs[code.rstrip(b"\0").decode("ascii")] = position
+            offset += _LANG.size
+        
+        self._close()
+        self._file, self._map = f, mapped
+        self._langs = langs
+        self._count = count
+        self._index_start = offset
+        self._entry_size = _STRING.size * (1 + lang_count)
+        self._blob_start = offset + self._entry_size * count
+        stat = os.fstat(f.fileno())
+        self._stamp = (stat.st_mtime_ns, stat.st_size)
+        self.generation += 1
+    
+    def _close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = None
+            self._file = None
+            self._count = 0
+    
+    def _refresh(self):
+        """Swap in a rebuilt file; called under the lock at most every REFRESH_INTERVAL"""
+        now = time.monotonic()
+        if self._map is not None and now - self._checked < REFRESH_INTERVAL:
+            return
+        self._checked = now
+        
+        pending = self.path + PENDING_SUFFIX
+        try:
+            if os.path.exists(pending):
+                # Отпускаем старый файл, иначе Windows не даст его заменить
+                self._close()
+                os.replace(pending, self.path)
+                logger.info(f"Vehicle catalog updated from {pending}")
+            elif self._map is not None:
+                stat = os.stat(self.path)
+                if (stat.st_mtime_ns, stat.st_size) == self._stamp:
+                    return
+                logger.info(f"Vehicle catalog {self.path} changed, reloading")
+            self._open()
+        except (OSError, ValueError, struct.error) as e:
+            logger.error(f"Cannot load vehicle catalog {self.path}: {e}")
+    
+    def open(self):
+        """Map the file now; raises OSError/ValueError if it is missing or broken"""
+        with self._lock:
+            self._open()
+            self._checked = time.monotonic()
+    
+    def _string(self, offset: int) -> bytes:
+        start, length = _STRING.unpack_from(self._map, offset)
+        start += self._blob_start
+        return self._map[start:start + length]
+    
+    def _find(self, key: bytes) -> int:
+        """Offset of the index entry for key, -1 if absent"""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            entry = self._index_start + middle * self._entry_size
+            current = self._string(entry)
+            if current == key:
+                return entry
+            if current < key:
+                low = middle + 1
+            else:
+                high = middle
+        return -1
+    
+    def name(self, army: str, code: str, lang: str) -> str:
+        """Readable name, empty string if the vehicle or its translation is unknown"""
+        with self._lock:
+            self._refresh()
+            position = self._langs.get(lang)
+            if position is None:
+                return ""
+            entry = self._find(f"{army}/{code}".encode("utf-8"))
+            if entry < 0:
+                return ""
+            return self._string(entry + _STRING.size * (1 + position)).decode("utf-8")
+    
+    def codes(self, army: str) -> List[str]:
+        """All vehicle codes of army in sorted order"""
+        prefix = f"{army}/".encode("utf-8")
+        with self._lock:
+            self._refresh()
+            keys = (self._string(self._index_start + number * self._entry_size) for number in range(self._count))
+            return [key[len(prefix):].decode("utf-8") for key in keys if key.startswith(prefix)]
+    
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._count
+    
+    def close(self):
+        with self._lock:
+            self._close()
+
+class DictCatalog:
+    """Fallback over the dicts of discord/common.py when vehicles.bin is missing"""
+    
+    generation = 1
+    
+    def __init__(self):
+        from discord.common import VEHICLE_AIR_DICT, VEHICLE_GROUND_DICT
+        self._armies = {"air": VEHICLE_AIR_DICT, "ground": VEHICLE_GROUND_DICT}
+    
+    def name(self, army: str, code: str, lang: str) -> str:
+        return self._armies.get(army, {}).get(code, {}).get(lang, "")
+    
+    def codes(self, army: str) -> List[str]:
+        return sorted(self._armies.get(army, {}))
+    
+    def __len__(self) -> int:
+        return sum(len(vehicles) for vehicles in self._armies.values())
+    
+    def close(self):
+        pass
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+def get_catalog():
+    """Catalog opened on first use"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                catalog = VehicleCatalog()
+                try:
+                    catalog.open()
+                except (OSError, ValueError, struct.error) as e:
+                    logger.warning(f"Vehicle catalog is not available ({e}), using discord/common.py")
+                    catalog = DictCatalog()
+                _catalog = catalog
+    return _catalog
+
+def main():
+    parser = argparse.ArgumentParser(description="Build vehicles.bin from discord/common.py")
+    parser.add_argument("--output", default=CATALOG_PATH)
+    args = parser.parse_args()
+    
+    written = build_catalog(args.output)
+    print(f"{written}: {os.path.getsize(written)} bytes")
+
+if __name__ == "__main__":
+    main()
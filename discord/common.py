@@ -2563,23 +2563,9 @@ VEHICLE_GROUND_DICT = {
     "ussr_zut_37": {"ru": "ЗУТ-37", "en": "ZUT-37"},
 }
 
-BASIC_STATE_DICT = {
-    "loading": {"ru": "Загрузка боя","en": "Loading battle"},
-    "hangar": {"ru": "В ангаре","en": "In hangar"},
-    "launching": {"ru": "Игра запускается","en": "Game launching"},
-    "in_battle": {"ru": "В бою","en": "In battle"},
-}
+# Подписи статусов живут в discord/states.py; реэкспорт для старых импортов
+from discord.states import BASIC_STATE_DICT, VEHICLE_STATES_DICT  # noqa: F401
 
-VEHICLE_STATES_DICT = {
-    "speed_tas":    {"ru": "Скорость", "en": "Speed"},
-    "speed_ground": {"ru": "Скорость", "en": "Speed"},
-    "crew_count":   {"ru": "Экипаж", "en": "Crew"},
-    "altitude":     {"ru": "Высота", "en": "Altitude"},
-    "play_on":      {"ru": "Играет на", "en": "Plays on"},
-    "in_game":      {"ru": "В игре", "en": "In game"},
-    "rpm":          {"ru": "Обороты", "en": "RPM"},  # Добавлено
-    "fuel":         {"ru": "Топливо", "en": "Fuel"},  # Добавлен перевод для топлива
-    "ias":          {"ru": "IAS", "en": "IAS"},  # Добавлен перевод для IAS
-}
+GAME_TIME = datetime.datetime.now()
 
-GAME_TIME = datetime.datetime.now()
\ No newline at end of file
+__all__ = ["VEHICLE_AIR_DICT", "VEHICLE_GROUND_DICT", "BASIC_STATE_DICT", "VEHICLE_STATES_DICT", "GAME_TIME"]
\ No newline at end of file
@@ -0,0 +1,42 @@
+# discord/dedup.py
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+class PresenceDeduplicator:
+    """Remembers the last activity sent to Discord and filters identical ones"""
+    
+    def __init__(self):
+        self._last_fingerprint: Optional[tuple] = None
+        self.sent = 0
+        self.skipped = 0
+    
+    @staticmethod
+    def fingerprint(payload: dict) -> tuple:
+        """Stable fingerprint of set_activity arguments"""
+        return tuple(sorted(payload.items()))
+    
+    def is_duplicate(self, payload: dict) -> bool:
+        """True if payload is identical to the last one sent; counts skipped updates"""
+        if self._last_fingerprint is not None and self.fingerprint(payload) == self._last_fingerprint:
+            self.skipped += 1
+            return True
+        return False
+    
+    def mark_sent(self, payload: dict):
+        """Remember payload as currently shown in Discord"""
+        self.remember(payload)
+        self.sent += 1
+    
+    def remember(self, payload: dict):
+        """Remember payload shown in Discord without going through the publisher; not counted as sent"""
+        self._last_fingerprint = self.fingerprint(payload)
+    
+    def reset(self):
+        """Forget last payload, e.g. after reconnecting to Discord"""
+        self._last_fingerprint = None
+    
+    def stats(self) -> dict:
+        """Sent/skipped counters"""
+        return {"sent": self.sent, "skipped": self.skipped}
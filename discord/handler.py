@@ -2,42 +2,32 @@
 import time
 import logging
 import sys
-import os
+from typing import Optional
 
-# Добавляем пути для импорта
-base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, os.path.join(base_path, "configs"))
-sys.path.insert(0, os.path.join(base_path, "game"))
-sys.path.insert(0, os.path.join(base_path, "discord"))
-
-# Импортируем модули
-from configs.settings import PresenceSettings
-from configs.translations import get_translation
+from configs.settings import PresenceSettings, SettingsWatcher
+from configs.i18n import get_translator
 from configs.colors import colored_text
 from configs import logs as tools_logger
+from configs import metrics
+from configs import startup
+from configs import tracing
 
 import game.api as game_api
-from discord.common import BASIC_STATE_DICT, VEHICLE_STATES_DICT
+from game.polling import PollingPolicy, classify_game_state, LAUNCHING, STANDBY
+from discord import rpc as discord_rpc
+from discord.states import BASIC_STATE_DICT, VEHICLE_STATES_DICT
 
 logger = logging.getLogger(__name__)
 
 def set_presence(state: str, details: str, large_img: str, large_text: str, 
-                small_img: str = "", small_text: str = "", lang: str = "en") -> bool:
-    """Set Discord status"""
+                small_img: str = "", small_text: str = "", lang: str = "en", phase: str = None) -> bool:
+    """Set Discord status
+    
+    phase identifies what is shown (hangar, battle on a vehicle...): a change of
+    phase is sent ahead of routine refreshes by the rate-limited publisher.
+    """
     try:
-        # Импортируем rpc модуль
-        try:
-            from discord.rpc import get_rpc_client, get_start_time
-        except ImportError:
-            # Если rpc.py не найден, пробуем init.py
-            from discord.rpc import get_rpc_client, get_start_time
-        
-        rpc = get_rpc_client()
-        start_time = get_start_time()
-        
-        # Если RPC клиент не инициализирован, пропускаем установку статуса
-        if rpc is None:
-            return False
+        start_time = discord_rpc.get_start_time()
         
         # Make sure all required fields are filled
         if not state:
@@ -49,45 +39,65 @@ def set_presence(state: str, details: str, large_img: str, large_text: str,
         if not large_text:
             large_text = "War Thunder"
         
-        # Используем метод set_activity
-        rpc.set_activity(
-            state=state,
-            details=details if details else None,
-            large_image=large_img,
-            large_text=large_text,
-            small_image=small_img if small_img else None,
-            small_text=small_text if small_text else None,
-            start=start_time
-        )
+        payload = {
+            "state": state,
+            "details": details if details else None,
+            "large_image": large_img,
+            "large_text": large_text,
+            "small_image": small_img if small_img else None,
+            "small_text": small_text if small_text else None,
+            "start": start_time,
+        }
         
-        # Получаем перевод для "Статус обновлен"
-        status_updated_text = get_translation(lang, "discord_status_updated")
+        # Discord еще подключается - статус уйдет сразу после подключения
+        if discord_rpc.get_rpc_client() is None:
+            discord_rpc.hold_presence(payload, lang, phase)
+            return False
         
-        # Выводим напрямую в консоль
-        discord_text = colored_text("DISCORD", "DISCORD")
-        print(f"{discord_text} - {status_updated_text}: {state}")
+        # Discord мог подключиться во время опроса - сначала учитываем статус, показанный при подключении
+        discord_rpc.publish_held()
+        # Публикатор сам отбросит дубликаты и отложит отправку при превышении лимита Discord
+        with tracing.span("publish", phase=phase):
+            discord_rpc.get_publisher().submit(payload, lang, phase)
         return True
-        
+    
     except Exception as e:
         tools_logger.error_log_presence_struct(e, state, details, large_img, large_text, small_img, small_text)
         logger.error(f"Error setting status: {e}")
         return False
 
+def log_presence_stats(lang: str = "en"):
+    """Print how many Discord updates were sent, skipped and coalesced"""
+    try:
+        stats = discord_rpc.get_publisher().stats()
+        logger.info(get_translator(lang).format("presence_stats", **stats))
+    except Exception:
+        pass
+
+def log_metrics_summary(lang: str = "en"):
+    """Print timing of update loop stages"""
+    lines = metrics.summary_lines()
+    if not lines:
+        return
+    logger.info(get_translator(lang)("metrics_summary"))
+    for line in lines:
+        logger.info(f"  {line}")
+
 def set_ground_state(settings: PresenceSettings, main_info) -> bool:
     """Set status for ground vehicles"""
     try:
         from discord.types.ground import IndicatorsGroundStruct
         ground_indicators = IndicatorsGroundStruct()
-        ground_indicators.set_ground_vehicle_name(main_info.vehicle_game_name, settings)
+        with metrics.timer("lookup", "ground"):
+            ground_indicators.set_ground_vehicle_name(main_info.vehicle_game_name, settings)
         ground_indicators.set_speed_crew_data(
             main_info.speed, 
             main_info.crew_total, 
             main_info.crew_current,
             main_info.rpm
         )
-        ground_indicators.set_big_img_text(settings)
-        ground_indicators.set_state(settings)
-        ground_indicators.set_details(settings)
+        with metrics.timer("format", "ground"):
+            ground_indicators.render(settings)
         
         return set_presence(
             state=ground_indicators.state,
@@ -96,16 +106,21 @@ def set_ground_state(settings: PresenceSettings, main_info) -> bool:
             large_text=ground_indicators.big_text,
             small_img=settings.large_img,
             small_text="War Thunder",
-            lang=settings.lang
+            lang=settings.lang,
+            phase=f"battle:{ground_indicators.vehicle_code_name}"
         )
     except Exception as e:
         logger.error(f"Error setting ground vehicle status: {e}", exc_info=True)
         return False
 
-def set_air_state(settings: PresenceSettings, http_client, main_info) -> bool:
+def set_air_state(settings: PresenceSettings, http_client, main_info, state_response=None) -> bool:
     """Set status for air vehicles"""
     try:
-        success, state_body = game_api.air_state_request(http_client, settings.lang)
+        # Ответ /state уже может быть получен поллером вместе с остальными
+        if state_response is None:
+            success, state_body = game_api.air_state_request(http_client, settings.lang)
+        else:
+            success, state_body = state_response
         
         if not success:
             logger.error("Failed to get data from WT API")
@@ -118,7 +133,10 @@ def set_air_state(settings: PresenceSettings, http_client, main_info) -> bool:
         from discord.types.air import IndicatorsAirStruct
         air_indicators = IndicatorsAirStruct()
         
-        if not air_indicators.build_air_info(state_body):
+        with metrics.timer("parse", "/state"):
+            parsed = air_indicators.build_air_info(state_body)
+        
+        if not parsed:
             logger.warning("Failed to parse air vehicle information")
             air_indicators.set_air_vehicle_name(main_info.vehicle_game_name, settings)
             air_indicators.set_details(settings)
@@ -132,13 +150,14 @@ def set_air_state(settings: PresenceSettings, http_client, main_info) -> bool:
                 large_text=air_indicators.big_text,
                 small_img=settings.large_img,
                 small_text="War Thunder",
-                lang=settings.lang
+                lang=settings.lang,
+                phase=f"battle:{air_indicators.vehicle_code_name}"
             )
         
-        air_indicators.set_air_vehicle_name(main_info.vehicle_game_name, settings)
-        air_indicators.set_big_img_text(settings)
-        air_indicators.set_state(settings)
-        air_indicators.set_details(settings)
+        with metrics.timer("lookup", "air"):
+            air_indicators.set_air_vehicle_name(main_info.vehicle_game_name, settings)
+        with metrics.timer("format", "air"):
+            air_indicators.render(settings)
         
         return set_presence(
             state=air_indicators.state,
@@ -147,154 +166,292 @@ def set_air_state(settings: PresenceSettings, http_client, main_info) -> bool:
             large_text=air_indicators.big_text,
             small_img=settings.large_img,
             small_text="War Thunder",
-            lang=settings.lang
+            lang=settings.lang,
+            phase=f"battle:{air_indicators.vehicle_code_name}"
         )
     except Exception as e:
         logger.error(f"Error setting air vehicle status: {e}", exc_info=True)
         return False
 
-def run_update_presence_loop(settings: PresenceSettings, http_client):
-    """Main status update loop"""
+def _wait_and_flush(until: float, connection: Optional[discord_rpc.DiscordConnection] = None):
+    """Sleep until next poll, waking up to send updates deferred by the rate limit
+    
+    While Discord is still connecting, wakes up as soon as it is done to send the held presence.
+    """
+    publisher = discord_rpc.get_publisher()
+    
+    while True:
+        discord_rpc.publish_held()
+        remaining = until - time.time()
+        if remaining <= 0:
+            return
+        
+        if connection is not None and not connection.finished.is_set():
+            if tracing.wait(connection.finished, remaining, "discord_connect"):
+                continue
+            return
+        
+        delay = publisher.next_flush_delay()
+        if delay is None or delay >= remaining:
+            tracing.sleep(remaining, "poll_interval")
+            return
+        
+        tracing.sleep(delay, "rate_limit")
+        publisher.flush()
+
+class LoopState:
+    """State carried between ticks of the update loop"""
+    
+    def __init__(self):
+        self.game_state = LAUNCHING
+        self.army_type = ""
+        self.standby_attempt = 0
+
+def update_presence_tick(settings: PresenceSettings, http_client, policy: PollingPolicy, loop: LoopState) -> float:
+    """Poll the game once and update presence; returns seconds until the next tick"""
+    t = get_translator(settings.lang)
+    
+    if game_api.check_connection_failed():
+        if loop.game_state != STANDBY:
+            # Игра закрыта - вместо HTTP опроса только проверяем порт
+            try:
+                from configs.colors import colored_text
+                info_text = colored_text("INFO", "INFO")
+                print(f"{info_text} - {t('wt_standby')}")
+            except:
+                print(f"INFO - {t('wt_standby')}")
+            loop.game_state = STANDBY
+            loop.standby_attempt = 0
+        
+        with tracing.span("probe"):
+            port_open = game_api.probe_game_port()
+        if not port_open:
+            delay = policy.standby_interval(loop.standby_attempt)
+            loop.standby_attempt += 1
+            return delay
+        
+        try:
+            from configs.colors import colored_text
+            success_text = colored_text("SUCCESS", "SUCCESS")
+            print(f"{success_text} - {t('wt_detected')}")
+        except:
+            print(f"SUCCESS - {t('wt_detected')}")
+        game_api.reset_breakers()
+        loop.game_state = LAUNCHING
+    
+    # В ангаре и при запуске игры достаточно /map_info.json
+    full_poll = policy.wants_full_poll(loop.game_state)
+    state_requested = policy.wants_air_state(loop.game_state, loop.army_type)
+    snapshot = game_api.poll_telemetry(
+        http_client, settings.lang,
+        include_state=state_requested,
+        include_indicators=full_poll
+    )
+    map_data = snapshot.map_data
+    
+    if map_data.valid and not full_poll and not snapshot.stale:
+        # Бой только начался - сразу добираем indicators и state
+        state_requested = True
+        snapshot = game_api.poll_telemetry(http_client, settings.lang, map_data=map_data)
+    
+    if snapshot.stale and loop.game_state != LAUNCHING:
+        # Игра временно не отвечает (breaker открыт) - Discord показывает последний статус.
+        # Если игра еще не была в ангаре или бою, держать нечего: сразу показываем запуск
+        return policy.interval(loop.game_state)
+    
+    loop.game_state = classify_game_state(map_data, snapshot.main_info)
+    loop.army_type = snapshot.main_info.army_type if snapshot.main_info else ""
+    interval = policy.interval(loop.game_state)
+    
+    if not map_data.game_running:
+        # Game not running
+        set_presence(
+            state=BASIC_STATE_DICT["launching"][settings.lang],
+            details="",
+            large_img=settings.large_img,
+            large_text="War Thunder",
+            lang=settings.lang,
+            phase="launching"
+        )
+    
+    elif map_data.valid:
+        # Game running and in battle
+        indicators = snapshot.main_info
+        if not indicators:
+            set_presence(
+                state=BASIC_STATE_DICT["in_battle"][settings.lang],
+                details="",
+                large_img=settings.large_img,
+                large_text="War Thunder",
+                lang=settings.lang,
+                phase="in_battle"
+            )
+            return interval
+        
+        if indicators.army_type == "dummy_plane" or indicators.vehicle_game_name == "dummy_plane":
+            set_presence(
+                state=BASIC_STATE_DICT["loading"][settings.lang],
+                details="",
+                large_img=settings.large_img,
+                large_text="War Thunder",
+                lang=settings.lang,
+                phase="loading"
+            )
+        
+        elif indicators.army_type == "air":
+            # Если /state не запрашивался (пересел с танка), set_air_state запросит его сам
+            state_response = (snapshot.state_ok, snapshot.state_body) if state_requested else None
+            with tracing.span("render", army="air"):
+                set_air_state(settings, http_client, indicators, state_response)
+        
+        elif indicators.army_type == "tank":
+            with tracing.span("render", army="tank"):
+                set_ground_state(settings, indicators)
+        
+        else:
+            set_presence(
+                state=VEHICLE_STATES_DICT["in_game"][settings.lang],
+                details="",
+                large_img=settings.large_img,
+                large_text="War Thunder",
+                lang=settings.lang,
+                phase="in_game"
+            )
+    
+    else:
+        # Game running but not in battle (in hangar)
+        set_presence(
+            state=BASIC_STATE_DICT["hangar"][settings.lang],
+            details="",
+            large_img=settings.large_img,
+            large_text="War Thunder",
+            lang=settings.lang,
+            phase="hangar"
+        )
+    
+    return interval
+
+# Поля настроек, от которых зависит PollingPolicy
+POLLING_FIELDS = frozenset((
+    "refresh_time", "refresh_launching", "refresh_hangar", "refresh_loading", "refresh_battle",
+    "standby_min_interval", "standby_max_interval",
+))
+# Эти поля используются только при запуске
+RESTART_FIELDS = frozenset(("http_client", "update_url"))
+
+def apply_settings(old: PresenceSettings, new: PresenceSettings, policy: PollingPolicy) -> PollingPolicy:
+    """Rebuild what depends on changed fields; returns the policy to use from now on
+    
+    Presence templates need nothing here: they are cached by the fields they use,
+    so a renderer is recompiled only if one of those fields changed.
+    """
+    changed = new.changed_fields(old)
+    t = get_translator(new.lang)
+    
+    if changed & POLLING_FIELDS:
+        policy = PollingPolicy(new)
+    if "metrics_port" in changed:
+        # Сервер слушает старый порт: закрываем его и открываем новый (0 - просто выключить)
+        metrics.stop_metrics_server()
+        if new.metrics_port:
+            metrics.start_metrics_server(new.metrics_port)
+    
+    applied = sorted(changed - RESTART_FIELDS)
+    if applied:
+        logger.info(t.format("settings_reloaded", fields=", ".join(applied)))
+    if changed & RESTART_FIELDS:
+        logger.warning(t.format("settings_restart_required", fields=", ".join(sorted(changed & RESTART_FIELDS))))
+    return policy
+
+def preload_presence():
+    """Load what the first battle presence needs: vehicle catalog and presence structs
+    
+    Runs in a background thread at startup, while Discord is connecting.
+    """
+    import importlib
+    from discord.catalog import get_catalog
+    # Импорт структур заранее загружает шаблоны статуса и декодер /state
+    for module in ("discord.types.air", "discord.types.ground"):
+        importlib.import_module(module)
+    get_catalog()
+    startup.mark("catalog_loaded")
+
+def run_update_presence_loop(settings: PresenceSettings, http_client, max_iterations: Optional[int] = None,
+                             watcher: Optional[SettingsWatcher] = None,
+                             connection: Optional[discord_rpc.DiscordConnection] = None) -> bool:
+    """Main status update loop
+    
+    Runs until stopped; max_iterations limits the number of ticks (for tests and benchmarks).
+    With watcher, edits of settings.json are applied between ticks without a restart.
+    With connection, the game is polled while Discord is connecting; returns False if that connection failed.
+    """
     # Создаем функцию перевода один раз
-    t = lambda key: get_translation(settings.lang, key)
+    t = get_translator(settings.lang)
+    
+    policy = PollingPolicy(settings)
     
     # Выводим сообщение о начале цикла с переводом
     try:
         from configs.colors import colored_text
         info_text = colored_text("INFO", "INFO")
-        message = t('starting_update_loop').format(interval=settings.refresh_time)
+        message = t('starting_update_loop').format(
+            launching=settings.refresh_launching,
+            hangar=settings.refresh_hangar,
+            loading=settings.refresh_loading,
+            battle=settings.refresh_battle
+        )
         print(f"{info_text} - {message}")
     except:
-        print(f"INFO - Starting status update loop (interval: {settings.refresh_time}s)")
+        print(f"INFO - Starting status update loop (battle interval: {settings.refresh_battle}s)")
     
     next_update_time = time.time()
-    max_iterations = 10000  # Защита от бесконечного цикла
     iteration = 0
+    loop = LoopState()
     
-    while iteration < max_iterations:
+    while max_iterations is None or iteration < max_iterations:
         iteration += 1
         try:
-            current_time = time.time()
-            
-            if current_time < next_update_time:
-                sleep_time = next_update_time - current_time
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
+            _wait_and_flush(next_update_time, connection)
+            if connection is not None and connection.failed:
+                return False
             
-            next_update_time = time.time() + settings.refresh_time
+            if watcher is not None:
+                new_settings = watcher.poll()
+                if new_settings is not None:
+                    policy = apply_settings(settings, new_settings, policy)
+                    settings = new_settings
+                    watcher.accept(new_settings)
             
-            if game_api.check_connection_failed():
-                # Используем CRITICAL ERROR вместо CRITICAL
-                try:
-                    from configs.colors import colored_text
-                    critical_error = colored_text("CRITICAL ERROR", "CRITICAL ERROR")
-                    print(f"\n{critical_error} - {t('wt_not_running')}")
-                except:
-                    print(f"\nCRITICAL ERROR - {t('wt_not_running')}")
-                
-                # Даем время на корректное завершение
-                time.sleep(0.5)
-                
-                # Закрываем Discord соединение перед выходом
-                try:
-                    try:
-                        from discord.rpc import close_rpc
-                    except ImportError:
-                        from discord.rpc import close_rpc
-                    close_rpc()
-                except:
-                    pass
-                
-                # Даем еще немного времени
-                time.sleep(0.3)
-                
-                sys.exit(1)
+            # Если тик упадет с ошибкой, следующий будет через обычный интервал
+            next_update_time = time.time() + policy.interval(loop.game_state)
             
-            map_data = game_api.map_request(http_client, settings.lang)
-            
-            if not map_data.game_running:
-                # Game not running
-                set_presence(
-                    state=BASIC_STATE_DICT["launching"][settings.lang],
-                    details="",
-                    large_img=settings.large_img,
-                    large_text="War Thunder",
-                    lang=settings.lang
-                )
-                
-            elif map_data.valid:
-                # Game running and in battle
-                indicators = game_api.main_info_request(http_client, settings.lang)
-                if not indicators:
-                    set_presence(
-                        state=BASIC_STATE_DICT["in_battle"][settings.lang],
-                        details="",
-                        large_img=settings.large_img,
-                        large_text="War Thunder",
-                        lang=settings.lang
-                    )
-                    continue
-                
-                if indicators.army_type == "dummy_plane" or indicators.vehicle_game_name == "dummy_plane":
-                    set_presence(
-                        state=BASIC_STATE_DICT["loading"][settings.lang],
-                        details="",
-                        large_img=settings.large_img,
-                        large_text="War Thunder",
-                        lang=settings.lang
-                    )
-                    
-                elif indicators.army_type == "air":
-                    set_air_state(settings, http_client, indicators)
-                    
-                elif indicators.army_type == "tank":
-                    set_ground_state(settings, indicators)
-                    
-                else:
-                    set_presence(
-                        state=VEHICLE_STATES_DICT["in_game"][settings.lang],
-                        details="",
-                        large_img=settings.large_img,
-                        large_text="War Thunder",
-                        lang=settings.lang
-                    )
-                    
-            else:
-                # Game running but not in battle (in hangar)
-                set_presence(
-                    state=BASIC_STATE_DICT["hangar"][settings.lang],
-                    details="",
-                    large_img=settings.large_img,
-                    large_text="War Thunder",
-                    lang=settings.lang
-                )
-                
+            # Интервал уточняется после опроса, когда станет известно новое состояние
+            with metrics.timer("tick"):
+                delay = update_presence_tick(settings, http_client, policy, loop)
+            next_update_time = time.time() + delay
+        
         except SystemExit:
+            log_presence_stats(settings.lang)
+            log_metrics_summary(settings.lang)
             # Даем время на корректное завершение
             try:
-                try:
-                    from discord.rpc import close_rpc
-                except ImportError:
-                    from discord.rpc import close_rpc
-                close_rpc()
+                discord_rpc.close_rpc()
             except:
                 pass
             time.sleep(0.3)
             raise
-            
+        
         except KeyboardInterrupt:
             print("\n\nProgram stopped by user")
+            log_presence_stats(settings.lang)
+            log_metrics_summary(settings.lang)
             try:
-                try:
-                    from discord.rpc import close_rpc
-                except ImportError:
-                    from discord.rpc import close_rpc
-                close_rpc()
+                discord_rpc.close_rpc()
             except:
                 pass
             time.sleep(0.3)
             sys.exit(0)
-            
+        
         except Exception as e:
             # Используем error вместо critical для ошибок в цикле
             logger.error(f"Error in update loop (iteration {iteration}): {e}", exc_info=True)
@@ -303,15 +460,8 @@ def run_update_presence_loop(settings: PresenceSettings, http_client):
                 details="",
                 large_img=settings.large_img,
                 large_text="War Thunder",
-                lang=settings.lang
+                lang=settings.lang,
+                phase="launching"
             )
     
-    # Если достигнуто максимальное количество итераций
-    try:
-        from configs.colors import colored_text
-        error_text = colored_text("ERROR", "ERROR")
-        print(f"\n{error_text} - Max iterations ({max_iterations}) reached, exiting loop")
-    except:
-        print(f"\nERROR - Max iterations ({max_iterations}) reached, exiting loop")
-    
-    sys.exit(1)
\ No newline at end of file
+    return True
@@ -0,0 +1,124 @@
+# discord/publisher.py
+import logging
+import time
+from typing import Callable, Optional
+
+from discord.dedup import PresenceDeduplicator
+
+logger = logging.getLogger(__name__)
+
+# Discord пропускает примерно 5 обновлений активности за 20 секунд
+DISCORD_UPDATES_PER_PERIOD = 5
+DISCORD_PERIOD_SECONDS = 20.0
+
+PRIORITY_ROUTINE = 0
+PRIORITY_TRANSITION = 1
+
+class TokenBucket:
+    """Token bucket limiting Discord activity updates"""
+    
+    def __init__(self, capacity: int = DISCORD_UPDATES_PER_PERIOD, period: float = DISCORD_PERIOD_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+    
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def try_acquire(self, reserve: int = 0) -> bool:
+        """Take one token if more than `reserve` tokens would remain available"""
+        self._refill()
+        if self._tokens >= 1 + reserve:
+            self._tokens -= 1
+            return True
+        return False
+    
+    def consume(self):
+        """Account for an update sent outside of the publisher"""
+        self._refill()
+        self._tokens = max(self._tokens - 1, 0.0)
+    
+    def time_until_available(self, reserve: int = 0) -> float:
+        """Seconds until try_acquire(reserve) can succeed"""
+        self._refill()
+        missing = 1 + reserve - self._tokens
+        return max(missing / self.rate, 0.0)
+
+class PresencePublisher:
+    """Rate-limited publisher that keeps only the newest pending update
+    
+    Updates that change the phase (hangar -> battle, another vehicle) are
+    transitions and may use the last token; routine stat refreshes leave
+    `transition_reserve` tokens untouched so transitions are never delayed by them.
+    """
+    
+    def __init__(self, send: Callable[[dict, str], None], bucket: Optional[TokenBucket] = None,
+                 transition_reserve: int = 1):
+        self._send = send
+        self.bucket = bucket if bucket is not None else TokenBucket()
+        self.transition_reserve = transition_reserve
+        self.deduplicator = PresenceDeduplicator()
+        self._pending = None  # (payload, lang, phase, priority)
+        self._last_phase = None
+        self.coalesced = 0
+        self.deferred = 0
+    
+    def submit(self, payload: dict, lang: str = "en", phase: Optional[str] = None) -> bool:
+        """Queue payload and send it right away if the rate limit allows; returns True if sent"""
+        priority = PRIORITY_TRANSITION if phase != self._last_phase else PRIORITY_ROUTINE
+        
+        if self._pending is not None:
+            # Непрочитанное обновление заменяется новым, но не теряет приоритет
+            self.coalesced += 1
+            priority = max(priority, self._pending[3])
+            self._pending = None
+        
+        if self.deduplicator.is_duplicate(payload):
+            return False
+        
+        self._pending = (payload, lang, phase, priority)
+        return self.flush()
+    
+    def flush(self) -> bool:
+        """Send pending update if a token is available"""
+        if self._pending is None:
+            return False
+        
+        payload, lang, phase, priority = self._pending
+        reserve = 0 if priority == PRIORITY_TRANSITION else self.transition_reserve
+        if not self.bucket.try_acquire(reserve):
+            self.deferred += 1
+            return False
+        
+        self._pending = None
+        self._send(payload, lang)
+        self.deduplicator.mark_sent(payload)
+        self._last_phase = phase
+        return True
+    
+    def next_flush_delay(self) -> Optional[float]:
+        """Seconds until the pending update can go out, None if nothing is pending"""
+        if self._pending is None:
+            return None
+        reserve = 0 if self._pending[3] == PRIORITY_TRANSITION else self.transition_reserve
+        return self.bucket.time_until_available(reserve)
+    
+    def reset(self, external_update: bool = False):
+        """Forget shown presence after (re)connect; external_update accounts for an activity set directly"""
+        self._pending = None
+        self._last_phase = None
+        self.deduplicator.reset()
+        if external_update:
+            self.bucket.consume()
+    
+    def stats(self) -> dict:
+        """Counters of sent, skipped, coalesced and deferred updates"""
+        stats = self.deduplicator.stats()
+        stats["coalesced"] = self.coalesced
+        stats["deferred"] = self.deferred
+        return stats
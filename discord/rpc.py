@@ -1,8 +1,13 @@
-# discord/init.py
+# discord/rpc.py
 import logging
+import threading
 import time
-import pypresence
-from pypresence.exceptions import DiscordNotFound, InvalidID
+from configs import metrics
+from configs import startup
+from configs import tracing
+from configs.i18n import get_translator
+from discord import warm_start
+from discord.publisher import PresencePublisher
 
 # Импортируем новую функцию colored_text
 try:
@@ -14,16 +19,44 @@ except ImportError:
 logger = logging.getLogger(__name__)
 _rpc_client = None
 _start_time = None
+# Последний статус, готовый до подключения к Discord: (payload, lang, phase)
+_held = None
+# После подключения публикатор сбрасывается в потоке цикла; здесь статус, показанный при подключении
+_reset_pending = None
+
+def _write_activity(client, payload: dict, lang: str):
+    with metrics.timer("ipc"):
+        client.set_activity(**payload)
+    warm_start.save_presence(payload, lang)
+    if startup.mark(startup.FIRST_PRESENCE):
+        first = startup.elapsed(startup.FIRST_PRESENCE)
+        metrics.observe("first_presence", first)
+        logger.info(get_translator(lang).format("first_presence_time", ms=round(first * 1000)))
+    
+    discord_text = colored_text("DISCORD", "DISCORD")
+    print(f"{discord_text} - {get_translator(lang)('discord_status_updated')}: {payload['state']}")
+
+def _send_activity(payload: dict, lang: str = "en"):
+    """Write activity to Discord IPC and report it in console"""
+    if _rpc_client is None:
+        return
+    _write_activity(_rpc_client, payload, lang)
+
+_publisher = PresencePublisher(_send_activity)
+metrics.register_collector("presence_updates", "Discord presence updates by outcome", "result", _publisher.stats)
 
 def connect_discord_rpc(discord_code: str, lang: str = "en"):
     """Connect to Discord RPC"""
-    global _rpc_client, _start_time
+    global _rpc_client, _reset_pending
+    
+    # pypresence тянет asyncio, поэтому импортируется только при подключении
+    import pypresence
+    from pypresence.exceptions import DiscordNotFound, InvalidID
     
-    # Импортируем функцию перевода
-    from configs.translations import get_translation
-    t = lambda key: get_translation(lang, key)
+    t = get_translator(lang)
     
-    _start_time = int(time.time())
+    # Если статус был готов раньше подключения, время сессии уже задано им
+    get_start_time()
     
     if _rpc_client is not None:
         try:
@@ -36,42 +69,55 @@ def connect_discord_rpc(discord_code: str, lang: str = "en"):
     max_attempts = 3
     
     for attempt in range(max_attempts):
+        client = None
         try:
             discord_text = colored_text("DISCORD", "DISCORD")
             print(f"{discord_text} - {t('discord_connecting')}{attempt + 1}")
             
-            # Новый способ подключения
-            _rpc_client = pypresence.Client(discord_code)
-            _rpc_client.start()
+            # Клиент становится общим только после подключения: цикл может работать в другом потоке
+            client = pypresence.Client(discord_code)
+            client.start()
+            
+            # Готовый статус (прошлого запуска или первого опроса) показываем сразу, не дожидаясь цикла;
+            # "Starting" - только если статуса еще нет
+            held = _held
+            if held is not None:
+                shown = held[0]
+                _write_activity(client, shown, held[1])
+            else:
+                shown = {
+                    "state": "Starting",
+                    "details": "War Thunder",
+                    "large_image": "main_logo",
+                    "large_text": "War Thunder",
+                    "start": _start_time,
+                }
+                client.set_activity(**shown)
             
-            # Test update with main_logo
-            _rpc_client.set_activity(
-                state="Starting",
-                details="War Thunder",
-                large_image="main_logo",
-                large_text="War Thunder",
-                start=_start_time
-            )
+            # Прошлый статус больше не актуален; публикатор сбросит поток цикла (publish_held)
+            _reset_pending = shown
+            _rpc_client = client
+            startup.mark("discord_connected")
             
             print(f"{discord_text} - {t('discord_connected')} ({t('app_id')}: {discord_code})")
             return True
-            
+        
         except DiscordNotFound:
             if attempt < max_attempts - 1:
                 wait = 2 * (attempt + 1)
                 discord_text = colored_text("DISCORD", "DISCORD")
                 print(f"{discord_text} - {t('discord_not_found')}, {t('discord_waiting')} {wait} {t('discord_seconds')}")
-                time.sleep(wait)
+                tracing.sleep(wait, "discord_retry")
             else:
                 discord_text = colored_text("DISCORD", "DISCORD")
                 print(f"{discord_text} - {t('discord_not_found')}")
                 return False
-                
+        
         except InvalidID:
             discord_text = colored_text("DISCORD", "DISCORD")
             print(f"{discord_text} - {t('discord_invalid_id')}: {discord_code}")
             return False
-            
+        
         except Exception as e:
             error_msg = str(e)
             if attempt < max_attempts - 1:
@@ -82,14 +128,17 @@ def connect_discord_rpc(discord_code: str, lang: str = "en"):
                     discord_text = colored_text("DISCORD", "DISCORD")
                     print(f"{discord_text} - {t('discord_image_problem')}")
                     try:
-                        if _rpc_client:
-                            _rpc_client.set_activity(
-                                state="War Thunder",
-                                details="Rich Presence",
-                                large_image="war_thunder",
-                                large_text="Game",
-                                start=_start_time
-                            )
+                        if client is not None:
+                            shown = {
+                                "state": "War Thunder",
+                                "details": "Rich Presence",
+                                "large_image": "war_thunder",
+                                "large_text": "Game",
+                                "start": _start_time,
+                            }
+                            client.set_activity(**shown)
+                            _reset_pending = shown
+                            _rpc_client = client
                             print(f"{discord_text} - {t('discord_alt_success')}")
                             return True
                     except Exception as retry_error:
@@ -98,7 +147,7 @@ def connect_discord_rpc(discord_code: str, lang: str = "en"):
                 
                 discord_text = colored_text("DISCORD", "DISCORD")
                 print(f"{discord_text} - {t('discord_connection_error')}, {t('discord_waiting')} {wait} {t('discord_seconds')}")
-                time.sleep(wait)
+                tracing.sleep(wait, "discord_retry")
             else:
                 discord_text = colored_text("DISCORD", "DISCORD")
                 print(f"{discord_text} - {t('discord_failed_attempts')} {max_attempts} {t('discord_attempts')}")
@@ -106,6 +155,58 @@ def connect_discord_rpc(discord_code: str, lang: str = "en"):
     
     return False
 
+class DiscordConnection:
+    """connect_discord_rpc running in a background thread, so startup does not wait for it"""
+    
+    def __init__(self, discord_code: str, lang: str = "en"):
+        self.connected = False
+        self.finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(discord_code, lang), name="discord-connect", daemon=True)
+    
+    def start(self) -> "DiscordConnection":
+        self._thread.start()
+        return self
+    
+    def _run(self, discord_code: str, lang: str):
+        try:
+            self.connected = connect_discord_rpc(discord_code, lang)
+        except Exception as e:
+            logger.error(f"Error connecting to Discord: {e}", exc_info=True)
+        finally:
+            self.finished.set()
+    
+    @property
+    def failed(self) -> bool:
+        return self.finished.is_set() and not self.connected
+
+def hold_presence(payload: dict, lang: str = "en", phase: str = None):
+    """Keep the newest presence made before Discord is connected"""
+    global _held
+    _held = (payload, lang, phase)
+
+def publish_held() -> bool:
+    """After connecting: reset the publisher and send the held presence
+    
+    Called from the update loop thread, which owns the publisher; cheap when there is nothing to do.
+    """
+    global _held, _reset_pending
+    if _rpc_client is None:
+        return False
+    if _reset_pending is not None:
+        # Статус, показанный при подключении, повторно не отправляем
+        _publisher.reset(external_update=True)
+        _publisher.deduplicator.remember(_reset_pending)
+        _reset_pending = None
+    if _held is None:
+        return False
+    held, _held = _held, None
+    return _publisher.submit(*held)
+
+def set_start_time(start: int):
+    """Continue the session timer of an earlier run (discord.warm_start)"""
+    global _start_time
+    _start_time = start
+
 def get_start_time():
     """Get application start time"""
     global _start_time
@@ -113,6 +214,16 @@ def get_start_time():
         _start_time = int(time.time())
     return _start_time
 
+def get_publisher() -> PresencePublisher:
+    """Get rate-limited presence publisher"""
+    return _publisher
+
+def set_rpc_client(client):
+    """Use an already created client, e.g. a stand-in for replay and benchmarks"""
+    global _rpc_client
+    _rpc_client = client
+    _publisher.reset()
+
 def get_rpc_client():
     """Get RPC client"""
     global _rpc_client
@@ -126,7 +237,7 @@ def get_rpc_client():
 
 def close_rpc():
     """Close RPC connection"""
-    global _rpc_client, _start_time
+    global _rpc_client, _start_time, _held
     if _rpc_client is not None:
         try:
             _rpc_client.clear_activity()
@@ -135,4 +246,6 @@ def close_rpc():
             pass
         finally:
             _rpc_client = None
-            _start_time = None
\ No newline at end of file
+            _start_time = None
+            _held = None
+            _publisher.reset()
\ No newline at end of file
@@ -0,0 +1,21 @@
+# discord/states.py
+# Подписи статусов отдельно от большого справочника техники, чтобы их импорт ничего не стоил
+
+BASIC_STATE_DICT = {
+    "loading": {"ru": "Загрузка боя","en": "Loading battle"},
+    "hangar": {"ru": "В ангаре","en": "In hangar"},
+    "launching": {"ru": "Игра запускается","en": "Game launching"},
+    "in_battle": {"ru": "В бою","en": "In battle"},
+}
+
+VEHICLE_STATES_DICT = {
+    "speed_tas":    {"ru": "Скорость", "en": "Speed"},
+    "speed_ground": {"ru": "Скорость", "en": "Speed"},
+    "crew_count":   {"ru": "Экипаж", "en": "Crew"},
+    "altitude":     {"ru": "Высота", "en": "Altitude"},
+    "play_on":      {"ru": "Играет на", "en": "Plays on"},
+    "in_game":      {"ru": "В игре", "en": "In game"},
+    "rpm":          {"ru": "Обороты", "en": "RPM"},  # Добавлено
+    "fuel":         {"ru": "Топливо", "en": "Fuel"},  # Добавлен перевод для топлива
+    "ias":          {"ru": "IAS", "en": "IAS"},  # Добавлен перевод для IAS
+}
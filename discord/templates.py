@@ -0,0 +1,215 @@
+# discord/templates.py
+"""Presence texts compiled from settings into one render function.
+
+compile_presence() resolves the alt_presence/vehicle_details branching, the
+left/right parameter choice and the localized labels once per combination of
+settings and builds a single closure returning (large image text, state,
+details), so rendering a tick is one call. Compiled renderers are cached.
+
+A left/right parameter is either a registered field name (speed, rpm, crew for
+ground; spd, ias, alt, fuel for air) or a user template with indicator
+attributes in braces, e.g. "{altitude} m / {tas_speed} km/h". New fields are
+added with register_field() instead of another if/elif branch.
+"""
+import logging
+import string
+from dataclasses import dataclass, fields as dataclass_fields
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from configs.settings import PresenceSettings
+from discord.states import BASIC_STATE_DICT, VEHICLE_STATES_DICT
+from discord.vehicles import AIR, GROUND
+
+logger = logging.getLogger(__name__)
+
+# Формирует текст параметра из структуры показателей; "" если значения нет
+Formatter = Callable[[object], str]
+# Строит Formatter для языка
+FieldFactory = Callable[[str], Formatter]
+
+@dataclass(frozen=True)
+class Field:
+    """Built-in parameter: "<label>: <value>", shown while condition is true
+    
+    value and condition take the indicators struct, e.g.
+    value=lambda i: f"{i.altitude} m", condition=lambda i: i.altitude.
+    """
+    label: str
+    value: Formatter
+    condition: Optional[Callable[[object], object]] = None
+
+_FIELDS: Dict[str, Dict[str, Union[Field, FieldFactory]]] = {AIR: {}, GROUND: {}}
+_compiled: Dict[tuple, "CompiledPresence"] = {}
+
+def register_field(army: str, name: str, field: Union[Field, FieldFactory]):
+    """Make name usable as left_*_state/right_*_state for army
+    
+    field is a Field, or a factory taking the language and returning a formatter.
+    """
+    _FIELDS[army][name] = field
+    _compiled.clear()
+    _last.clear()
+
+def _label(key: str, lang: str) -> str:
+    labels = VEHICLE_STATES_DICT[key]
+    return labels.get(lang, labels["en"])
+
+def _indicator_types(army: str) -> Dict[str, type]:
+    if army == GROUND:
+        from discord.types.ground import IndicatorsGroundStruct as struct
+    else:
+        from discord.types.air import IndicatorsAirStruct as struct
+    return {field.name: field.type for field in dataclass_fields(struct)}
+
+def compile_user_template(army: str, template: str) -> Formatter:
+    """Formatter for a str.format template over indicator attributes
+    
+    Renders "" while any referenced value is empty, like the built-in fields.
+    Raises ValueError for unknown attributes, positional fields, a format spec
+    that does not suit the attribute type (air values are strings, so "{altitude:.0f}"
+    is refused) or a broken template.
+    """
+    types = _indicator_types(army)
+    names = []
+    for _, name, spec, conversion in string.Formatter().parse(template):
+        if name is None:
+            continue
+        if not name or name.isdigit():
+            raise ValueError(f"Positional field in template {template!r}, use a field name")
+        if name not in types:
+            raise ValueError(f"Unknown field in template {template!r}: {name}")
+        # Проверяем формат на пустом значении того же типа, что и поле
+        sample = types[name]()
+        if conversion:
+            sample = str(sample)
+        try:
+            format(sample, spec)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Format {spec!r} does not suit {name} in template {template!r}: {e}") from None
+        names.append(name)
+    names = tuple(names)
+    failed = False
+    
+    def render(indicators) -> str:
+        nonlocal failed
+        values = {name: getattr(indicators, name) for name in names}
+        if any(value is None or value == "" for value in values.values()):
+            return ""
+        try:
+            return template.format_map(values)
+        except (ValueError, TypeError) as e:
+            # Шаблон не подошел к пришедшему значению - пишем в лог один раз и не выводим
+            if not failed:
+                failed = True
+                logger.error(f"Invalid presence template {template!r}: {e}")
+            return ""
+    return render
+
+def _field_formatter(field: Field, lang: str) -> Formatter:
+    prefix = f"{_label(field.label, lang)}: "
+    value, condition = field.value, field.condition
+    if condition is None:
+        return lambda i: prefix + value(i)
+    return lambda i: prefix + value(i) if condition(i) else ""
+
+def _side(army: str, value: str, lang: str) -> Optional[Formatter]:
+    """Formatter of one parameter, None if nothing is shown"""
+    if "{" in value:
+        try:
+            return compile_user_template(army, value)
+        except ValueError as e:
+            # Результат компиляции кэшируется, поэтому ошибка пишется в лог один раз
+            logger.error(f"Invalid presence template: {e}")
+            return None
+    
+    field = _FIELDS[army].get(value)
+    if field is None:
+        return None
+    if not isinstance(field, Field):
+        return field(lang)
+    return _field_formatter(field, lang)
+
+class CompiledPresence:
+    """Render function for one settings combination"""
+    
+    __slots__ = ("render",)
+    
+    def __init__(self, render: Callable[[object], Tuple[str, str, str]]):
+        # render(indicators) -> (large image text, state, details)
+        self.render = render
+    
+    def big_text(self, indicators) -> str:
+        return self.render(indicators)[0]
+    
+    def state(self, indicators) -> str:
+        return self.render(indicators)[1]
+    
+    def details(self, indicators) -> str:
+        return self.render(indicators)[2]
+
+def _compile(army: str, lang: str, alt_presence: bool, vehicle_details: bool, left: str, right: str) -> CompiledPresence:
+    in_battle = BASIC_STATE_DICT["in_battle"]
+    in_battle = in_battle.get(lang, in_battle["en"])
+    play_on = f"{_label('play_on', lang)}: "
+    left_side = _side(army, left, lang)
+    right_side = _side(army, right, lang)
+    
+    if left_side and right_side:
+        def line(i) -> str:
+            left_text = left_side(i)
+            right_text = right_side(i)
+            return f"{left_text} | {right_text}" if left_text and right_text else left_text or right_text or in_battle
+    elif left_side or right_side:
+        side = left_side or right_side
+        line = lambda i: side(i) or in_battle
+    else:
+        line = lambda i: in_battle
+    
+    if vehicle_details:
+        details = lambda i: play_on + i.readable_vehicle_name
+    else:
+        details = lambda i: ""
+    
+    # alt_presence: параметры в подсказке большой картинки, иначе в state
+    if alt_presence:
+        render = lambda i: (line(i), "", details(i))
+    else:
+        render = lambda i: (i.readable_vehicle_name, line(i), details(i))
+    return CompiledPresence(render)
+
+# Последний объект настроек и его рендерер по роду войск: настройки неизменяемы,
+# поэтому пока объект тот же, ключ можно не собирать
+_last: Dict[str, Tuple[PresenceSettings, CompiledPresence]] = {}
+
+def compile_presence(settings: PresenceSettings, army: str) -> CompiledPresence:
+    """Compiled renderer for army (AIR or GROUND) under settings
+    
+    Reloaded settings only cause compilation when a field the texts depend on changed.
+    """
+    last = _last.get(army)
+    if last is not None and last[0] is settings:
+        return last[1]
+    
+    if army == GROUND:
+        key = (army, settings.lang, settings.alt_presence, settings.vehicle_details,
+               settings.left_tank_state, settings.right_tank_state)
+    else:
+        key = (army, settings.lang, settings.alt_presence, settings.vehicle_details,
+               settings.left_air_state, settings.right_air_state)
+    presence = _compiled.get(key)
+    if presence is None:
+        # Вариантов настроек немного, поэтому кэш без ограничения
+        presence = _compiled[key] = _compile(*key)
+    _last[army] = (settings, presence)
+    return presence
+
+register_field(GROUND, "speed", Field("speed_ground", lambda i: f"{int(i.speed)} km/h"))
+register_field(GROUND, "rpm", Field("rpm", lambda i: f"{int(i.rpm)}"))
+# Экипаж показываем, только если игра его прислала
+register_field(GROUND, "crew", Field("crew_count", lambda i: f"{int(i.current_crew)}/{int(i.total_crew)}",
+                                     lambda i: i.total_crew > 0))
+register_field(AIR, "spd", Field("speed_tas", lambda i: f"{i.tas_speed} km/h", lambda i: i.tas_speed))
+register_field(AIR, "ias", Field("ias", lambda i: f"{i.ias_speed} km/h", lambda i: i.ias_speed))
+register_field(AIR, "alt", Field("altitude", lambda i: f"{i.altitude} m", lambda i: i.altitude))
+register_field(AIR, "fuel", Field("fuel", lambda i: f"{i.current_fuel}/{i.max_fuel} kg",
+                                  lambda i: i.current_fuel and i.max_fuel))
@@ -1,7 +1,8 @@
 # discord/types/ground.py
 from dataclasses import dataclass
 from configs.settings import PresenceSettings
-from discord.common import VEHICLE_GROUND_DICT, VEHICLE_STATES_DICT, BASIC_STATE_DICT
+from discord.templates import compile_presence
+from discord.vehicles import GROUND, IMAGE_URL, resolve_vehicle
 
 @dataclass
 class IndicatorsGroundStruct:
@@ -20,7 +21,7 @@ class IndicatorsGroundStruct:
     
     def set_vehicle_img(self, vehicle_game_name: str):
         """Set vehicle image"""
-        self.img = f"https://static.encyclopedia.warthunder.com/images/{vehicle_game_name}.png"
+        self.img = IMAGE_URL.format(vehicle_game_name)
     
     def set_speed_crew_data(self, speed: float, total: float, current: float, rpm: float = 0.0):
         """Set speed, crew and RPM data"""
@@ -33,79 +34,22 @@ class IndicatorsGroundStruct:
         """Set readable ground vehicle name"""
         self.vehicle_code_name = vehicle_game_name  # ← Сохраняем кодовое имя
         
-        fixed_name = vehicle_game_name.replace("tankModels/", "")
-        self.set_vehicle_img(fixed_name)
-        
-        readable_name = VEHICLE_GROUND_DICT.get(fixed_name, {}).get(settings.lang, "")
-        
-        if not readable_name:
-            # Use base name
-            stripped_name = fixed_name.replace("_", " ")
-            self.readable_vehicle_name = stripped_name
-        else:
-            self.readable_vehicle_name = readable_name
+        record = resolve_vehicle(vehicle_game_name, GROUND, settings.lang)
+        self.readable_vehicle_name = record.name
+        self.img = record.img
     
     def set_big_img_text(self, settings: PresenceSettings):
         """Set large image text"""
-        if settings.alt_presence:
-            left_text = ""
-            right_text = ""
-            
-            # Left parameter - УБИРАЕМ ПРОВЕРКУ > 0
-            if settings.left_tank_state == "speed":
-                left_text = f"{VEHICLE_STATES_DICT['speed_ground'][settings.lang]}: {int(self.speed)} km/h"
-            
-            # Right parameter - УБИРАЕМ ПРОВЕРКУ > 0
-            if settings.right_tank_state == "rpm":
-                right_text = f"{VEHICLE_STATES_DICT['rpm'][settings.lang]}: {int(self.rpm)}"
-            elif settings.right_tank_state == "crew" and self.total_crew > 0:  # Экипаж оставляем с проверкой
-                right_text = f"{VEHICLE_STATES_DICT['crew_count'][settings.lang]}: {int(self.current_crew)}/{int(self.total_crew)}"
-            
-            # Form final text
-            if left_text and right_text:
-                self.big_text = f"{left_text} | {right_text}"
-            elif left_text:
-                self.big_text = left_text
-            elif right_text:
-                self.big_text = right_text
-            else:
-                self.big_text = BASIC_STATE_DICT["in_battle"][settings.lang]
-        else:
-            self.big_text = self.readable_vehicle_name
+        self.big_text = compile_presence(settings, GROUND).big_text(self)
     
     def set_state(self, settings: PresenceSettings):
         """Set state"""
-        if not settings.alt_presence:
-            # When alt_presence is off, show info in state
-            left_text = ""
-            right_text = ""
-            
-            # Left parameter - УБИРАЕМ ПРОВЕРКУ > 0
-            if settings.left_tank_state == "speed":
-                left_text = f"{VEHICLE_STATES_DICT['speed_ground'][settings.lang]}: {int(self.speed)} km/h"
-            
-            # Right parameter - УБИРАЕМ ПРОВЕРКУ > 0 для RPM
-            if settings.right_tank_state == "rpm":
-                right_text = f"{VEHICLE_STATES_DICT['rpm'][settings.lang]}: {int(self.rpm)}"
-            elif settings.right_tank_state == "crew" and self.total_crew > 0:  # Экипаж оставляем с проверкой
-                right_text = f"{VEHICLE_STATES_DICT['crew_count'][settings.lang]}: {int(self.current_crew)}/{int(self.total_crew)}"
-            
-            # Form final text
-            if left_text and right_text:
-                self.state = f"{left_text} | {right_text}"
-            elif left_text:
-                self.state = left_text
-            elif right_text:
-                self.state = right_text
-            else:
-                self.state = BASIC_STATE_DICT["in_battle"][settings.lang]
-        else:
-            # When alt_presence is on, state is empty
-            self.state = ""
+        self.state = compile_presence(settings, GROUND).state(self)
     
     def set_details(self, settings: PresenceSettings):
         """Set details"""
-        if settings.vehicle_details:
-            self.details = f"{VEHICLE_STATES_DICT['play_on'][settings.lang]}: {self.readable_vehicle_name}"
-        else:
-            self.details = ""
\ No newline at end of file
+        self.details = compile_presence(settings, GROUND).details(self)
+    
+    def render(self, settings: PresenceSettings):
+        """Set large image text, state and details with one compiled template"""
+        self.big_text, self.state, self.details = compile_presence(settings, GROUND).render(self)
@@ -0,0 +1,155 @@
+# discord/variants.py
+"""Names for vehicle codes missing from the catalog that are variants of known ones.
+
+Codes are split into "_" tokens and all catalog codes of an army are put in two
+token tries, built once per catalog file:
+
+- prefix trie: the longest known code the unknown one starts with, e.g.
+  fw-190d-9 for fw-190d-9_china or a_4e for a_4e_late_iaf;
+- suffix trie over codes without their first (nation) token, e.g.
+  us_m18_hellcat for il_m18_hellcat.
+
+Both walks take O(number of tokens). The leftover tokens become the label:
+nation copies keep the base name, _late/_early are shown, event kit tokens are
+dropped. Results are memoized per code.
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from discord.catalog import get_catalog
+
+SEPARATOR = "_"
+
+# Конец кода в узле дерева
+_CODE = None
+
+NATION_TOKENS = frozenset((
+    "ussr", "china", "iaf", "israel", "france", "italy", "hungary", "japan", "usa", "uk", "germany",
+    "german", "luftwaffe", "sweden", "finland", "thailand", "belgium", "netherlands", "romania",
+    "switzerland", "indonesia", "cuba", "pakistan", "greece", "vietnam", "vn", "vvs", "raf",
+))
+
+# Все, что после такого токена, - оформление ивентового набора
+EVENT_TOKENS = frozenset(("event", "promo", "kit", "yt", "killstreak", "tutorial", "race", "camo"))
+
+LABELS = {
+    "late": {"ru": "поздний", "en": "Late"},
+    "early": {"ru": "ранний", "en": "Early"},
+}
+
+# Сколько неизвестных кодов помнить
+MEMO_LIMIT = 1024
+
+def _insert(trie: dict, tokens: List[str], code: str):
+    node = trie
+    for token in tokens:
+        node = node.setdefault(token, {})
+    # При совпадении хвостов оставляем первый код по алфавиту
+    node.setdefault(_CODE, code)
+
+class VariantIndex:
+    """Prefix and suffix token tries over catalog codes of one army"""
+    
+    def __init__(self, codes: List[str]):
+        self.prefixes = {}
+        self.suffixes = {}
+        for code in codes:
+            tokens = code.split(SEPARATOR)
+            _insert(self.prefixes, tokens, code)
+            if len(tokens) > 1:
+                _insert(self.suffixes, tokens[:0:-1], code)
+    
+    def longest_prefix(self, tokens: List[str]) -> Tuple[Optional[str], int]:
+        """Longest known code made of the first tokens, and how many tokens it used"""
+        node = self.prefixes
+        found, used = None, 0
+        # Последний токен не берем: полное совпадение есть в справочнике и сюда не доходит
+        for index, token in enumerate(tokens[:-1]):
+            node = node.get(token)
+            if node is None:
+                break
+            if _CODE in node:
+                found, used = node[_CODE], index + 1
+        return found, used
+    
+    def same_tail(self, tokens: List[str]) -> Optional[str]:
+        """Known code that differs only by the first (nation) token"""
+        if len(tokens) < 2:
+            return None
+        node = self.suffixes
+        for token in reversed(tokens[1:]):
+            node = node.get(token)
+            if node is None:
+                return None
+        return node.get(_CODE)
+    
+    def find(self, code: str) -> Optional[Tuple[str, Tuple[str, ...]]]:
+        """Known base code and leftover tokens, None if code is not a variant"""
+        tokens = code.split(SEPARATOR)
+        base, used = self.longest_prefix(tokens)
+        if base is not None:
+            return base, tuple(tokens[used:])
+        base = self.same_tail(tokens)
+        if base is not None:
+            return base, ()
+        return None
+
+def variant_label(tokens: Tuple[str, ...], lang: str) -> str:
+    """Readable label of leftover tokens, e.g. ("late", "iaf") -> "Late" """
+    labels = []
+    for token in tokens:
+        if token in EVENT_TOKENS:
+            break
+        if token in NATION_TOKENS:
+            continue
+        label = LABELS.get(token)
+        labels.append(label.get(lang, label["en"]) if label else token)
+    return " ".join(labels)
+
+class VariantResolver:
+    """Memoized variant lookups; tries are rebuilt when the catalog file is swapped"""
+    
+    def __init__(self):
+        self._generation = None
+        self._indexes: Dict[str, VariantIndex] = {}
+        self._memo: Dict[Tuple[str, str], Optional[Tuple[str, Tuple[str, ...]]]] = {}
+        self._lock = threading.Lock()
+    
+    def _index(self, catalog, army: str) -> VariantIndex:
+        if catalog.generation != self._generation:
+            self._indexes.clear()
+            self._memo.clear()
+            self._generation = catalog.generation
+        index = self._indexes.get(army)
+        if index is None:
+            index = self._indexes[army] = VariantIndex(catalog.codes(army))
+        return index
+    
+    def find(self, army: str, code: str) -> Optional[Tuple[str, Tuple[str, ...]]]:
+        catalog = get_catalog()
+        key = (army, code)
+        with self._lock:
+            index = self._index(catalog, army)
+            if key in self._memo:
+                return self._memo[key]
+            if len(self._memo) >= MEMO_LIMIT:
+                self._memo.clear()
+            found = self._memo[key] = index.find(code)
+            return found
+    
+    def name(self, army: str, code: str, lang: str) -> str:
+        """Display name derived from the known base, empty string if code is not a variant"""
+        found = self.find(army, code)
+        if found is None:
+            return ""
+        base, tokens = found
+        base_name = get_catalog().name(army, base, lang)
+        if not base_name:
+            return ""
+        label = variant_label(tokens, lang)
+        return f"{base_name} {label}" if label else base_name
+
+_resolver = VariantResolver()
+
+def variant_name(army: str, code: str, lang: str) -> str:
+    return _resolver.name(army, code, lang)
@@ -0,0 +1,123 @@
+# discord/vehicles.py
+"""Vehicle records resolved once per (code, lang) and kept in a bounded LRU cache.
+
+A record holds everything the status needs about a vehicle: normalized code,
+readable name, encyclopedia image URL and army type. The cache is cleared
+when the language changes, because every cached name belongs to one language,
+and when the next miss finds that discord.catalog swapped in a new file.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from configs import metrics
+from discord.catalog import get_catalog
+from discord.variants import variant_name
+
+IMAGE_URL = "https://static.encyclopedia.warthunder.com/images/{}.png"
+GROUND_PREFIX = "tankModels/"
+
+AIR = "air"
+GROUND = "ground"
+
+DEFAULT_CAPACITY = 256
+
+@dataclass(frozen=True)
+class VehicleRecord:
+    """Fully resolved vehicle"""
+    code: str
+    name: str
+    img: str
+    army: str
+
+def normalize_code(vehicle_game_name: str) -> str:
+    """Vehicle code without the tankModels/ prefix of ground vehicles"""
+    if vehicle_game_name.startswith(GROUND_PREFIX):
+        return vehicle_game_name[len(GROUND_PREFIX):]
+    return vehicle_game_name
+
+def build_record(code: str, army: str, lang: str) -> VehicleRecord:
+    """Resolve vehicle without the cache"""
+    name = get_catalog().name(army, code, lang) or variant_name(army, code, lang)
+    if not name:
+        # Нет в справочнике и не вариант известной техники - показываем кодовое имя
+        name = code.replace("_", " ")
+    return VehicleRecord(code=code, name=name, img=IMAGE_URL.format(code), army=army)
+
+class VehicleResolver:
+    """Bounded LRU cache of vehicle records keyed by (code, army)"""
+    
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lang: Optional[str] = None
+        self._generation = None
+        self._records: "OrderedDict[Tuple[str, str], VehicleRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+        # (код из /indicators, запись) последней запрошенной техники - для discord.warm_start
+        self.last: Optional[Tuple[str, VehicleRecord]] = None
+    
+    def resolve(self, vehicle_game_name: str, army: str, lang: str) -> VehicleRecord:
+        """Record for vehicle code as reported by /indicators"""
+        key = (vehicle_game_name, army)
+        with self._lock:
+            if lang != self._lang:
+                # Сменился язык - все имена в кэше устарели
+                self._records.clear()
+                self._lang = lang
+            record = self._records.get(key)
+            if record is not None:
+                self._records.move_to_end(key)
+                self.hits += 1
+                self.last = (vehicle_game_name, record)
+                return record
+            self.misses += 1
+        
+        record = build_record(normalize_code(vehicle_game_name), army, lang)
+        self.last = (vehicle_game_name, record)
+        generation = get_catalog().generation
+        with self._lock:
+            if generation != self._generation:
+                # Справочник заменен новым файлом - старые записи могли измениться
+                self._records.clear()
+                self._generation = generation
+            if lang == self._lang:
+                self._records[key] = record
+                if len(self._records) > self.capacity:
+                    self._records.popitem(last=False)
+                    self.evictions += 1
+        return record
+    
+    def seed(self, vehicle_game_name: str, record: VehicleRecord, lang: str):
+        """Put a record resolved by an earlier run, e.g. the vehicle of the battle in progress"""
+        with self._lock:
+            if lang != self._lang:
+                self._records.clear()
+                self._lang = lang
+            self._records[(vehicle_game_name, record.army)] = record
+    
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._lang = None
+            self._generation = None
+    
+    def __len__(self) -> int:
+        return len(self._records)
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters"""
+        return {"hit": self.hits, "miss": self.misses, "eviction": self.evictions}
+
+_resolver = VehicleResolver()
+metrics.register_collector("vehicle_cache", "Vehicle record cache lookups by result", "result", _resolver.stats)
+
+def get_resolver() -> VehicleResolver:
+    return _resolver
+
+def resolve_vehicle(vehicle_game_name: str, army: str, lang: str) -> VehicleRecord:
+    """Cached record of vehicle for language"""
+    return _resolver.resolve(vehicle_game_name, army, lang)
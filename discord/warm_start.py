@@ -0,0 +1,116 @@
+# discord/warm_start.py
+"""Last shown presence kept on disk, so a restart shows it at once.
+
+Every presence sent to Discord is written to presence_state.json (next to
+settings.json) with the session start time and the vehicle record it was
+built from. The small file is written to a temporary name and swapped in with
+os.replace, so a crash never leaves a half-written state.
+
+On launch, a recent state is published as soon as Discord connects, if War
+Thunder still accepts connections; the first real poll runs meanwhile and
+replaces it. The session timer continues from the saved start.
+"""
+import json
+import logging
+import os
+import time
+from typing import Optional, Tuple
+
+from discord.vehicles import VehicleRecord, get_resolver
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "presence_state.json"
+VERSION = 1
+# Более старое состояние не показываем: игра за это время наверняка сменила бой
+MAX_AGE = 30 * 60
+
+class WarmState:
+    """Presence saved by the previous run"""
+    
+    __slots__ = ("payload", "lang", "start", "saved", "vehicle")
+    
+    def __init__(self, payload: dict, lang: str, start: Optional[int], saved: float,
+                 vehicle: Optional[Tuple[str, VehicleRecord]] = None):
+        self.payload = payload
+        self.lang = lang
+        self.start = start
+        self.saved = saved
+        # (код из /indicators, запись техники) последней найденной техники
+        self.vehicle = vehicle
+
+class WarmStateStore:
+    """Atomic writes of the last presence; reading it back at launch"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.writes = 0
+    
+    def save(self, payload: dict, lang: str, vehicle: Optional[Tuple[str, VehicleRecord]] = None):
+        data = {
+            "version": VERSION,
+            "saved": time.time(),
+            "lang": lang,
+            "start": payload.get("start"),
+            "payload": payload,
+        }
+        if vehicle is not None:
+            game_name, record = vehicle
+            data["vehicle"] = {"game_name": game_name, "code": record.code, "name": record.name,
+                               "img": record.img, "army": record.army}
+        
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+            self.writes += 1
+        except OSError as e:
+            logger.debug(f"Cannot save {self.path}: {e}")
+    
+    def load(self, lang: Optional[str] = None, max_age: float = MAX_AGE) -> Optional[WarmState]:
+        """Saved state, None if it is missing, broken, older than max_age seconds or made for another lang"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        try:
+            if data.get("version") != VERSION or not isinstance(data["payload"], dict):
+                return None
+            if not 0 <= time.time() - data["saved"] < max_age:
+                return None
+            # Статус на другом языке показывать нельзя: lang мог смениться в settings.json
+            if lang is not None and data["lang"] != lang:
+                return None
+            vehicle = None
+            if isinstance(data.get("vehicle"), dict):
+                fields = data["vehicle"]
+                vehicle = (fields["game_name"], VehicleRecord(fields["code"], fields["name"], fields["img"], fields["army"]))
+            return WarmState(data["payload"], data["lang"], data.get("start"), data["saved"], vehicle)
+        except (KeyError, TypeError, AttributeError):
+            return None
+
+_store: Optional[WarmStateStore] = None
+
+def configure(path: str) -> WarmStateStore:
+    """Turn saving on; without it (replay, benchmarks) nothing is written"""
+    global _store
+    _store = WarmStateStore(path)
+    return _store
+
+def save_presence(payload: dict, lang: str):
+    """Persist a presence just sent to Discord"""
+    if _store is not None:
+        _store.save(payload, lang, get_resolver().last)
+
+def restore(state: WarmState):
+    """Show the saved presence once Discord connects and warm up the vehicle cache"""
+    from discord import rpc
+    if state.start:
+        rpc.set_start_time(state.start)
+    if state.vehicle is not None:
+        game_name, record = state.vehicle
+        get_resolver().seed(game_name, record, state.lang)
+    rpc.hold_presence(state.payload, state.lang)
@@ -1,9 +1,53 @@
 # game/api.py
-import json
 import logging
+import socket
+import sys
 import time
-from typing import Optional, Tuple
-import requests
+from collections import namedtuple
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+from configs import metrics
+from configs import tracing
+from configs.i18n import get_translator
+from game import json_backend
+from game.breaker import CircuitBreaker
+from game.http_client import HTTPClientError, ClientConnectionError, ClientTimeout, HTTPStatusError
+from game.json_stream import JSONArrayStream
+
+if TYPE_CHECKING:
+    import requests
+
+API_URL = "http://127.0.0.1:8111"
+MAP_INFO_URL = f"{API_URL}/map_info.json"
+INDICATORS_URL = f"{API_URL}/indicators"
+STATE_URL = f"{API_URL}/state"
+MAP_OBJ_URL = f"{API_URL}/map_obj.json"
+HUDMSG_URL = f"{API_URL}/hudmsg"
+MAP_IMG_URL = f"{API_URL}/map.img"
+
+def set_api_url(base_url: str):
+    """Point all endpoints to another server, e.g. benchmarks/mock_server.py"""
+    global API_URL, MAP_INFO_URL, INDICATORS_URL, STATE_URL, MAP_OBJ_URL, HUDMSG_URL, MAP_IMG_URL
+    API_URL = base_url.rstrip("/")
+    MAP_INFO_URL = f"{API_URL}/map_info.json"
+    INDICATORS_URL = f"{API_URL}/indicators"
+    STATE_URL = f"{API_URL}/state"
+    MAP_OBJ_URL = f"{API_URL}/map_obj.json"
+    HUDMSG_URL = f"{API_URL}/hudmsg"
+    MAP_IMG_URL = f"{API_URL}/map.img"
+
+# Лимиты размера ответа тяжелых endpoint: больший ответ не дочитывается
+STREAM_LIMITS = {
+    "/map_obj.json": 512 * 1024,
+    "/hudmsg": 256 * 1024,
+    "/gamechat": 256 * 1024,
+    "/map.img": 4 * 1024 * 1024,
+}
+DEFAULT_STREAM_LIMIT = 1024 * 1024
+STREAM_CHUNK_SIZE = 16 * 1024
+
+class ResponseTooLarge(Exception):
+    """Response exceeded the size limit of its endpoint"""
 
 # Определяем структуры локально, чтобы избежать циклических импортов
 class MapStruct:
@@ -20,101 +64,211 @@ class MainInfoStruct:
         self.speed = speed
         self.rpm = rpm
 
+class TelemetrySnapshot:
+    def __init__(self, map_data=None, main_info=None, state_ok=False, state_body=b"", elapsed=0.0, stale=False):
+        self.map_data = map_data if map_data is not None else MapStruct()
+        self.main_info = main_info
+        self.state_ok = state_ok
+        self.state_body = state_body
+        self.elapsed = elapsed
+        # True - часть данных не получена, стоит оставить прежний статус
+        self.stale = stale
+
 logger = logging.getLogger(__name__)
 
-# Global variables for tracking attempts
-_connection_attempts = 0
-_max_attempts = 16
-_last_attempt_time = 0
+ClientErrors = namedtuple("ClientErrors", "timeout connection http request")
+_LOCAL_ERRORS = ClientErrors((ClientTimeout,), (ClientConnectionError,), (HTTPStatusError,), (HTTPClientError,))
+_client_errors = None
+
+def _errors() -> ClientErrors:
+    """Exception classes of both clients: requests.Session and game.http_client.LocalHTTPClient
+    
+    requests is imported only when init_http_client creates a session, and before
+    that none of its exceptions can be raised. Called only on error paths.
+    """
+    global _client_errors
+    if _client_errors is None:
+        requests = sys.modules.get("requests")
+        if requests is None:
+            # Не запоминаем: requests может загрузиться позже
+            return _LOCAL_ERRORS
+        exceptions = requests.exceptions
+        _client_errors = ClientErrors(
+            (exceptions.Timeout, ClientTimeout),
+            (exceptions.ConnectionError, ClientConnectionError),
+            (exceptions.HTTPError, HTTPStatusError),
+            (exceptions.RequestException, HTTPClientError),
+        )
+    return _client_errors
+
+# После стольких неудачных опросов /map_info.json подряд игра считается закрытой:
+# HTTP запросы прекращаются, а наличие игры проверяется дешевым probe_game_port().
+# Пока неудач меньше, цикл продолжает показывать последний известный статус.
+_max_attempts = 3
+
+_breakers = {}
 _connection_failed = False
 
-def _reset_connection_attempts():
-    """Reset attempt counter"""
-    global _connection_attempts, _last_attempt_time, _connection_failed
-    _connection_attempts = 0
-    _last_attempt_time = 0
+def get_breaker(url: str) -> CircuitBreaker:
+    """Circuit breaker of the endpoint"""
+    path = urlsplit(url).path
+    breaker = _breakers.get(path)
+    if breaker is None:
+        breaker = _breakers[path] = CircuitBreaker(path)
+    return breaker
+
+def reset_breakers():
+    """Forget all failures, e.g. when the game has been started again"""
+    global _connection_failed
+    _breakers.clear()
     _connection_failed = False
 
-def _increment_connection_attempts(lang: str = "en"):
-    """Increment attempt counter and delay if needed"""
-    global _connection_attempts, _last_attempt_time, _connection_failed
-    
-    if _connection_attempts > 0:
-        # Каждая попытка ждет 10 секунд
-        delay = 10
-        try:
-            from configs.translations import get_translation
-            message = get_translation(lang, "attempt_waiting")
-            logger.warning(message.format(attempt=_connection_attempts + 1, seconds=delay))
-        except ImportError:
-            logger.warning(f"Attempt #{_connection_attempts + 1}: waiting {delay} seconds...")
-        time.sleep(delay)
+def _record_success(url: str, latency: float):
+    """Endpoint answered"""
+    get_breaker(url).record_success(latency)
+
+def _record_failure(url: str, lang: str = "en"):
+    """Endpoint did not answer; never sleeps"""
+    global _connection_failed
+    breaker = get_breaker(url)
     
-    _connection_attempts += 1
-    _last_attempt_time = time.time()
+    if breaker.record_failure():
+        logger.warning(get_translator(lang).format("circuit_open", endpoint=breaker.name,
+                                                   seconds=round(breaker.retry_in(), 1)))
     
-    if _connection_attempts >= _max_attempts:
-        try:
-            from configs.translations import get_translation
-            message = get_translation(lang, "max_attempts_reached")
-            logger.error(message)
-        except ImportError:
-            logger.error("Max connection attempts to War Thunder reached")
+    if url == MAP_INFO_URL and breaker.consecutive_failures >= _max_attempts:
         _connection_failed = True
-        return False
-    
-    return True
 
 def check_connection_failed():
-    """Check if max attempts reached"""
+    """Check if the game is considered closed (standby mode)"""
     return _connection_failed
 
-def make_request(url: str, http_client, lang: str = "en") -> Optional[requests.Response]:
-    """Make HTTP request"""
+def probe_game_port(timeout: float = 0.5) -> bool:
+    """Cheap check if War Thunder accepts connections on its API port, no HTTP involved"""
+    parts = urlsplit(API_URL)
     try:
-        response = http_client.get(url, timeout=5)
-        
-        if response.status_code != 200:
-            logger.warning(f"Unexpected status code from {url}: {response.status_code}")
-        
-        # Если запрос успешен, сбрасываем счетчик попыток
-        _reset_connection_attempts()
-        response.raise_for_status()
-        return response
-        
-    except requests.exceptions.Timeout:
-        logger.error(f"Timeout when requesting {url}")
-        if not _increment_connection_attempts(lang):
-            return None
-    except requests.exceptions.ConnectionError:
+        with socket.create_connection((parts.hostname, parts.port or 80), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+_recorder = None
+
+def set_recorder(recorder):
+    """Record every raw response of the game API (game.recorder.TelemetryRecorder), None to stop"""
+    global _recorder
+    _recorder = recorder
+
+def _record_exchange(url: str, response=None, error: Optional[Exception] = None):
+    """Pass request result to the recorder if recording is on"""
+    if _recorder is None:
+        return
+    if error is not None:
+        # HTTP ошибка - ответ все равно есть, записываем его как есть
+        response = getattr(error, "response", None)
+        if response is None:
+            errors = _errors()
+            kind = "timeout" if isinstance(error, errors.timeout) else "connection" if isinstance(error, errors.connection) else "other"
+            _recorder.record(url, error_kind=kind)
+            return
+    _recorder.record(url, response)
+
+def _check_response(url: str, response):
+    """Warn about unexpected status and raise on 4xx/5xx"""
+    if response.status_code != 200:
+        logger.warning(f"Unexpected status code from {url}: {response.status_code}")
+    
+    response.raise_for_status()
+
+def _fetch(url: str, http_client, timeout: float = 5) -> Tuple[Optional["requests.Response"], Optional[Exception]]:
+    """Perform GET without touching breakers"""
+    response = None
+    try:
+        with metrics.timer("fetch", urlsplit(url).path):
+            response = http_client.get(url, timeout=timeout)
+        _record_exchange(url, response)
+        _check_response(url, response)
+        return response, None
+    except _errors().request as e:
+        if response is None:
+            _record_exchange(url, error=e)
+        return None, e
+
+def _fetch_many(urls: List[str], http_client, timeout: float = 5) -> List[Tuple[Optional["requests.Response"], Optional[Exception]]]:
+    """Pipeline GETs over one connection (LocalHTTPClient.get_many)"""
+    try:
+        with metrics.timer("fetch", "pipelined"):
+            responses = http_client.get_many(urls, timeout=timeout)
+    except _errors().request as e:
+        for url in urls:
+            _record_exchange(url, error=e)
+        return [(None, e)] * len(urls)
+    
+    results = []
+    for url, response in zip(urls, responses):
+        _record_exchange(url, response)
         try:
-            from configs.translations import get_translation
-            message = get_translation(lang, "connection_error")
-            logger.error(message)
-        except ImportError:
-            logger.error("Connection error")
-        if not _increment_connection_attempts(lang):
-            return None
-    except requests.exceptions.HTTPError as e:
-        logger.error(f"HTTP error: {e.response.status_code if hasattr(e, 'response') else 'Unknown'}")
-        _reset_connection_attempts()
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Request error: {str(e).split(':')[0] if ':' in str(e) else 'Unknown error'}")
-        _reset_connection_attempts()
+            _check_response(url, response)
+            results.append((response, None))
+        except _errors().request as e:
+            results.append((None, e))
+    return results
+
+def _is_connection_error(error: Exception) -> bool:
+    """Timeout or refused/reset connection - game is not answering"""
+    errors = _errors()
+    return isinstance(error, errors.timeout + errors.connection)
+
+def _report_request_error(url: str, error: Exception, lang: str = "en") -> bool:
+    """Log request error, return True if it is a connection failure"""
+    errors = _errors()
+    if isinstance(error, errors.timeout):
+        metrics.inc("request_errors", "timeout")
+        logger.error(f"Timeout when requesting {url}")
+        return True
+    if isinstance(error, errors.connection):
+        metrics.inc("request_errors", "connection")
+        logger.error(get_translator(lang)("connection_error"))
+        return True
+    if isinstance(error, errors.http):
+        metrics.inc("request_errors", "http")
+        logger.error(f"HTTP error: {error.response.status_code if error.response is not None else 'Unknown'}")
+        return False
+    metrics.inc("request_errors", "other")
+    logger.error(f"Request error: {str(error).split(':')[0] if ':' in str(error) else 'Unknown error'}")
+    return False
+
+def make_request(url: str, http_client, lang: str = "en") -> Optional["requests.Response"]:
+    """Make HTTP request; returns None at once while the endpoint's breaker is open"""
+    breaker = get_breaker(url)
+    if not breaker.allow_request():
+        return None
+    
+    started = time.perf_counter()
+    response, error = _fetch(url, http_client, breaker.timeout())
+    
+    if error is None:
+        _record_success(url, time.perf_counter() - started)
+        return response
+    
+    if _report_request_error(url, error, lang):
+        _record_failure(url, lang)
+    else:
+        # Игра ответила, пусть и ошибкой - соединение в порядке
+        _record_success(url, time.perf_counter() - started)
     
     return None
 
-def main_info_request(http_client, lang: str = "en") -> Optional[MainInfoStruct]:
-    """Request main vehicle information"""
-    if check_connection_failed():
-        return None
-        
-    response = make_request("http://127.0.0.1:8111/indicators", http_client, lang)
-    if not response:
+def _parse_main_info(response) -> Optional[MainInfoStruct]:
+    """Parse /indicators response"""
+    try:
+        with metrics.timer("parse", "/indicators"):
+            data = json_backend.loads(response.content)
+    except json_backend.DecodeError as e:
+        logger.error(f"JSON decoding error: {e}")
         return None
     
     try:
-        data = response.json()
         return MainInfoStruct(
             army_type=data.get("army", ""),
             vehicle_game_name=data.get("type", ""),
@@ -123,29 +277,19 @@ def main_info_request(http_client, lang: str = "en") -> Optional[MainInfoStruct]
             speed=float(data.get("speed", 0)),
             rpm=float(data.get("rpm", 0))
         )
-    except json.JSONDecodeError as e:
-        logger.error(f"JSON decoding error: {e}")
     except Exception as e:
         logger.error(f"Error in main_info_request: {e}")
     
     return None
 
-def map_request(http_client, lang: str = "en") -> MapStruct:
-    """Request map information"""
-    if check_connection_failed():
-        return MapStruct(valid=False, game_running=False)
-        
-    response = make_request("http://127.0.0.1:8111/map_info.json", http_client, lang)
-    
-    if response is None:
-        # Connection error - game not running or max attempts reached
-        return MapStruct(valid=False, game_running=False)
-    
+def _parse_map(response) -> MapStruct:
+    """Parse /map_info.json response"""
     try:
-        data = response.json()
+        with metrics.timer("parse", "/map_info.json"):
+            data = json_backend.loads(response.content)
         # Game is running, return map validity
         return MapStruct(valid=data.get("valid", False), game_running=True)
-    except json.JSONDecodeError as e:
+    except json_backend.DecodeError as e:
         logger.error(f"JSON decoding error: {e}")
     except Exception as e:
         logger.error(f"Error in map_request: {e}")
@@ -153,19 +297,258 @@ def map_request(http_client, lang: str = "en") -> MapStruct:
     # If we got here, game is running but something went wrong
     return MapStruct(valid=False, game_running=True)
 
-def air_state_request(http_client, lang: str = "en") -> Tuple[bool, str]:
-    """Request air vehicle state"""
+def main_info_request(http_client, lang: str = "en") -> Optional[MainInfoStruct]:
+    """Request main vehicle information"""
+    if check_connection_failed():
+        return None
+    
+    response = make_request(INDICATORS_URL, http_client, lang)
+    if not response:
+        return None
+    
+    return _parse_main_info(response)
+
+def map_request(http_client, lang: str = "en") -> MapStruct:
+    """Request map information"""
     if check_connection_failed():
-        return False, ""
-        
-    response = make_request("http://127.0.0.1:8111/state", http_client, lang)
+        return MapStruct(valid=False, game_running=False)
+    
+    response = make_request(MAP_INFO_URL, http_client, lang)
+    
+    if response is None:
+        # Connection error - game not running or max attempts reached
+        return MapStruct(valid=False, game_running=False)
+    
+    return _parse_map(response)
+
+def air_state_request(http_client, lang: str = "en") -> Tuple[bool, bytes]:
+    """Request air vehicle state; body is returned as raw bytes for game.state_decoder"""
+    if check_connection_failed():
+        return False, b""
+    
+    response = make_request(STATE_URL, http_client, lang)
     if not response:
-        return False, ""
+        return False, b""
     
     try:
-        text = response.text
-        return True, text
+        return True, response.content
     except Exception as e:
         logger.error(f"Error in air_state_request: {e}")
     
-    return False, ""
\ No newline at end of file
+    return False, b""
+
+def stream_limit(url: str) -> int:
+    """Size limit in bytes for endpoint of url"""
+    return STREAM_LIMITS.get(urlsplit(url).path, DEFAULT_STREAM_LIMIT)
+
+def _open_stream(url: str, http_client, lang: str = "en"):
+    """GET with stream=True: only status and headers are read; None on error or open breaker
+    
+    Streamed responses are not passed to the recorder, it would read the whole body.
+    """
+    breaker = get_breaker(url)
+    if check_connection_failed() or not breaker.allow_request():
+        return None
+    
+    started = time.perf_counter()
+    response = None
+    try:
+        with metrics.timer("fetch", urlsplit(url).path):
+            response = http_client.get(url, timeout=breaker.timeout(), stream=True)
+        _check_response(url, response)
+    except _errors().request as e:
+        if response is not None:
+            response.close()
+        if _report_request_error(url, e, lang):
+            _record_failure(url, lang)
+        else:
+            _record_success(url, time.perf_counter() - started)
+        return None
+    
+    _record_success(url, time.perf_counter() - started)
+    return response
+
+def _iter_capped(url: str, response, max_bytes: int) -> Iterator[bytes]:
+    """Body chunks; raises ResponseTooLarge as soon as max_bytes is exceeded"""
+    length = response.headers.get("content-length")
+    if length and length.isdigit() and int(length) > max_bytes:
+        # Размер известен заранее - тело даже не начинаем читать
+        raise ResponseTooLarge(f"{urlsplit(url).path}: {length} bytes, limit {max_bytes}")
+    
+    received = 0
+    for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+        received += len(chunk)
+        if received > max_bytes:
+            raise ResponseTooLarge(f"{urlsplit(url).path}: more than {max_bytes} bytes")
+        yield chunk
+
+def read_capped(url: str, http_client, lang: str = "en", max_bytes: Optional[int] = None) -> Optional[bytes]:
+    """Read whole body if it fits into the endpoint limit, otherwise None"""
+    response = _open_stream(url, http_client, lang)
+    if response is None:
+        return None
+    
+    try:
+        with metrics.timer("read", urlsplit(url).path):
+            return b"".join(_iter_capped(url, response, max_bytes or stream_limit(url)))
+    except ResponseTooLarge as e:
+        logger.warning(f"Response is too large, skipped: {e}")
+    except _errors().request as e:
+        _report_request_error(url, e, lang)
+    finally:
+        response.close()
+    return None
+
+def iter_json_array(url: str, http_client, lang: str = "en", key: Optional[str] = None,
+                    limit: Optional[int] = None, max_bytes: Optional[int] = None) -> Iterator[Any]:
+    """Yield items of a JSON array while the response is still being read
+    
+    key - take the array from this key of the top-level object (e.g. "damage" of /hudmsg).
+    Reading stops after limit items, at the end of the array, or at the endpoint size limit.
+    """
+    response = _open_stream(url, http_client, lang)
+    if response is None:
+        return
+    
+    parser = JSONArrayStream(key)
+    count = 0
+    try:
+        for chunk in _iter_capped(url, response, max_bytes or stream_limit(url)):
+            for item in parser.feed(chunk):
+                yield item
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+            if parser.finished:
+                # Массив закрыт - остаток документа не нужен
+                return
+        for item in parser.close():
+            yield item
+            count += 1
+            if limit is not None and count >= limit:
+                return
+    except ResponseTooLarge as e:
+        logger.warning(f"Response is too large, read {count} items: {e}")
+    except _errors().request as e:
+        _report_request_error(url, e, lang)
+    except ValueError as e:
+        logger.error(f"JSON decoding error in {urlsplit(url).path}: {e}")
+    finally:
+        response.close()
+
+def map_objects_request(http_client, lang: str = "en", limit: Optional[int] = None) -> List[dict]:
+    """Objects on the minimap from /map_obj.json"""
+    return list(iter_json_array(MAP_OBJ_URL, http_client, lang, limit=limit))
+
+def hud_damage_request(http_client, last_damage_id: int = 0, lang: str = "en", limit: Optional[int] = None) -> List[dict]:
+    """Kill feed messages from /hudmsg newer than last_damage_id"""
+    url = f"{HUDMSG_URL}?lastEvt=0&lastDmg={last_damage_id}"
+    return list(iter_json_array(url, http_client, lang, key="damage", limit=limit))
+
+def map_image_request(http_client, lang: str = "en") -> Optional[bytes]:
+    """Minimap image from /map.img, None if it is larger than the limit"""
+    return read_capped(MAP_IMG_URL, http_client, lang)
+
+async def poll_telemetry_async(http_client, lang: str = "en", include_state: bool = True,
+                               include_indicators: bool = True, map_data: Optional[MapStruct] = None) -> TelemetrySnapshot:
+    """Fetch map, indicators and state concurrently
+    
+    If map_data is passed, /map_info.json is not requested again.
+    """
+    import asyncio
+    started = time.perf_counter()
+    
+    if check_connection_failed():
+        return TelemetrySnapshot(map_data=MapStruct(valid=False, game_running=False))
+    
+    requested = []
+    if map_data is None:
+        requested.append(MAP_INFO_URL)
+    if include_indicators:
+        requested.append(INDICATORS_URL)
+    if include_state:
+        requested.append(STATE_URL)
+    
+    # Endpoint с открытым breaker не опрашиваем, ответ за него - последний известный статус
+    urls = [url for url in requested if get_breaker(url).allow_request()]
+    skipped = len(urls) < len(requested)
+    timeout = max((get_breaker(url).timeout() for url in urls), default=5)
+    
+    started_fetch = time.perf_counter()
+    if not urls:
+        results = []
+    elif hasattr(http_client, "get_many"):
+        # Легкий клиент отправляет все запросы одним пакетом по одному соединению
+        results = await asyncio.to_thread(_fetch_many, urls, http_client, timeout)
+    else:
+        # requests блокирующий, поэтому каждый запрос идет в своем потоке
+        results = await asyncio.gather(*(asyncio.to_thread(_fetch, url, http_client, timeout) for url in urls))
+    latency = time.perf_counter() - started_fetch
+    responses = {}
+    
+    connection_failed = False
+    any_success = False
+    for url, (response, error) in zip(urls, results):
+        responses[url] = response
+        if error is None:
+            any_success = True
+            _record_success(url, latency)
+        elif _is_connection_error(error):
+            # Игра не отвечает - достаточно одного сообщения на тик
+            if not connection_failed:
+                _report_request_error(url, error, lang)
+            connection_failed = True
+            _record_failure(url, lang)
+        else:
+            _report_request_error(url, error, lang)
+            _record_success(url, latency)
+    
+    # Пропущенный или неудачный опрос не меняет статус, пока игра не признана закрытой
+    stale = (skipped or connection_failed) and not check_connection_failed()
+    
+    if map_data is None:
+        map_response = responses.get(MAP_INFO_URL)
+        if map_response is None:
+            map_data = MapStruct(valid=False, game_running=any_success)
+        else:
+            map_data = _parse_map(map_response)
+    
+    main_info = None
+    if responses.get(INDICATORS_URL) is not None:
+        main_info = _parse_main_info(responses[INDICATORS_URL])
+    
+    state_ok, state_body = False, b""
+    if responses.get(STATE_URL) is not None:
+        try:
+            # Тело /state не декодируется в str - game.state_decoder читает байты
+            state_body = responses[STATE_URL].content
+            state_ok = True
+        except Exception as e:
+            logger.error(f"Error in air_state_request: {e}")
+    
+    return TelemetrySnapshot(
+        map_data=map_data,
+        main_info=main_info,
+        state_ok=state_ok,
+        state_body=state_body,
+        elapsed=time.perf_counter() - started,
+        stale=stale
+    )
+
+_poll_loop = None
+
+def poll_telemetry(http_client, lang: str = "en", include_state: bool = True,
+                   include_indicators: bool = True, map_data: Optional[MapStruct] = None) -> TelemetrySnapshot:
+    """Synchronous wrapper around poll_telemetry_async for the update loop"""
+    global _poll_loop
+    
+    # Один event loop на всё время работы, чтобы не создавать его каждый тик
+    if _poll_loop is None or _poll_loop.is_closed():
+        # asyncio загружается к первому опросу, а не при запуске
+        import asyncio
+        _poll_loop = asyncio.new_event_loop()
+    
+    with tracing.span("poll", state=include_state, indicators=include_indicators):
+        return _poll_loop.run_until_complete(
+            poll_telemetry_async(http_client, lang, include_state, include_indicators, map_data)
+        )
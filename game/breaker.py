@@ -0,0 +1,85 @@
+# game/breaker.py
+import time
+from typing import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Circuit breaker with exponential backoff and latency-based timeout for one endpoint
+    
+    closed    - requests go through, failures are counted
+    open      - requests are rejected at once until the backoff expires
+    half_open - one probe request decides between closed and open again
+    """
+    
+    def __init__(self, name: str, failure_threshold: int = 2, base_backoff: float = 1.0,
+                 max_backoff: float = 30.0, min_timeout: float = 0.25, max_timeout: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self._clock = clock
+        
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._backoff = base_backoff
+        self._open_until = 0.0
+        
+        # Сглаженная задержка и ее разброс, как RTO в TCP
+        self._latency = None
+        self._latency_var = 0.0
+    
+    def allow_request(self) -> bool:
+        """Check if a request may be sent now; never blocks"""
+        if self.state == OPEN:
+            if self._clock() < self._open_until:
+                return False
+            self.state = HALF_OPEN
+        return True
+    
+    def record_success(self, latency: float = None):
+        """Endpoint answered"""
+        if latency is not None:
+            if self._latency is None:
+                self._latency = latency
+                self._latency_var = latency / 2
+            else:
+                self._latency_var = 0.75 * self._latency_var + 0.25 * abs(self._latency - latency)
+                self._latency = 0.875 * self._latency + 0.125 * latency
+        
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._backoff = self.base_backoff
+    
+    def record_failure(self) -> bool:
+        """Endpoint did not answer; returns True if the breaker has just opened"""
+        self.consecutive_failures += 1
+        
+        if self.state == HALF_OPEN:
+            # Пробный запрос не прошел - ждем вдвое дольше
+            self._backoff = min(self._backoff * 2, self.max_backoff)
+        elif self.state == OPEN or self.consecutive_failures < self.failure_threshold:
+            return False
+        
+        self.state = OPEN
+        self._open_until = self._clock() + self._backoff
+        return True
+    
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed"""
+        if self.state != OPEN:
+            return 0.0
+        return max(self._open_until - self._clock(), 0.0)
+    
+    def timeout(self) -> float:
+        """Request timeout adapted to measured latency, doubled after each failure"""
+        if self._latency is None:
+            return self.max_timeout
+        timeout = max(self._latency + 4 * self._latency_var, self.min_timeout)
+        timeout *= 2 ** min(self.consecutive_failures, 4)
+        return min(timeout, self.max_timeout)
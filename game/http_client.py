@@ -0,0 +1,354 @@
+# game/http_client.py
+import logging
+import socket
+import threading
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from game import json_backend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "WarThunder-Rich-Presence/1.0",
+    "Accept": "application/json",
+    "Connection": "keep-alive"
+}
+
+class HTTPClientError(Exception):
+    """Base error of the local HTTP client"""
+
+class ClientConnectionError(HTTPClientError, ConnectionError):
+    """Connection refused, reset or closed before a full response"""
+
+class ClientTimeout(HTTPClientError, TimeoutError):
+    """No response within timeout"""
+
+class HTTPStatusError(HTTPClientError):
+    """Response with 4xx/5xx status"""
+    
+    def __init__(self, message: str, response: "LocalResponse"):
+        super().__init__(message)
+        self.response = response
+
+class LocalResponse:
+    """Minimal response object with the part of requests.Response we use"""
+    
+    def __init__(self, url: str, status_code: int, reason: str, headers: dict, content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+    
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+    
+    def json(self):
+        return json_backend.loads(self.content)
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise HTTPStatusError(f"{self.status_code} {self.reason} for url: {self.url}", self)
+    
+    def iter_content(self, chunk_size: int = 16384) -> Iterator[bytes]:
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+    
+    def close(self):
+        pass
+
+class LocalStreamResponse(LocalResponse):
+    """Response whose body is read from its own connection on demand
+    
+    Reading can stop at any moment: close() drops the connection
+    together with the unread rest of the body.
+    """
+    
+    def __init__(self, url: str, status_code: int, reason: str, headers: dict, sock, reader):
+        super().__init__(url, status_code, reason, headers, b"")
+        self._sock = sock
+        self._reader = reader
+        self._consumed = False
+    
+    @property
+    def content(self) -> bytes:
+        if not self._consumed:
+            self._content = b"".join(self.iter_content())
+        return self._content
+    
+    @content.setter
+    def content(self, value: bytes):
+        self._content = value
+    
+    def iter_content(self, chunk_size: int = 16384) -> Iterator[bytes]:
+        if self._consumed:
+            yield from super().iter_content(chunk_size)
+            return
+        self._consumed = True
+        try:
+            yield from _iter_body(self._reader, self.headers, chunk_size)
+        except socket.timeout:
+            raise ClientTimeout("Read timed out")
+        except OSError as e:
+            raise ClientConnectionError(str(e))
+        finally:
+            self.close()
+    
+    def close(self):
+        for closable in (self._reader, self._sock):
+            if closable is not None:
+                try:
+                    closable.close()
+                except OSError:
+                    pass
+        self._reader = None
+        self._sock = None
+
+def _read_line(reader) -> bytes:
+    line = reader.readline(65537)
+    if not line:
+        raise ClientConnectionError("Connection closed by server")
+    return line
+
+def _read_head(reader) -> Tuple[str, int, str, dict]:
+    """Status line and headers: version, status code, reason, lowercased headers"""
+    status_line = _read_line(reader).decode("latin-1").rstrip("\r\n")
+    version, _, rest = status_line.partition(" ")
+    code, _, reason = rest.partition(" ")
+    if not version.startswith("HTTP/") or not code.isdigit():
+        raise ClientConnectionError(f"Bad status line: {status_line!r}")
+    
+    headers = {}
+    while True:
+        line = _read_line(reader)
+        if line in (b"\r\n", b"\n"):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return version, int(code), reason, headers
+
+def _chunk_size(line: bytes) -> int:
+    """Size from a chunk header line of a chunked body"""
+    try:
+        size = int(line.split(b";")[0].strip(), 16)
+    except ValueError:
+        size = -1
+    if size < 0:
+        raise ClientConnectionError(f"Bad chunk size: {line[:40]!r}")
+    return size
+
+def _content_length(headers: dict) -> Optional[int]:
+    """Content-Length header, None if there is none"""
+    length = headers.get("content-length")
+    if length is None:
+        return None
+    try:
+        size = int(length)
+    except ValueError:
+        size = -1
+    if size < 0:
+        raise ClientConnectionError(f"Bad Content-Length: {length[:40]!r}")
+    return size
+
+def _iter_body(reader, headers: dict, chunk_size: int) -> Iterator[bytes]:
+    """Body in pieces of at most chunk_size bytes"""
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = _chunk_size(_read_line(reader))
+            if size == 0:
+                return
+            while size > 0:
+                data = reader.read(min(size, chunk_size))
+                if not data:
+                    raise ClientConnectionError("Connection closed in the middle of response body")
+                size -= len(data)
+                yield data
+            _read_line(reader)
+    
+    remaining = _content_length(headers)
+    while remaining is None or remaining > 0:
+        data = reader.read1(chunk_size if remaining is None else min(chunk_size, remaining))
+        if not data:
+            if remaining is not None:
+                raise ClientConnectionError("Connection closed in the middle of response body")
+            return
+        if remaining is not None:
+            remaining -= len(data)
+        yield data
+
+class LocalHTTPClient:
+    """Keep-alive HTTP/1.1 client for the local War Thunder API
+    
+    Holds a single socket per host and can pipeline several GET requests
+    over it with get_many(). Responses are read as raw bytes.
+    """
+    
+    def __init__(self, headers: Optional[dict] = None):
+        self.headers = dict(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+        self._sock = None
+        self._reader = None
+        self._netloc = None
+        self._lock = threading.Lock()
+    
+    def get(self, url: str, timeout: float = 5, stream: bool = False) -> LocalResponse:
+        """GET single url; with stream=True the body is read later over a separate connection"""
+        if stream:
+            return self._open_stream(url, timeout)
+        return self.get_many([url], timeout)[0]
+    
+    def get_many(self, urls: List[str], timeout: float = 5) -> List[LocalResponse]:
+        """Pipeline GET requests for urls on one connection, responses in the same order"""
+        if not urls:
+            return []
+        
+        netloc = urlsplit(urls[0]).netloc
+        for url in urls:
+            if urlsplit(url).netloc != netloc:
+                raise ValueError("get_many() needs all urls on the same host")
+        
+        with self._lock:
+            # Сервер мог закрыть простаивающее соединение - повторяем один раз на новом
+            reused = self._sock is not None and self._netloc == netloc
+            try:
+                return self._exchange(netloc, urls, timeout)
+            except ClientConnectionError:
+                self._close_socket()
+                if not reused:
+                    raise
+            return self._exchange(netloc, urls, timeout)
+    
+    def close(self):
+        with self._lock:
+            self._close_socket()
+    
+    def _exchange(self, netloc: str, urls: List[str], timeout: float) -> List[LocalResponse]:
+        self._connect(netloc, timeout)
+        try:
+            self._sock.settimeout(timeout)
+            self._sock.sendall(b"".join(self._build_request(url, netloc) for url in urls))
+            
+            responses = []
+            for url in urls:
+                response, keep_alive = self._read_response(url)
+                responses.append(response)
+                if not keep_alive and len(responses) < len(urls):
+                    raise ClientConnectionError("Server closed pipelined connection")
+            
+            if not keep_alive:
+                self._close_socket()
+            return responses
+        except HTTPClientError:
+            self._close_socket()
+            raise
+        except socket.timeout:
+            self._close_socket()
+            raise ClientTimeout(f"Read timed out ({timeout}s)")
+        except OSError as e:
+            self._close_socket()
+            raise ClientConnectionError(str(e))
+    
+    def _open_stream(self, url: str, timeout: float) -> LocalStreamResponse:
+        # Отдельное соединение: недочитанное тело не мешает основному keep-alive сокету
+        netloc = urlsplit(url).netloc
+        host, _, port = netloc.partition(":")
+        sock = None
+        try:
+            sock = socket.create_connection((host, int(port or 80)), timeout=timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            request = self._build_request(url, netloc).replace(b"Connection: keep-alive", b"Connection: close")
+            sock.sendall(request)
+            reader = sock.makefile("rb")
+            _, code, reason, headers = _read_head(reader)
+            return LocalStreamResponse(url, code, reason, headers, sock, reader)
+        except HTTPClientError:
+            if sock is not None:
+                sock.close()
+            raise
+        except socket.timeout:
+            if sock is not None:
+                sock.close()
+            raise ClientTimeout(f"Connection to {netloc} timed out ({timeout}s)")
+        except OSError as e:
+            if sock is not None:
+                sock.close()
+            raise ClientConnectionError(str(e))
+    
+    def _connect(self, netloc: str, timeout: float):
+        if self._sock is not None and self._netloc == netloc:
+            return
+        self._close_socket()
+        
+        host, _, port = netloc.partition(":")
+        try:
+            sock = socket.create_connection((host, int(port or 80)), timeout=timeout)
+        except socket.timeout:
+            raise ClientTimeout(f"Connection to {netloc} timed out ({timeout}s)")
+        except OSError as e:
+            raise ClientConnectionError(str(e))
+        
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self._reader = sock.makefile("rb")
+        self._netloc = netloc
+    
+    def _close_socket(self):
+        for closable in (self._reader, self._sock):
+            if closable is not None:
+                try:
+                    closable.close()
+                except OSError:
+                    pass
+        self._sock = None
+        self._reader = None
+        self._netloc = None
+    
+    def _build_request(self, url: str, netloc: str) -> bytes:
+        parts = urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        lines = [f"GET {target} HTTP/1.1", f"Host: {netloc}"]
+        lines.extend(f"{name}: {value}" for name, value in self.headers.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+    
+    def _read_line(self) -> bytes:
+        return _read_line(self._reader)
+    
+    def _read_response(self, url: str) -> Tuple[LocalResponse, bool]:
+        version, code, reason, headers = _read_head(self._reader)
+        keep_alive = version != "HTTP/1.0" and headers.get("connection", "").lower() != "close"
+        content = self._read_body(headers)
+        if content is None:
+            # Без Content-Length тело заканчивается закрытием соединения
+            content = self._reader.read()
+            keep_alive = False
+        
+        return LocalResponse(url, code, reason, headers, content), keep_alive
+    
+    def _read_body(self, headers: dict) -> Optional[bytes]:
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = _chunk_size(self._read_line())
+                if size == 0:
+                    # Пропускаем trailer
+                    while self._read_line() not in (b"\r\n", b"\n"):
+                        pass
+                    return b"".join(chunks)
+                chunks.append(self._read_exact(size))
+                self._read_line()
+        
+        length = _content_length(headers)
+        if length is None:
+            return None
+        return self._read_exact(length)
+    
+    def _read_exact(self, size: int) -> bytes:
+        data = self._reader.read(size)
+        if len(data) < size:
+            raise ClientConnectionError("Connection closed in the middle of response body")
+        return data
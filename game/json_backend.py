@@ -0,0 +1,67 @@
+# game/json_backend.py
+"""JSON decoding straight from bytes with the fastest installed parser.
+
+orjson, msgspec and ujson are optional: the first one found is used,
+stdlib json otherwise. All of them raise a ValueError subclass on bad
+input, so callers catch DecodeError regardless of the backend.
+"""
+import json
+import logging
+from typing import Any, Callable, Dict, Union
+
+logger = logging.getLogger(__name__)
+
+# В порядке предпочтения
+BACKENDS = ("orjson", "msgspec", "ujson", "json")
+
+DecodeError = ValueError
+
+def _import_loads(name: str) -> Callable[[Union[bytes, str]], Any]:
+    """loads() of backend; ImportError if it is not installed"""
+    if name == "orjson":
+        import orjson
+        return orjson.loads
+    if name == "msgspec":
+        import msgspec
+        return msgspec.json.Decoder().decode
+    if name == "ujson":
+        import ujson
+        return ujson.loads
+    if name == "json":
+        return json.loads
+    raise ValueError(f"Unknown JSON backend: {name}")
+
+def available_backends() -> Dict[str, Callable[[Union[bytes, str]], Any]]:
+    """Installed backends with their loads()"""
+    backends = {}
+    for name in BACKENDS:
+        try:
+            backends[name] = _import_loads(name)
+        except ImportError:
+            pass
+    return backends
+
+def _pick_backend():
+    for name in BACKENDS:
+        try:
+            return name, _import_loads(name)
+        except ImportError:
+            continue
+    return "json", json.loads
+
+backend_name, _loads = _pick_backend()
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """Decode JSON document from bytes (preferred) or str"""
+    return _loads(data)
+
+def set_backend(name: str) -> bool:
+    """Force backend by name, e.g. for benchmarks; False if it is not installed"""
+    global backend_name, _loads
+    try:
+        _loads = _import_loads(name)
+    except ImportError:
+        logger.warning(f"JSON backend {name} is not installed, keeping {backend_name}")
+        return False
+    backend_name = name
+    return True
@@ -0,0 +1,116 @@
+# game/json_stream.py
+import codecs
+import json
+from typing import Any, List, Optional
+
+# Символы, которыми может продолжаться недочитанное число
+_NUMBER_TAIL = frozenset("0123456789.eE+-")
+
+class JSONArrayStream:
+    """Incremental parser of a JSON array fed with raw response chunks
+    
+    Items are returned as soon as they are complete, so a large array is never
+    held in memory as a whole. With key set, the array is taken from that key
+    of the top-level object (e.g. "damage" of /hudmsg) and the rest is ignored.
+    """
+    
+    def __init__(self, key: Optional[str] = None):
+        self.key = key
+        self.finished = False
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+    
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Add next piece of the body, return items completed by it"""
+        if self.finished:
+            return []
+        self._buffer += self._decoder.decode(chunk)
+        return self._drain(final=False)
+    
+    def close(self) -> List[Any]:
+        """Body ended; raises ValueError if the array was not closed"""
+        if self.finished:
+            return []
+        self._buffer += self._decoder.decode(b"", final=True)
+        items = self._drain(final=True)
+        if not self.finished:
+            raise ValueError("JSON array is not complete")
+        return items
+    
+    def _find_start(self) -> bool:
+        buffer = self._buffer
+        if self.key is None:
+            stripped = buffer.lstrip()
+            if not stripped:
+                return False
+            if stripped[0] != "[":
+                raise ValueError("Response is not a JSON array")
+            self._buffer = stripped[1:]
+            self._started = True
+            return True
+        
+        marker = f'"{self.key}"'
+        index = buffer.find(marker)
+        if index < 0:
+            # Ключ еще не пришел - храним только хвост, в котором может начинаться маркер
+            self._buffer = buffer[-len(marker):]
+            return False
+        
+        position = index + len(marker)
+        rest = buffer[position:].lstrip()
+        if not rest:
+            self._buffer = buffer[index:]
+            return False
+        if rest[0] != ":":
+            raise ValueError(f"Unexpected data after key {self.key!r}")
+        rest = rest[1:].lstrip()
+        if not rest:
+            self._buffer = buffer[index:]
+            return False
+        if rest[0] != "[":
+            raise ValueError(f"Key {self.key!r} is not a JSON array")
+        
+        self._buffer = rest[1:]
+        self._started = True
+        return True
+    
+    def _drain(self, final: bool) -> List[Any]:
+        items = []
+        if not self._started and not self._find_start():
+            return items
+        
+        buffer = self._buffer
+        size = len(buffer)
+        position = 0
+        while True:
+            while position < size and buffer[position] in " \t\r\n,":
+                position += 1
+            if position >= size:
+                break
+            if buffer[position] == "]":
+                self.finished = True
+                position += 1
+                break
+            
+            try:
+                item, end = self._json.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if final:
+                    raise ValueError("Malformed JSON array item")
+                # Элемент пришел не целиком - ждем следующий кусок
+                break
+            
+            if not final and isinstance(item, (int, float)) and not isinstance(item, bool):
+                # Число в конце буфера может продолжиться в следующем куске ("12" + "34", "-0." + "5")
+                rest = end
+                while rest < size and buffer[rest] in _NUMBER_TAIL:
+                    rest += 1
+                if rest == size:
+                    break
+            items.append(item)
+            position = end
+        
+        self._buffer = buffer[position:]
+        return items
@@ -0,0 +1,52 @@
+# game/polling.py
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Состояния игры, от которых зависит частота опроса
+LAUNCHING = "launching"
+HANGAR = "hangar"
+LOADING = "loading"
+BATTLE = "battle"
+# Игра не запущена: вместо HTTP опроса только проверка порта
+STANDBY = "standby"
+
+def classify_game_state(map_data, main_info=None) -> str:
+    """Derive game state from map info and indicators"""
+    if not map_data.game_running:
+        return LAUNCHING
+    if not map_data.valid:
+        return HANGAR
+    if main_info is not None and (main_info.army_type == "dummy_plane" or main_info.vehicle_game_name == "dummy_plane"):
+        return LOADING
+    return BATTLE
+
+class PollingPolicy:
+    """Per-state polling intervals and endpoint selection"""
+    
+    def __init__(self, settings):
+        self.intervals = {
+            LAUNCHING: settings.refresh_launching,
+            HANGAR: settings.refresh_hangar,
+            LOADING: settings.refresh_loading,
+            BATTLE: settings.refresh_battle,
+        }
+        self.default_interval = settings.refresh_time
+        self.standby_min_interval = settings.standby_min_interval
+        self.standby_max_interval = settings.standby_max_interval
+    
+    def interval(self, state: str) -> float:
+        """Seconds to sleep before the next poll in given state"""
+        return self.intervals.get(state, self.default_interval)
+    
+    def standby_interval(self, attempt: int) -> float:
+        """Seconds between port probes in standby, doubling up to standby_max_interval"""
+        return min(self.standby_min_interval * 2 ** min(attempt, 16), self.standby_max_interval)
+    
+    def wants_full_poll(self, state: str) -> bool:
+        """Idle states only need /map_info.json, battle needs everything"""
+        return state in (LOADING, BATTLE)
+    
+    def wants_air_state(self, state: str, army_type: str = "") -> bool:
+        """/state is only used for aircraft, skip it for known ground vehicles"""
+        return self.wants_full_poll(state) and army_type != "tank"
@@ -0,0 +1,58 @@
+# game/recorder.py
+import gzip
+import json
+import threading
+import time
+from typing import Iterator, Optional
+from urllib.parse import urlsplit
+
+# Сбрасываем буфер gzip не на каждой записи, чтобы не портить сжатие
+FLUSH_EVERY = 50
+
+class TelemetryRecorder:
+    """Appends raw 8111 responses to a gzip-compressed JSON lines file
+    
+    Each line: {"t": unix time, "path": "/state", "status": 200, "body": "..."}
+    or {"t": ..., "path": ..., "error": "timeout" | "connection" | "other"} for failed requests.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._file = gzip.open(path, "at", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.records = 0
+    
+    def record(self, url: str, response=None, error_kind: Optional[str] = None):
+        """Store one response (or failure) of the game API"""
+        entry = {"t": round(time.time(), 3), "path": urlsplit(url).path}
+        if response is not None:
+            entry["status"] = response.status_code
+            entry["body"] = response.content.decode("utf-8", errors="replace")
+        else:
+            entry["error"] = error_kind or "other"
+        
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + "\n")
+            self.records += 1
+            self._pending += 1
+            if self._pending >= FLUSH_EVERY:
+                self._file.flush()
+                self._pending = 0
+    
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+def read_recording(path: str) -> Iterator[dict]:
+    """Iterate over entries of a recording made by TelemetryRecorder"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
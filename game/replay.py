@@ -0,0 +1,161 @@
+# game/replay.py
+"""Replay a telemetry recording through the real presence pipeline.
+
+Usage: python -m game.replay RECORDING [--realtime] [--lang ru]
+"""
+import argparse
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+import game.api as game_api
+from game.http_client import ClientConnectionError, ClientTimeout, LocalResponse
+from game.recorder import read_recording
+
+logger = logging.getLogger(__name__)
+
+class ReplayHTTPClient:
+    """HTTP client stand-in serving recorded responses per endpoint in recorded order"""
+    
+    def __init__(self, entries: List[dict], realtime: bool = False):
+        self.realtime = realtime
+        self._queues: Dict[str, deque] = {}
+        for entry in entries:
+            self._queues.setdefault(entry["path"], deque()).append(entry)
+        self._first_time = entries[0]["t"] if entries else 0.0
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self.served = 0
+    
+    def remaining(self, path: str) -> int:
+        """Recorded responses left for endpoint"""
+        return len(self._queues.get(path, ()))
+    
+    def get(self, url: str, timeout: float = 5, stream: bool = False) -> LocalResponse:
+        path = urlsplit(url).path
+        with self._lock:
+            queue = self._queues.get(path)
+            if not queue:
+                raise ClientConnectionError(f"Recording has no more responses for {path}")
+            entry = queue.popleft()
+            self.served += 1
+        
+        if self.realtime:
+            # Воспроизводим с теми же паузами, что были при записи
+            delay = (entry["t"] - self._first_time) - (time.monotonic() - self._started)
+            if delay > 0:
+                time.sleep(delay)
+        
+        error = entry.get("error")
+        if error == "timeout":
+            raise ClientTimeout(f"Recorded timeout for {path}")
+        if error is not None:
+            raise ClientConnectionError(f"Recorded connection error for {path}")
+        
+        return LocalResponse(url, entry.get("status", 200), "", {}, entry.get("body", "").encode("utf-8"))
+
+class VirtualClock:
+    """Clock for the Discord rate limit that moves by the poll intervals instead of real time"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float):
+        self.now += seconds
+
+class NullRPCClient:
+    """Discord client stand-in that accepts every activity"""
+    
+    def __init__(self):
+        self.activities = 0
+    
+    def set_activity(self, **kwargs):
+        self.activities += 1
+    
+    def clear_activity(self):
+        pass
+    
+    def close(self):
+        pass
+
+def replay_recording(path: str, settings, realtime: bool = False) -> dict:
+    """Feed recording through update_presence_tick; returns ticks and ticks per second
+    
+    Without realtime, the Discord rate limit runs on a virtual clock advanced by
+    the interval of every tick, so the activity count is what Discord would get
+    live, not what fits into the few real seconds of the replay.
+    """
+    from discord import handler
+    from discord.publisher import TokenBucket
+    from discord.rpc import get_publisher, set_rpc_client
+    from game.polling import PollingPolicy
+    
+    entries = list(read_recording(path))
+    client = ReplayHTTPClient(entries, realtime)
+    rpc_client = NullRPCClient()
+    set_rpc_client(rpc_client)
+    publisher = get_publisher()
+    real_bucket = publisher.bucket
+    clock = None
+    if not realtime:
+        clock = VirtualClock()
+        publisher.bucket = TokenBucket(clock=clock)
+    
+    policy = PollingPolicy(settings)
+    loop = handler.LoopState()
+    map_path = urlsplit(game_api.MAP_INFO_URL).path
+    
+    ticks = 0
+    started = time.perf_counter()
+    while client.remaining(map_path):
+        # Паузы breaker'ов и режим ожидания не воспроизводятся - каждый записанный ответ идет в обработку
+        game_api.reset_breakers()
+        served_before = client.served
+        delay = handler.update_presence_tick(settings, client, policy, loop)
+        if clock is not None:
+            clock.advance(delay)
+        publisher.flush()
+        ticks += 1
+        if client.served == served_before:
+            break
+    elapsed = time.perf_counter() - started
+    
+    stats = publisher.stats()
+    publisher.bucket = real_bucket
+    set_rpc_client(None)
+    return {
+        "ticks": ticks,
+        "responses": client.served,
+        "seconds": round(elapsed, 3),
+        "ticks_per_second": round(ticks / elapsed, 1) if elapsed > 0 else 0.0,
+        "activities": rpc_client.activities,
+        "coalesced": stats["coalesced"],
+        "deferred": stats["deferred"],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", help="file written with main.py --record")
+    parser.add_argument("--realtime", action="store_true", help="keep recorded pauses instead of running as fast as possible")
+    parser.add_argument("--lang", help="override language from settings.json")
+    args = parser.parse_args()
+    
+    from configs.settings import init_presence_settings
+    settings = init_presence_settings()
+    if args.lang:
+        settings = settings.replace(lang=args.lang)
+    
+    report = replay_recording(args.recording, settings, args.realtime)
+    print(f"ticks: {report['ticks']}, responses: {report['responses']}, "
+          f"time: {report['seconds']} s, {report['ticks_per_second']} ticks/s, "
+          f"Discord activities: {report['activities']} "
+          f"(coalesced {report['coalesced']}, deferred {report['deferred']})")
+
+if __name__ == "__main__":
+    main()
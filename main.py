@@ -1,12 +1,12 @@
 # main.py
+"""Entry point: every module is imported once, through the configs/game/discord packages.
+
+Heavy dependencies (requests, pypresence, asyncio, http.server) are imported by
+the code that needs them, not at startup. py main.py --startup-report prints
+the import time of every module and the time to the first presence.
+"""
 import sys
 import os
-import traceback
-import json
-import importlib.util
-
-os.environ['PYTHONDONTWRITEBYTECODE'] = '1'
-sys.dont_write_bytecode = True
 
 # Получаем базовый путь
 def get_base_path():
@@ -22,289 +22,77 @@ def get_base_path():
 # Глобальная переменная для базового пути
 BASE_PATH = get_base_path()
 
-# Функция для динамической загрузки модулей (РАБОТАЕТ С PYINSTALLER)
-def load_module(module_name, file_path):
-    """Динамически загружает модуль из файла"""
-    try:
-        # Если мы в EXE-режиме PyInstaller, импортируем напрямую
-        if getattr(sys, 'frozen', False):
-            # Пробуем импортировать обычным способом
-            try:
-                # Для configs модулей
-                if module_name == "settings":
-                    from configs import settings as module
-                    return module
-                elif module_name == "logs":
-                    from configs import logs as module
-                    return module
-                elif module_name == "colors":
-                    from configs import colors as module
-                    return module
-                elif module_name == "translations":
-                    from configs import translations as module
-                    return module
-                # Для game модулей
-                elif module_name == "game_api":
-                    from game import api as module
-                    return module
-                # Для discord модулей
-                elif module_name == "handler":
-                    from discord import handler as module
-                    return module
-                elif module_name == "discord_init":
-                    # Пробуем разные варианты
-                    try:
-                        from discord import rpc as module
-                        return module
-                    except ImportError:
-                        try:
-                            from discord import init as module
-                            return module
-                        except ImportError:
-                            pass
-            except ImportError as e:
-                print(f"ImportError for {module_name}: {e}")
-                # Пробуем альтернативный путь
-                return None
-        else:
-            # Для обычного режима (не EXE) используем старый метод
-            if not os.path.exists(file_path):
-                print(f"File not found: {file_path}")
-                return None
-            
-            spec = importlib.util.spec_from_file_location(module_name, file_path)
-            if spec is None:
-                print(f"Could not create spec for: {module_name}")
-                return None
-            
-            module = importlib.util.module_from_spec(spec)
-            sys.modules[module_name] = module
-            spec.loader.exec_module(module)
-            return module
-    except Exception as e:
-        print(f"Error loading module {module_name}: {e}")
-        return None
-
-# Загружаем основные модули для цветов и переводов (УПРОЩЕННАЯ ВЕРСИЯ)
-def load_essential_modules():
-    """Загружает основные модули для работы программы"""
-    modules = {}
-    
-    # Файлы для поиска
-    files_to_find = {
-        'translations': 'translations',
-        'colors': 'colors',
-        'settings': 'settings',
-        'logs': 'logs',
-    }
-    
-    # Пробуем загрузить каждый модуль
-    for module_name, module_import_name in files_to_find.items():
-        module_loaded = False
-        
-        try:
-            # Пробуем импортировать как пакет configs
-            module = __import__(f'configs.{module_import_name}', fromlist=[module_import_name])
-            modules[module_name] = module
-            module_loaded = True
-        except ImportError:
-            # Пробуем альтернативные пути
-            if getattr(sys, 'frozen', False):
-                # В EXE режиме
-                try:
-                    if hasattr(sys, '_MEIPASS'):
-                        # Ищем во временной папке PyInstaller
-                        search_paths = [
-                            os.path.join(sys._MEIPASS, f"{module_import_name}.py"),
-                            os.path.join(sys._MEIPASS, "configs", f"{module_import_name}.py"),
-                            os.path.join(BASE_PATH, "configs", f"{module_import_name}.py"),
-                        ]
-                        
-                        for file_path in search_paths:
-                            if os.path.exists(file_path):
-                                module = load_module(module_name, file_path)
-                                if module:
-                                    modules[module_name] = module
-                                    module_loaded = True
-                                    break
-                except:
-                    pass
-        
-        if not module_loaded:
-            print(f"Warning: Could not load {module_name} module")
-            modules[module_name] = None
-    
-    return modules
-
-# Загружаем основные модули СРАЗУ (после определения функций)
-essential_modules = load_essential_modules()
+def get_bytecode_cache_dir() -> str:
+    """Folder for compiled modules outside the program folder"""
+    root = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(root, "WarThunderDiscordRPC", "pycache")
 
-# Создаем простые заглушки если модули не загружены
-class SimpleColors:
-    @staticmethod
-    def colored_text(text: str, color_name: str) -> str:
-        return text
+# Без кэша байткода каждый запуск заново компилирует все модули (~300 мс);
+# кэш хранится вне папки программы, чтобы не создавать там __pycache__
+if not getattr(sys, 'frozen', False) and sys.pycache_prefix is None:
+    sys.pycache_prefix = get_bytecode_cache_dir()
 
-class SimpleTranslations:
-    @staticmethod
-    def get_translation(lang: str, key: str) -> str:
-        return key
+from configs import startup
 
-# Создаем глобальные переменные
-_colors_module = essential_modules.get('colors') or SimpleColors()
-_translations_module = essential_modules.get('translations') or SimpleTranslations()
+# Профилировщик ставится до импорта остальных модулей программы
+import_profiler = None
+if "--startup-report" in sys.argv:
+    import_profiler = startup.ImportProfiler()
+    import_profiler.install()
 
-# Глобальная переменная для языка
-_current_language = "ru"
+import threading
+import traceback
 
-def set_language(lang: str):
-    """Установить текущий язык"""
-    global _current_language
-    _current_language = lang
+from configs.colors import colored_text
+from configs.i18n import get_translator
 
-def load_language_from_settings():
-    """Загрузить язык из settings.json"""
-    try:
-        settings_path = os.path.join(BASE_PATH, "settings.json")
-        if os.path.exists(settings_path):
-            with open(settings_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                lang = data.get("lang", "ru")
-                return lang
-    except:
-        pass
-    return "ru"
+# Язык, пока settings.json не прочитан (и для нового settings.json)
+DEFAULT_LANGUAGE = "ru"
+DISCORD_APP_ID = "1450643150811955282"
 
-# Функция для цветного текста
-def get_colored_text_func():
-    """Получает функцию colored_text"""
-    if hasattr(_colors_module, 'colored_text'):
-        return _colors_module.colored_text
-    else:
-        return lambda text, color: text
+def print_startup_report():
+    """Output of --startup-report"""
+    info_text = colored_text("INFO", "INFO")
+    for line in startup.report_lines(import_profiler):
+        print(f"{info_text} - {line}")
 
-# Функция для перевода
-def get_translation_func(lang: str):
-    """Получает функцию перевода"""
-    if hasattr(_translations_module, 'get_translation'):
-        return lambda key: _translations_module.get_translation(lang, key)
-    else:
-        return lambda key: key
-
-def check_for_updates(lang: str = "en"):
-    """Проверка обновлений через GitHub API"""
-    try:
-        import requests
-        
-        # Получаем функцию перевода из загруженного модуля или создаем заглушку
-        t_func = None
-        
-        # Пробуем получить функцию перевода из уже загруженного модуля
-        if _translations_module and hasattr(_translations_module, 'get_translation'):
-            t_func = lambda key: _translations_module.get_translation(lang, key)
-        else:
-            # Или пробуем загрузить модуль напрямую
-            try:
-                translations_path = os.path.join(BASE_PATH, "configs", "translations.py")
-                if os.path.exists(translations_path):
-                    spec = importlib.util.spec_from_file_location("translations", translations_path)
-                    if spec:
-                        translations = importlib.util.module_from_spec(spec)
-                        sys.modules["translations"] = translations
-                        spec.loader.exec_module(translations)
-                        if hasattr(translations, 'get_translation'):
-                            t_func = lambda key: translations.get_translation(lang, key)
-            except:
-                pass
-        
-        # Если не удалось получить функцию перевода, создаем заглушку
-        if not t_func:
-            t_func = lambda key: key
-        
-        t = t_func
-        
-        # Получаем функцию для цветов
-        colored_text_func = get_colored_text_func()
-        
-        # Создаем цветные префиксы
-        update_text = colored_text_func("UPDATE", "UPDATE") if colored_text_func("UPDATE", "UPDATE") != "UPDATE" else "UPDATE"
-        check_text = colored_text_func("CHECK", "CHECK") if colored_text_func("CHECK", "CHECK") != "CHECK" else "CHECK"
-        success_text = colored_text_func("SUCCESS", "SUCCESS") if colored_text_func("SUCCESS", "SUCCESS") != "SUCCESS" else "SUCCESS"
-        
-        print(f"{check_text} - {t('update_checking')}")
-        
-        # URL для получения последнего релиза
-        url = "https://api.github.com/repos/MoTyaZ1/WarTunder-DiscordRichPresence/releases/latest"
-        
-        # Делаем запрос к GitHub API
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code == 200:
-            release_data = response.json()
-            latest_version = release_data.get("tag_name", "")
-            html_url = release_data.get("html_url", "")
-            
-            # Получаем текущую версию
-            current_version = "v1.3.1"  # Версия по умолчанию
-            
-            # Пробуем прочитать версию из файла version.txt если он есть
-            version_file = os.path.join(BASE_PATH, "version.txt")
-            if os.path.exists(version_file):
-                try:
-                    with open(version_file, "r", encoding="utf-8") as f:
-                        current_version = f.read().strip()
-                except:
-                    pass
-            
-            # Сравниваем версии
-            if latest_version and latest_version != current_version:
-                print(f"{update_text} - {t('update_current_version')}: {current_version}")
-                print(f"{update_text} - {t('update_latest_version')}: {latest_version}")
-                print(f"{update_text} - {t('update_download')}: {html_url}")
-            else:
-                # Выводим текущую версию
-                print(f"{success_text} - {t('update_current_version')}: {current_version}")
-            
-    except requests.exceptions.ConnectionError:
-        # Если нет интернета
-        update_text = get_colored_text_func()("UPDATE", "UPDATE") if get_colored_text_func()("UPDATE", "UPDATE") != "UPDATE" else "UPDATE"
-        t_func = lambda key: key if not t else t
-        print(f"{update_text} - {t_func('update_no_internet')}")
-        return False
-    except requests.exceptions.RequestException as e:
-        # Если GitHub недоступен
-        update_text = get_colored_text_func()("UPDATE", "UPDATE") if get_colored_text_func()("UPDATE", "UPDATE") != "UPDATE" else "UPDATE"
-        t_func = lambda key: key if not t else t
-        print(f"{update_text} - {t_func('update_check_failed')}")
-        return False
-    except Exception as e:
-        # Любая другая ошибка
-        update_text = get_colored_text_func()("UPDATE", "UPDATE") if get_colored_text_func()("UPDATE", "UPDATE") != "UPDATE" else "UPDATE"
-        print(f"{update_text} - Не удалось проверить обновления")
-        return False
+def parse_args():
+    """Аргументы командной строки"""
+    import argparse
+    parser = argparse.ArgumentParser(description="War Thunder Discord Rich Presence")
+    parser.add_argument("--record", metavar="FILE", help="записывать ответы War Thunder API в файл для python -m game.replay")
+    parser.add_argument("--trace", metavar="FILE", help="записывать этапы каждого тика в trace.json для chrome://tracing / Perfetto")
+    parser.add_argument("--startup-report", action="store_true", help="вывести время импорта модулей и время до первого статуса")
+    return parser.parse_args()
 
 def main():
     """Основная функция"""
+    args = parse_args()
+    
+    # Трассировка включается до подключения к Discord, чтобы попали и его повторы
+    if args.trace:
+        import atexit
+        from configs import tracing
+        tracing.enable()
+        atexit.register(tracing.export, args.trace)
+    
+    if args.startup_report:
+        startup.on_mark(startup.FIRST_PRESENCE, print_startup_report)
+    
     try:
-        # Сначала загружаем язык из settings.json
-        language = load_language_from_settings()
-        set_language(language)
-        
-        # Получаем функции перевода и цветов
-        t = get_translation_func(language)
-        colored_text = get_colored_text_func()
-        
         # Создаем цветные префиксы
         error_text = colored_text("ERROR", "ERROR")
         info_text = colored_text("INFO", "INFO")
         warning_text = colored_text("WARNING", "WARNING")
         success_text = colored_text("SUCCESS", "SUCCESS")
         
-        # Проверка обновлений в самом начале
-        check_for_updates(language)
+        # Язык до чтения настроек (нужен, если settings.json не создастся)
+        language = DEFAULT_LANGUAGE
+        t = get_translator(language)
         
         # Проверка файлов
         settings_path = os.path.join(BASE_PATH, "settings.json")
+        settings_created = False
         if not os.path.exists(settings_path):
             print(f"{info_text} - Creating settings.json...")
             try:
@@ -318,115 +106,114 @@ def main():
   "left_tank_state": "speed",
   "right_tank_state": "crew",
   "left_air_state": "spd",
-  "right_air_state": "alt"
+  "right_air_state": "alt",
+  "refresh_launching": 15,
+  "refresh_hangar": 10,
+  "refresh_loading": 3,
+  "refresh_battle": 5,
+  "http_client": "requests",
+  "standby_min_interval": 5,
+  "standby_max_interval": 60,
+  "metrics_port": 0,
+  "update_url": "https://api.github.com/repos/MoTyaZ1/WarTunder-DiscordRichPresence/releases/latest"
 }}''')
-                print(f"{success_text} - settings.json created")
+                settings_created = True
             except Exception as e:
                 print(f"{error_text} - Error loading settings.json: {e}")
                 input(f"\n{t('press_enter')}")
                 return
-        else:
-            print(f"{success_text} - settings.json")
         
-        # Пытаемся импортировать остальные модули
+        # settings.json читается один раз, дальнейшие правки подхватывает SettingsWatcher
         try:
-            # Для EXE режима импортируем напрямую
-            if getattr(sys, 'frozen', False):
-                try:
-                    from configs import settings
-                    from configs import logs
-                    from game import api as game_api
-                    from discord import handler
-                    
-                    # Пробуем разные варианты для discord rpc
-                    try:
-                        from discord import rpc as discord_init
-                    except ImportError:
-                        from discord import init as discord_init
-                    
-                    print(f"{info_text} - Modules imported successfully in EXE mode")
-                    
-                except ImportError as e:
-                    print(f"{error_text} - Failed to import modules in EXE mode: {e}")
-                    raise ImportError("Failed to import modules")
-            else:
-                # Для обычного режима используем load_module
-                settings = load_module("settings", os.path.join(BASE_PATH, "configs", "settings.py"))
-                logs = load_module("logs", os.path.join(BASE_PATH, "configs", "logs.py"))
-                game_api = load_module("game_api", os.path.join(BASE_PATH, "game", "api.py"))
-                handler = load_module("handler", os.path.join(BASE_PATH, "discord", "handler.py"))
-                
-                # Пробуем загрузить rpc.py или init.py
-                rpc_path = os.path.join(BASE_PATH, "discord", "rpc.py")
-                if not os.path.exists(rpc_path):
-                    rpc_path = os.path.join(BASE_PATH, "discord", "init.py")
-                
-                discord_init = load_module("discord_init", rpc_path)
-            
-            # Проверяем что все модули загружены
-            if not all([settings, logs, game_api, handler, discord_init]):
-                print(f"{error_text} - Failed to load required modules:")
-                if not settings: print("  - settings.py")
-                if not logs: print("  - logs.py")
-                if not game_api: print("  - game/api.py")
-                if not handler: print("  - discord/handler.py")
-                if not discord_init: print("  - discord/rpc.py or discord/init.py")
-                raise ImportError("Failed to load required modules")
-            
+            from configs.settings import load_settings, SettingsWatcher
+            app_settings = load_settings(settings_path)
         except Exception as e:
-            print(f"\n{error_text} - Error importing modules: {e}")
+            print(f"\n{error_text} - Error initializing settings: {e}")
             traceback.print_exc()
             input(f"\n{t('press_enter')}")
             sys.exit(1)
         
-        # Инициализация настроек
+        language = app_settings.lang
+        t = get_translator(language)
+        startup.mark("settings_loaded")
+        
+        # Проверка обновлений в фоне: результат из кэша или сети выводится, когда будет готов
+        from configs.updates import start_update_check
+        start_update_check(app_settings.update_url, BASE_PATH, language)
+        
+        print(f"{success_text} - settings.json created" if settings_created else f"{success_text} - settings.json")
+        
+        # Остальные модули программы
         try:
-            app_settings = settings.init_presence_settings(BASE_PATH)
+            from configs import settings
+            from configs import logs
+            from game import api as game_api
+            from discord import handler
+            from discord import rpc as discord_rpc
+            from discord import warm_start
         except Exception as e:
-            print(f"\n{error_text} - Error initializing settings: {e}")
+            print(f"\n{error_text} - Error importing modules: {e}")
             traceback.print_exc()
             input(f"\n{t('press_enter')}")
             sys.exit(1)
-        
-        # Обновляем язык на основе окончательных настроек
-        set_language(app_settings.lang)
+        startup.mark("modules_imported")
         
         # Инициализация логгера
         try:
-            logs.init_logger()
+            logs.init_logger(app_settings.lang)
         except Exception as e:
             print(f"\n{error_text} - Error initializing logger: {e}")
             traceback.print_exc()
         
+        # Статус прошлого запуска показывается сразу после подключения к Discord, если игра все еще запущена;
+        # настоящий опрос идет параллельно и заменит его
+        warm_state = warm_start.configure(os.path.join(BASE_PATH, warm_start.STATE_FILE)).load(app_settings.lang)
+        if warm_state is not None and game_api.probe_game_port(0.2):
+            warm_start.restore(warm_state)
+            startup.mark("warm_start")
+        
+        # Дальше запуск идет параллельно: Discord подключается и справочник техники загружается в фоне,
+        # а цикл сразу опрашивает игру; первый статус уходит, как только готовы и Discord, и игра
+        connection = discord_rpc.DiscordConnection(DISCORD_APP_ID, app_settings.lang).start()
+        threading.Thread(target=handler.preload_presence, name="preload", daemon=True).start()
+        
         # Инициализация HTTP клиента
         try:
-            http_client = settings.init_http_client()
+            http_client = settings.init_http_client(app_settings.http_client)
+            startup.mark("http_client_ready")
         except Exception as e:
             print(f"\n{error_text} - Error initializing HTTP client: {e}")
             traceback.print_exc()
             input(f"\n{t('press_enter')}")
             sys.exit(1)
         
-        # Подключение к Discord
-        try:
-            if not discord_init.connect_discord_rpc("1450643150811955282", app_settings.lang):
-                input(f"\n{t('press_enter')}")
-                return
-        except Exception as e:
-            print(f"\n{error_text} - Error connecting to Discord: {e}")
-            traceback.print_exc()
-            input(f"\n{t('press_enter')}")
-            return
-        
         # Информация о запуске
         print(f"\n{info_text} - {t('program_started')}")
         
-        # Предупреждение - 16 попыток по 10 секунд
+        # Предупреждение о режиме ожидания игры
         print(f"\n{warning_text} - {t('program_will_try')}")
         
+        # Запись ответов игры для последующего воспроизведения
+        recorder = None
+        if args.record:
+            from game.recorder import TelemetryRecorder
+            recorder = TelemetryRecorder(args.record)
+            game_api.set_recorder(recorder)
+            print(f"{info_text} - Recording War Thunder API responses to {args.record}")
+        
+        # Метрики в формате Prometheus, если задан порт
+        if app_settings.metrics_port:
+            from configs import metrics
+            if metrics.start_metrics_server(app_settings.metrics_port):
+                print(f"{info_text} - {t('metrics_started')} http://127.0.0.1:{app_settings.metrics_port}/metrics")
+        
         # Запуск основного цикла
         try:
-            handler.run_update_presence_loop(app_settings, http_client)
+            watcher = SettingsWatcher(settings_path, app_settings)
+            if not handler.run_update_presence_loop(app_settings, http_client, watcher=watcher, connection=connection):
+                # Discord так и не подключился
+                input(f"\n{t('press_enter')}")
+                return
         except KeyboardInterrupt:
             print(f"\n\n{info_text} - Program stopped by user")
         except Exception as e:
@@ -434,7 +221,11 @@ def main():
             print(f"\n\n{critical_error} - {e}")
             traceback.print_exc()
             input(f"\n{t('press_enter')}")
-        
+        finally:
+            if recorder is not None:
+                game_api.set_recorder(None)
+                recorder.close()
+    
     except SystemExit:
         pass
     except KeyboardInterrupt:
@@ -0,0 +1,29 @@
+# tests/helpers.py
+"""Stand-ins shared by the tests"""
+
+class FakeClock:
+    """Monotonic clock that moves only when a test sets or advances it"""
+    
+    def __init__(self, now: float = 0.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float):
+        self.now += seconds
+
+class RecordingClient:
+    """Discord client stand-in that keeps every activity it is given"""
+    
+    def __init__(self):
+        self.activities = []
+    
+    def set_activity(self, **kwargs):
+        self.activities.append(kwargs)
+    
+    def clear_activity(self):
+        pass
+    
+    def close(self):
+        pass
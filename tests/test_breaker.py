@@ -0,0 +1,88 @@
+# tests/test_breaker.py
+import pytest
+
+from game.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from helpers import FakeClock
+
+def make_breaker(**kwargs):
+    clock = FakeClock(100.0)
+    return CircuitBreaker("/state", clock=clock, **kwargs), clock
+
+def test_opens_after_threshold_failures():
+    breaker, _ = make_breaker(failure_threshold=2)
+    assert breaker.record_failure() is False
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+    
+    assert breaker.record_failure() is True
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+def test_success_resets_failure_count():
+    breaker, _ = make_breaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    assert breaker.record_failure() is False
+    assert breaker.state == CLOSED
+
+def test_half_open_probe_after_backoff():
+    breaker, clock = make_breaker(failure_threshold=1, base_backoff=1.0)
+    breaker.record_failure()
+    assert breaker.retry_in() == 1.0
+    
+    clock.now += 0.5
+    assert not breaker.allow_request()
+    clock.now += 0.5
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 0
+
+def test_failed_probe_doubles_backoff_up_to_max():
+    breaker, clock = make_breaker(failure_threshold=1, base_backoff=1.0, max_backoff=3.0)
+    breaker.record_failure()
+    expected = [2.0, 3.0, 3.0]
+    for backoff in expected:
+        clock.now += breaker.retry_in()
+        assert breaker.allow_request()
+        assert breaker.record_failure() is True
+        assert breaker.state == OPEN
+        assert breaker.retry_in() == backoff
+
+def test_failures_while_open_do_not_extend_it():
+    breaker, clock = make_breaker(failure_threshold=1, base_backoff=1.0)
+    breaker.record_failure()
+    clock.now += 0.4
+    assert breaker.record_failure() is False
+    assert breaker.retry_in() == pytest.approx(0.6)
+
+def test_success_after_probe_restores_base_backoff():
+    breaker, clock = make_breaker(failure_threshold=1, base_backoff=1.0)
+    breaker.record_failure()
+    clock.now += 1.0
+    breaker.allow_request()
+    breaker.record_failure()
+    clock.now += 2.0
+    breaker.allow_request()
+    breaker.record_success()
+    
+    breaker.record_failure()
+    assert breaker.retry_in() == 1.0
+
+def test_timeout_follows_latency_and_failures():
+    breaker, _ = make_breaker(failure_threshold=5, min_timeout=0.25, max_timeout=5.0)
+    # Без измерений - максимальный таймаут
+    assert breaker.timeout() == 5.0
+    
+    for _ in range(50):
+        breaker.record_success(0.01)
+    assert breaker.timeout() == 0.25
+    
+    breaker.record_failure()
+    assert breaker.timeout() == 0.5
+    for _ in range(4):
+        breaker.record_failure()
+    # Рост ограничен 2**4 и max_timeout
+    assert breaker.timeout() == 4.0
@@ -0,0 +1,76 @@
+# tests/test_catalog.py
+import os
+
+import pytest
+
+from discord import catalog as catalog_module
+from discord.catalog import CATALOG_PATH, PENDING_SUFFIX, VehicleCatalog, pack_catalog
+from discord.common import VEHICLE_AIR_DICT, VEHICLE_GROUND_DICT
+
+AIR = {
+    "bf-109f-4": {"ru": "Bf 109 F-4", "en": "Bf 109 F-4"},
+    "yak-3": {"ru": "Як-3", "en": "Yak-3"},
+    "p-51d": {"en": "P-51D"},
+}
+GROUND = {
+    "us_m18_hellcat": {"ru": "M18 GMC", "en": "M18 GMC"},
+    "ussr_t_34_1941": {"ru": "Т-34 (1941)", "en": "T-34 (1941)"},
+}
+
+def write_catalog(path, air=AIR, ground=GROUND) -> VehicleCatalog:
+    path.write_bytes(pack_catalog(air, ground))
+    catalog = VehicleCatalog(str(path))
+    catalog.open()
+    return catalog
+
+def test_round_trip(tmp_path):
+    catalog = write_catalog(tmp_path / "vehicles.bin")
+    for army, vehicles in (("air", AIR), ("ground", GROUND)):
+        for code, names in vehicles.items():
+            for lang in ("ru", "en"):
+                assert catalog.name(army, code, lang) == names.get(lang, "")
+        assert catalog.codes(army) == sorted(vehicles)
+    assert len(catalog) == len(AIR) + len(GROUND)
+    catalog.close()
+
+def test_unknown_lookups(tmp_path):
+    catalog = write_catalog(tmp_path / "vehicles.bin")
+    assert catalog.name("air", "missing", "en") == ""
+    assert catalog.name("ground", "bf-109f-4", "en") == ""
+    assert catalog.name("air", "bf-109f-4", "de") == ""
+    catalog.close()
+
+def test_equal_strings_are_stored_once():
+    single = pack_catalog({"a": {"ru": "Same name", "en": "Same name"}}, {})
+    double = pack_catalog({"a": {"ru": "Same name", "en": "Other name"}}, {})
+    assert len(double) - len(single) == len("Other name")
+
+@pytest.mark.parametrize("data", [b"", b"WTVC", b"XXXX\x01\x00\x02\x00\x00\x00\x00\x00"])
+def test_broken_file_is_refused(tmp_path, data):
+    path = tmp_path / "vehicles.bin"
+    path.write_bytes(data)
+    with pytest.raises(ValueError):
+        VehicleCatalog(str(path)).open()
+
+def test_pending_file_is_swapped_in(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog_module, "REFRESH_INTERVAL", 0.0)
+    path = tmp_path / "vehicles.bin"
+    catalog = write_catalog(path)
+    generation = catalog.generation
+    
+    renamed = dict(AIR, **{"yak-3": {"ru": "Як-3 (новый)", "en": "Yak-3 (new)"}})
+    (tmp_path / ("vehicles.bin" + PENDING_SUFFIX)).write_bytes(pack_catalog(renamed, GROUND))
+    assert catalog.name("air", "yak-3", "en") == "Yak-3 (new)"
+    assert catalog.generation == generation + 1
+    assert not os.path.exists(str(path) + PENDING_SUFFIX)
+    catalog.close()
+
+@pytest.mark.skipif(not os.path.exists(CATALOG_PATH), reason="vehicles.bin is not built")
+def test_shipped_catalog_matches_common_py():
+    assert open(CATALOG_PATH, "rb").read() == pack_catalog(VEHICLE_AIR_DICT, VEHICLE_GROUND_DICT)
+    catalog = VehicleCatalog()
+    catalog.open()
+    for army, vehicles in (("air", VEHICLE_AIR_DICT), ("ground", VEHICLE_GROUND_DICT)):
+        for code, names in vehicles.items():
+            assert catalog.name(army, code, "en") == names.get("en", "")
+    catalog.close()
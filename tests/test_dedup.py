@@ -0,0 +1,40 @@
+# tests/test_dedup.py
+from discord.dedup import PresenceDeduplicator
+
+def activity(**changes) -> dict:
+    payload = {"state": "Speed: 480 km/h", "details": "Plays on: Bf 109 F-4", "large_image": "main_logo",
+               "large_text": "War Thunder", "start": 1700000000}
+    payload.update(changes)
+    return payload
+
+def test_identical_activity_is_skipped():
+    deduplicator = PresenceDeduplicator()
+    assert not deduplicator.is_duplicate(activity())
+    deduplicator.mark_sent(activity())
+    assert deduplicator.is_duplicate(activity())
+    assert deduplicator.stats() == {"sent": 1, "skipped": 1}
+
+def test_key_order_does_not_matter():
+    deduplicator = PresenceDeduplicator()
+    deduplicator.mark_sent(activity())
+    assert deduplicator.is_duplicate(dict(reversed(list(activity().items()))))
+
+def test_any_changed_field_is_sent():
+    deduplicator = PresenceDeduplicator()
+    deduplicator.mark_sent(activity())
+    assert not deduplicator.is_duplicate(activity(state="Speed: 490 km/h"))
+    assert not deduplicator.is_duplicate(activity(details=None))
+    assert not deduplicator.is_duplicate(activity(start=1700000001))
+    assert deduplicator.stats()["skipped"] == 0
+
+def test_reset_forgets_shown_activity():
+    deduplicator = PresenceDeduplicator()
+    deduplicator.mark_sent(activity())
+    deduplicator.reset()
+    assert not deduplicator.is_duplicate(activity())
+
+def test_remember_is_not_counted_as_sent():
+    deduplicator = PresenceDeduplicator()
+    deduplicator.remember(activity())
+    assert deduplicator.is_duplicate(activity())
+    assert deduplicator.stats() == {"sent": 0, "skipped": 1}
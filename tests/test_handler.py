@@ -0,0 +1,38 @@
+# tests/test_handler.py
+import socket
+
+import pytest
+
+import game.api as game_api
+from configs.settings import get_default_settings, init_http_client
+from discord import handler, rpc
+from discord.states import BASIC_STATE_DICT
+from game.polling import LAUNCHING, PollingPolicy
+from helpers import RecordingClient
+
+def closed_port_url() -> str:
+    """Address of a local port nobody listens on"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+@pytest.fixture
+def discord_client():
+    old_url = game_api.API_URL
+    client = RecordingClient()
+    game_api.set_api_url(closed_port_url())
+    game_api.reset_breakers()
+    rpc.set_rpc_client(client)
+    yield client
+    rpc.set_rpc_client(None)
+    game_api.set_api_url(old_url)
+    game_api.reset_breakers()
+
+def test_launching_presence_on_first_failed_poll(discord_client):
+    settings = get_default_settings().replace(lang="en")
+    loop = handler.LoopState()
+    handler.update_presence_tick(settings, init_http_client("stdlib"), PollingPolicy(settings), loop)
+    
+    assert loop.game_state == LAUNCHING
+    assert [activity["state"] for activity in discord_client.activities] == [BASIC_STATE_DICT["launching"]["en"]]
@@ -0,0 +1,112 @@
+# tests/test_http_client.py
+import socket
+import threading
+
+import pytest
+
+from game.http_client import ClientConnectionError, LocalHTTPClient
+
+class RawServer:
+    """Answers each connection with prepared bytes after reading `requests` request heads, then closes it"""
+    
+    def __init__(self, reply: bytes, requests: int = 1):
+        self.reply = reply
+        self.requests = requests
+        self.connections = 0
+        self._sock = socket.create_server(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{self._sock.getsockname()[1]}"
+        threading.Thread(target=self._serve, daemon=True).start()
+    
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            with conn:
+                data = b""
+                while data.count(b"\r\n\r\n") < self.requests:
+                    chunk = conn.recv(4096)
+                    if not chunk:
+                        break
+                    data += chunk
+                conn.sendall(self.reply)
+                # Конец ответа без длины и оборванное тело клиент видит по закрытию соединения
+                conn.shutdown(socket.SHUT_WR)
+    
+    def close(self):
+        self._sock.close()
+
+@pytest.fixture
+def client():
+    http_client = LocalHTTPClient()
+    yield http_client
+    http_client.close()
+
+def serve(reply: bytes, requests: int = 1) -> RawServer:
+    return RawServer(reply, requests)
+
+def test_content_length_body(client):
+    server = serve(b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhello")
+    response = client.get(server.url + "/state")
+    assert response.status_code == 200
+    assert response.content == b"hello"
+    server.close()
+
+def test_chunked_body_with_extension_and_trailer(client):
+    server = serve(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                   b"3;ext=1\r\nabc\r\n4\r\ndefg\r\n0\r\nX-Trailer: 1\r\n\r\n")
+    assert client.get(server.url + "/state").content == b"abcdefg"
+    server.close()
+
+def test_pipelined_responses_keep_order(client):
+    reply = (b"HTTP/1.1 200 OK\r\nContent-Length: 1\r\n\r\na"
+             b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n1\r\nb\r\n0\r\n\r\n"
+             b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+    server = serve(reply, requests=3)
+    responses = client.get_many([server.url + "/a", server.url + "/b", server.url + "/c"])
+    assert [r.content for r in responses] == [b"a", b"b", b""]
+    assert [r.status_code for r in responses] == [200, 200, 404]
+    assert server.connections == 1
+    server.close()
+
+def test_body_until_close_without_length(client):
+    server = serve(b"HTTP/1.0 200 OK\r\n\r\nrest of body")
+    assert client.get(server.url + "/").content == b"rest of body"
+    # HTTP/1.0 без длины - соединение не переиспользуется
+    assert client._sock is None
+    server.close()
+
+@pytest.mark.parametrize("reply", [
+    b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\nabc\r\n0\r\n\r\n",
+    b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n-1\r\nabc\r\n0\r\n\r\n",
+    b"HTTP/1.1 200 OK\r\nContent-Length: abc\r\n\r\nhello",
+    b"HTTP/1.1 200 OK\r\nContent-Length: -5\r\n\r\nhello",
+    b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\nshort",
+    b"garbage\r\n\r\n",
+])
+def test_malformed_response_is_a_connection_error(client, reply):
+    server = serve(reply)
+    with pytest.raises(ClientConnectionError):
+        client.get(server.url + "/state")
+    assert client._sock is None
+    server.close()
+
+@pytest.mark.parametrize("reply", [
+    b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n2\r\nab\r\nxyz\r\n",
+    b"HTTP/1.1 200 OK\r\nContent-Length: nope\r\n\r\nhello",
+])
+def test_malformed_stream_is_a_connection_error(client, reply):
+    server = serve(reply)
+    response = client.get(server.url + "/map_obj.json", stream=True)
+    with pytest.raises(ClientConnectionError):
+        b"".join(response.iter_content(4))
+    assert response._sock is None
+    server.close()
+
+def test_stream_reads_chunked_body_in_pieces(client):
+    server = serve(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n6\r\nabcdef\r\n0\r\n\r\n")
+    response = client.get(server.url + "/map_obj.json", stream=True)
+    assert list(response.iter_content(4)) == [b"abcd", b"ef"]
+    server.close()
@@ -0,0 +1,51 @@
+# tests/test_i18n.py
+import string
+
+import pytest
+
+from configs import i18n
+from configs.translations import TRANSLATIONS
+
+def placeholders(message: str) -> set:
+    return {name for _, name, _, _ in string.Formatter().parse(message) if name is not None}
+
+@pytest.fixture
+def locales_dir(tmp_path, monkeypatch):
+    """Empty catalog folder and no loaded translators"""
+    monkeypatch.setattr(i18n, "LOCALES_DIR", str(tmp_path))
+    monkeypatch.setattr(i18n, "_translators", {})
+    return tmp_path
+
+@pytest.mark.parametrize("lang", sorted(TRANSLATIONS))
+def test_shipped_catalogs_are_current(lang):
+    messages = i18n.read_catalog(lang, i18n._source_checksum())
+    assert messages == i18n.compile_messages(TRANSLATIONS, lang)
+
+def test_languages_use_same_placeholders():
+    fallback = TRANSLATIONS[i18n.FALLBACK_LANG]
+    for lang, messages in TRANSLATIONS.items():
+        for key, message in messages.items():
+            assert placeholders(message) == placeholders(fallback.get(key, message)), (lang, key)
+
+def test_missing_catalog_is_compiled(locales_dir):
+    translator = i18n.get_translator("ru")
+    assert translator("update_download") == TRANSLATIONS["ru"]["update_download"]
+    assert (locales_dir / "ru.cat").exists()
+    assert i18n.read_catalog("ru", i18n._source_checksum()) == translator.messages
+
+def test_stale_or_broken_catalog_is_ignored(locales_dir):
+    i18n.write_catalog("en", {"update_download": "old"}, checksum=1)
+    assert i18n.read_catalog("en", 2) is None
+    (locales_dir / "ru.cat").write_bytes(b"WTMC\x01")
+    assert i18n.read_catalog("ru", None) is None
+    assert i18n.get_translator("en")("update_download") == TRANSLATIONS["en"]["update_download"]
+
+def test_unknown_language_and_key_fall_back(locales_dir):
+    translator = i18n.get_translator("de")
+    assert translator("update_download") == TRANSLATIONS[i18n.FALLBACK_LANG]["update_download"]
+    assert translator("no_such_key") == "no_such_key"
+    assert i18n.get_translator("de") is translator
+
+def test_format_fills_placeholders():
+    translator = i18n.Translator("en", {"circuit_open": "{endpoint} is down for {seconds} s"})
+    assert translator.format("circuit_open", endpoint="/state", seconds=5) == "/state is down for 5 s"
@@ -0,0 +1,94 @@
+# tests/test_json_stream.py
+import json
+
+import pytest
+
+import game.api as game_api
+from game.http_client import LocalResponse
+from game.json_stream import JSONArrayStream
+
+ITEMS = [
+    {"type": "aircraft", "icon": "Fighter", "x": 0.25, "y": -1.5e-3, "color": "#f40C00"},
+    {"msg": "Танк уничтожен ✈", "id": 12, "enemy": False, "sender": None},
+    [1, 2, [3, {"a": "]"}]],
+    "строка с \"кавычками\" и ] скобкой",
+    123456,
+    -0.5,
+    True,
+    None,
+]
+
+def feed_in_pieces(stream: JSONArrayStream, body: bytes, size: int) -> list:
+    items = []
+    for start in range(0, len(body), size):
+        items.extend(stream.feed(body[start:start + size]))
+    items.extend(stream.close())
+    return items
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10000])
+def test_array_split_into_pieces(size):
+    body = json.dumps(ITEMS, ensure_ascii=False).encode("utf-8")
+    assert feed_in_pieces(JSONArrayStream(), body, size) == ITEMS
+
+def test_every_split_point():
+    body = json.dumps(ITEMS, ensure_ascii=False, indent=1).encode("utf-8")
+    for split in range(len(body) + 1):
+        stream = JSONArrayStream()
+        items = stream.feed(body[:split]) + stream.feed(body[split:]) + stream.close()
+        assert items == ITEMS, split
+
+@pytest.mark.parametrize("size", [1, 5, 10000])
+def test_array_under_key(size):
+    document = {"events": [{"id": 1}], "damage": ITEMS, "after": [0] * 3}
+    body = json.dumps(document, ensure_ascii=False).encode("utf-8")
+    assert feed_in_pieces(JSONArrayStream("damage"), body, size) == ITEMS
+
+def test_number_at_chunk_end_waits_for_next_chunk():
+    stream = JSONArrayStream()
+    assert stream.feed(b"[12") == []
+    assert stream.feed(b"34, 5") == [1234]
+    assert stream.feed(b"]") == [5]
+    assert stream.finished
+
+@pytest.mark.parametrize("body", [b'{"a": 1}', b"[1, 2", b"[1, {]"])
+def test_malformed_array(body):
+    stream = JSONArrayStream()
+    with pytest.raises(ValueError):
+        stream.feed(body)
+        stream.close()
+
+class PiecewiseResponse(LocalResponse):
+    """Response whose body arrives in small pieces, as from a slow socket"""
+    
+    piece = 3
+    
+    def iter_content(self, chunk_size: int = 16384):
+        self.read = 0
+        for start in range(0, len(self.content), self.piece):
+            self.read = start + self.piece
+            yield self.content[start:start + self.piece]
+
+class StreamClient:
+    def __init__(self, body: bytes):
+        self.response = PiecewiseResponse("", 200, "OK", {}, body)
+    
+    def get(self, url: str, timeout: float = 5, stream: bool = False):
+        return self.response
+
+@pytest.fixture
+def fresh_breakers():
+    game_api.reset_breakers()
+    yield
+    game_api.reset_breakers()
+
+def test_iter_json_array_stops_at_limit(fresh_breakers):
+    objects = [{"x": i} for i in range(1000)]
+    client = StreamClient(json.dumps(objects).encode("utf-8"))
+    assert game_api.map_objects_request(client, limit=3) == objects[:3]
+    # Остаток тела не читается
+    assert client.response.read < 100
+
+def test_iter_json_array_from_key(fresh_breakers):
+    document = {"events": [], "damage": [{"id": 1, "msg": "a"}, {"id": 2, "msg": "b"}]}
+    client = StreamClient(json.dumps(document).encode("utf-8"))
+    assert game_api.hud_damage_request(client) == document["damage"]
@@ -0,0 +1,78 @@
+# tests/test_publisher.py
+import pytest
+
+from discord.publisher import PresencePublisher, TokenBucket
+from helpers import FakeClock
+
+def payload(state: str) -> dict:
+    return {"state": state, "details": None, "large_image": "main_logo", "start": 1}
+
+def make_publisher(capacity: int = 5, period: float = 20.0):
+    clock = FakeClock()
+    sent = []
+    publisher = PresencePublisher(lambda payload, lang: sent.append(payload["state"]),
+                                  TokenBucket(capacity, period, clock))
+    return publisher, clock, sent
+
+def test_bucket_refills_at_rate_up_to_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(5, 20.0, clock)
+    assert all(bucket.try_acquire() for _ in range(5))
+    assert not bucket.try_acquire()
+    assert bucket.time_until_available() == pytest.approx(4.0)
+    
+    clock.now += 4.0
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    
+    # Долгий простой не накапливает больше capacity
+    clock.now += 1000.0
+    assert sum(bucket.try_acquire() for _ in range(10)) == 5
+
+def test_bucket_reserve_and_consume():
+    clock = FakeClock()
+    bucket = TokenBucket(2, 10.0, clock)
+    assert bucket.try_acquire(reserve=1)
+    assert not bucket.try_acquire(reserve=1)
+    assert bucket.try_acquire()
+    
+    bucket.consume()
+    # Токенов нет, consume не уводит счет в минус
+    assert bucket.time_until_available() == pytest.approx(5.0)
+
+def test_duplicates_are_skipped():
+    publisher, _, sent = make_publisher()
+    assert publisher.submit(payload("a"), phase="hangar")
+    assert not publisher.submit(payload("a"), phase="hangar")
+    assert sent == ["a"]
+    assert publisher.stats()["skipped"] == 1
+
+def test_routine_updates_leave_a_token_for_transitions():
+    publisher, clock, sent = make_publisher(capacity=2, period=10.0)
+    publisher.submit(payload("speed 1"), phase="battle")
+    # Обычное обновление того же этапа не берет последний токен
+    assert not publisher.submit(payload("speed 2"), phase="battle")
+    assert publisher.submit(payload("hangar"), phase="hangar")
+    assert sent == ["speed 1", "hangar"]
+
+def test_deferred_update_is_coalesced_and_flushed_later():
+    publisher, clock, sent = make_publisher(capacity=1, period=10.0)
+    publisher.submit(payload("hangar"), phase="hangar")
+    assert not publisher.submit(payload("battle 1"), phase="battle")
+    assert not publisher.submit(payload("battle 2"), phase="battle")
+    assert publisher.next_flush_delay() == pytest.approx(10.0)
+    
+    clock.now += 10.0
+    assert publisher.flush()
+    # Ушел только последний статус, с приоритетом смены этапа
+    assert sent == ["hangar", "battle 2"]
+    assert publisher.stats()["coalesced"] == 1
+    assert publisher.next_flush_delay() is None
+
+def test_reset_after_external_update_remembers_shown_presence():
+    publisher, _, sent = make_publisher(capacity=5)
+    publisher.reset(external_update=True)
+    publisher.deduplicator.remember(payload("shown at connect"))
+    assert not publisher.submit(payload("shown at connect"), phase="hangar")
+    assert sent == []
+    assert publisher.stats()["sent"] == 0
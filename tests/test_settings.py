@@ -0,0 +1,126 @@
+# tests/test_settings.py
+import json
+import logging
+import os
+import socket
+
+import pytest
+
+from configs import metrics
+from configs.settings import PresenceSettings, SettingsWatcher, get_default_settings, settings_from_dict
+from discord.handler import apply_settings
+from game.polling import BATTLE, PollingPolicy
+from helpers import FakeClock
+
+class SettingsFile:
+    """settings.json whose every write gets a new mtime, as a real editor save would"""
+    
+    def __init__(self, path):
+        self.path = str(path)
+        self.version = 0
+        self.write_json({})
+    
+    def write_text(self, text: str):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(text)
+        self.version += 1
+        os.utime(self.path, ns=(self.version * 10**9, self.version * 10**9))
+    
+    def write_json(self, data: dict):
+        self.write_text(json.dumps(data))
+
+@pytest.fixture
+def settings_file(tmp_path):
+    return SettingsFile(tmp_path / "settings.json")
+
+def make_watcher(settings_file, current=None):
+    clock = FakeClock()
+    watcher = SettingsWatcher(settings_file.path, current or get_default_settings(), interval=2.0, clock=clock)
+    return watcher, clock
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def test_invalid_values_fall_back():
+    settings = settings_from_dict({"lang": "de", "refresh_battle": 0, "metrics_port": 70000, "alt_presence": "yes"})
+    assert settings == get_default_settings()
+    
+    current = PresenceSettings(lang="ru", refresh_battle=2)
+    settings = settings_from_dict({"lang": "de", "refresh_battle": -1}, current)
+    assert (settings.lang, settings.refresh_battle) == ("ru", 2)
+    # Отсутствующее поле - значение по умолчанию, а не текущее
+    assert settings_from_dict({}, current).lang == get_default_settings().lang
+
+def test_edit_is_picked_up_after_interval(settings_file):
+    watcher, clock = make_watcher(settings_file)
+    settings_file.write_json({"refresh_battle": 3})
+    assert watcher.poll() is None
+    
+    clock.advance(2.0)
+    new = watcher.poll()
+    assert new.refresh_battle == 3
+    watcher.accept(new)
+    clock.advance(2.0)
+    assert watcher.poll() is None
+    assert watcher.current is new
+
+def test_partly_written_file_is_skipped(settings_file):
+    watcher, clock = make_watcher(settings_file)
+    settings_file.write_text('{"refresh_battle": 3, "lan')
+    clock.advance(2.0)
+    assert watcher.poll() is None
+    
+    settings_file.write_json({"refresh_battle": 3, "lang": "ru"})
+    clock.advance(2.0)
+    new = watcher.poll()
+    assert (new.refresh_battle, new.lang) == (3, "ru")
+
+def test_invalid_edit_keeps_current_settings(settings_file):
+    current = get_default_settings().replace(lang="ru")
+    watcher, clock = make_watcher(settings_file, current)
+    settings_file.write_json({"lang": "de"})
+    clock.advance(2.0)
+    assert watcher.poll() is None
+    assert watcher.current is current
+
+def test_edit_is_returned_again_until_accepted(settings_file):
+    watcher, clock = make_watcher(settings_file)
+    settings_file.write_json({"refresh_hangar": 20})
+    clock.advance(2.0)
+    first = watcher.poll()
+    clock.advance(2.0)
+    # apply_settings упал - правка не теряется
+    assert watcher.poll() == first
+    watcher.accept(first)
+    clock.advance(2.0)
+    assert watcher.poll() is None
+
+def test_apply_settings_rebuilds_policy_and_reports_restart(caplog):
+    old = get_default_settings().replace(lang="en")
+    policy = PollingPolicy(old)
+    
+    new = old.replace(lang="ru")
+    assert apply_settings(old, new, policy) is policy
+    
+    new = old.replace(refresh_battle=2, http_client="stdlib")
+    with caplog.at_level(logging.INFO):
+        rebuilt = apply_settings(old, new, policy)
+    assert rebuilt is not policy
+    assert rebuilt.interval(BATTLE) == 2
+    assert "refresh_battle" in caplog.text and "http_client" in caplog.text
+
+def test_apply_settings_moves_metrics_endpoint():
+    first, second = free_port(), free_port()
+    old = get_default_settings().replace(metrics_port=first)
+    metrics.start_metrics_server(first)
+    try:
+        new = old.replace(metrics_port=second)
+        apply_settings(old, new, PollingPolicy(new))
+        assert metrics._server.server_address[1] == second
+        
+        apply_settings(new, new.replace(metrics_port=0), PollingPolicy(new))
+        assert metrics._server is None
+    finally:
+        metrics.stop_metrics_server()
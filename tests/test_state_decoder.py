@@ -0,0 +1,70 @@
+# tests/test_state_decoder.py
+import glob
+import json
+import os
+
+import pytest
+
+from benchmarks.mock_server import _air_state
+from discord.types.air import IndicatorsAirStruct
+from game import json_backend
+from game.state_decoder import STATE_FIELDS, decode_state, looks_like_json
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "fixtures", "state_*.json")))
+
+@pytest.fixture(autouse=True, params=["json", "orjson", "msgspec"])
+def backend(request):
+    """Every test runs with the scan and with each fast JSON parser"""
+    previous = json_backend.backend_name
+    if request.param not in json_backend.available_backends():
+        pytest.skip(f"{request.param} is not installed")
+    json_backend.set_backend(request.param)
+    yield request.param
+    json_backend.set_backend(previous)
+
+def reference(data: dict) -> dict:
+    """What json.loads gives for the requested keys, as the status shows them"""
+    values = {}
+    for key, field in STATE_FIELDS:
+        value = data.get(key.decode("ascii"))
+        if value is not None:
+            values[field] = str(int(value))
+    return values
+
+def as_text(data: dict) -> bytes:
+    """Plain text form of /state: one "key: value" line per value"""
+    return "\n".join(f"{key}: {value}" for key, value in data.items() if value is not None).encode("utf-8")
+
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_fixture_matches_json_loads(path):
+    with open(path, "rb") as f:
+        body = f.read()
+    data = json.loads(body)
+    assert decode_state(body) == reference(data)
+    assert decode_state(body.decode("utf-8")) == reference(data)
+    assert decode_state(as_text(data)) == reference(data)
+
+def test_mock_states_match_json_loads():
+    for step in range(200):
+        data = _air_state(step * 1.7)
+        assert decode_state(json.dumps(data).encode("utf-8")) == reference(data)
+        assert decode_state(json.dumps(data, indent=1).encode("utf-8")) == reference(data)
+
+def test_key_must_start_a_word():
+    # "Mfuel, kg" не должен находиться внутри другого ключа
+    body = b'{"XMfuel, kg": 1, "Mfuel0, kg": 300, "Mfuel, kg": 250}'
+    assert decode_state(body) == {"max_fuel": "300", "current_fuel": "250"}
+
+def test_missing_and_broken_values():
+    assert decode_state(b"") == {}
+    assert decode_state(b'{"valid": false}') == {}
+    assert decode_state(b'{"H, m": "high", "TAS, km/h": 300}') == {"tas_speed": "300"}
+
+def test_truncated_json_is_scanned():
+    assert decode_state(b'{"H, m": 1500.5, "TAS, km/h": 41') == {"altitude": "1500", "tas_speed": "41"}
+
+def test_build_air_info_accepts_json_without_values():
+    indicators = IndicatorsAirStruct()
+    assert indicators.build_air_info(b'{\n"valid": false\n}')
+    assert not indicators.build_air_info(b"<html>not found</html>")
+    assert looks_like_json(b"  {") and not looks_like_json("[1]")
@@ -0,0 +1,90 @@
+# tests/test_updates.py
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from configs.updates import AVAILABLE, NO_INTERNET, UP_TO_DATE, check_for_updates
+
+RELEASE = {"tag_name": "v1.4.0", "html_url": "https://example.invalid/releases/v1.4.0"}
+ETAG = '"release-1"'
+
+class ReleaseServer:
+    """Latest release endpoint that honours If-None-Match"""
+    
+    def __init__(self):
+        self.requests = []
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(self.headers.get("If-None-Match"))
+                if self.headers.get("If-None-Match") == ETAG:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                body = json.dumps(RELEASE).encode("utf-8")
+                self.send_response(200)
+                self.send_header("ETag", ETAG)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/releases/latest"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def server():
+    server = ReleaseServer()
+    yield server
+    server.close()
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "update_cache.json")
+
+def test_first_check_fills_cache(server, cache_path):
+    info = check_for_updates(server.url, cache_path, "v1.3.1")
+    assert (info.status, info.latest_version, info.cached) == (AVAILABLE, "v1.4.0", False)
+    with open(cache_path, "r", encoding="utf-8") as f:
+        cache = json.load(f)
+    assert cache["etag"] == ETAG and cache["url"] == server.url
+
+def test_fresh_cache_needs_no_request(server, cache_path):
+    check_for_updates(server.url, cache_path, "v1.3.1")
+    info = check_for_updates(server.url, cache_path, "v1.4.0")
+    assert (info.status, info.cached) == (UP_TO_DATE, True)
+    assert server.requests == [None]
+
+def test_not_modified_reuses_cached_release(server, cache_path):
+    check_for_updates(server.url, cache_path, "v1.3.1")
+    info = check_for_updates(server.url, cache_path, "v1.3.1", ttl=0)
+    assert server.requests == [None, ETAG]
+    assert (info.status, info.latest_version, info.html_url, info.cached) == (
+        AVAILABLE, "v1.4.0", RELEASE["html_url"], True)
+
+def test_cache_of_other_url_or_broken_cache_is_ignored(server, cache_path):
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump({"url": "http://other", "checked": 1e12, "etag": ETAG, "tag_name": "v9"}, f)
+    assert check_for_updates(server.url, cache_path, "v1.3.1").latest_version == "v1.4.0"
+    
+    with open(cache_path, "w", encoding="utf-8") as f:
+        f.write('{"url": "')
+    assert check_for_updates(server.url, cache_path, "v1.3.1").cached is False
+    assert server.requests == [None, None]
+
+def test_unreachable_server(cache_path):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        url = f"http://127.0.0.1:{sock.getsockname()[1]}/releases/latest"
+    assert check_for_updates(url, cache_path, "v1.3.1", timeout=2).status == NO_INTERNET
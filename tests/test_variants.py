@@ -0,0 +1,39 @@
+# tests/test_variants.py
+import pytest
+
+from discord.variants import VariantIndex, variant_label, variant_name
+
+CODES = sorted(["a_4e", "a_4e_early", "f_86f_25", "us_m18_hellcat", "ussr_t_34_1941", "yak_3"])
+
+@pytest.fixture
+def index():
+    return VariantIndex(CODES)
+
+def test_prefix_variant(index):
+    assert index.find("a_4e_late_iaf") == ("a_4e", ("late", "iaf"))
+    # Самый длинный известный префикс
+    assert index.find("a_4e_early_china") == ("a_4e_early", ("china",))
+
+def test_nation_prefix_variant(index):
+    assert index.find("il_m18_hellcat") == ("us_m18_hellcat", ())
+    assert index.find("cn_t_34_1941") == ("ussr_t_34_1941", ())
+
+def test_not_a_variant(index):
+    assert index.find("zzz_unknown") is None
+    assert index.find("a") is None
+    assert index.find("m18_hellcat") is None
+
+def test_labels():
+    assert variant_label(("late", "iaf"), "en") == "Late"
+    assert variant_label(("late", "iaf"), "ru") == "поздний"
+    assert variant_label(("early", "mod", "event", "late"), "en") == "Early mod"
+    assert variant_label(("china",), "en") == ""
+
+@pytest.mark.parametrize("army, code, name", [
+    ("air", "fw-190d-9_china", "Fw 190 D-9"),
+    ("air", "bf-109f-4_event_kit", "Bf 109 F-4"),
+    ("ground", "il_m18_hellcat", "M18 GMC"),
+    ("air", "zzz_unknown", ""),
+])
+def test_variant_name_from_shipped_catalog(army, code, name):
+    assert variant_name(army, code, "en") == name
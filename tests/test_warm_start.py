@@ -0,0 +1,77 @@
+# tests/test_warm_start.py
+import json
+import os
+import time
+
+import pytest
+
+from discord import rpc, warm_start
+from discord.vehicles import VehicleRecord, get_resolver
+from discord.warm_start import WarmStateStore
+from helpers import RecordingClient
+
+PAYLOAD = {"state": "Скорость: 480 км/ч", "details": "Играет на: Bf 109 F-4", "large_image": "main_logo",
+           "start": 1700000000}
+VEHICLE = ("bf-109f-4", VehicleRecord("bf-109f-4", "Bf 109 F-4", "bf-109f-4.png", "air"))
+
+@pytest.fixture
+def store(tmp_path):
+    return WarmStateStore(str(tmp_path / warm_start.STATE_FILE))
+
+def rewrite(store: WarmStateStore, **changes):
+    with open(store.path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    data.update(changes)
+    with open(store.path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+def test_round_trip(store):
+    store.save(PAYLOAD, "ru", VEHICLE)
+    state = store.load("ru")
+    assert (state.payload, state.lang, state.start, state.vehicle) == (PAYLOAD, "ru", 1700000000, VEHICLE)
+    assert store.writes == 1
+    assert not os.path.exists(store.path + ".tmp")
+
+def test_stale_or_future_state_is_ignored(store):
+    store.save(PAYLOAD, "ru")
+    rewrite(store, saved=time.time() - warm_start.MAX_AGE - 1)
+    assert store.load("ru") is None
+    rewrite(store, saved=time.time() + 60)
+    assert store.load("ru") is None
+
+def test_state_of_other_language_is_ignored(store):
+    store.save(PAYLOAD, "ru")
+    assert store.load("en") is None
+    assert store.load() is not None
+
+@pytest.mark.parametrize("text", [
+    "",
+    '{"version": 1, "saved": ',
+    '{"version": 99, "saved": 0, "lang": "ru", "payload": {}}',
+    '{"version": 1, "saved": 0, "lang": "ru", "payload": "text"}',
+    '{"version": 1, "lang": "ru", "payload": {}}',
+    '[1, 2]',
+])
+def test_broken_state_is_ignored(store, text):
+    with open(store.path, "w", encoding="utf-8") as f:
+        f.write(text)
+    assert store.load("ru") is None
+
+def test_missing_file(store):
+    assert store.load("ru") is None
+
+def test_restore_shows_saved_presence_after_connect(store):
+    store.save(PAYLOAD, "ru", VEHICLE)
+    client = RecordingClient()
+    try:
+        warm_start.restore(store.load("ru"))
+        assert rpc.get_start_time() == 1700000000
+        assert get_resolver().resolve("bf-109f-4", "air", "ru") == VEHICLE[1]
+        
+        rpc.set_rpc_client(client)
+        assert rpc.publish_held()
+        assert [activity["state"] for activity in client.activities] == [PAYLOAD["state"]]
+    finally:
+        rpc.set_rpc_client(None)
+        rpc.set_start_time(None)
+        get_resolver().clear()